@@ -1,6 +1,6 @@
 from fastapi import FastAPI, HTTPException
-from transformers import pipeline
 from pydantic import BaseModel
+from analysis_server.cpu_inference import build_sentiment_pipeline
 
 app = FastAPI(
     title="AI Sentiment Analysis Server",
@@ -9,7 +9,8 @@ app = FastAPI(
 )
 
 # 1) HuggingFace 사전학습 모델 로드
-sentiment_analyzer = pipeline("sentiment-analysis")
+#    (CPU 모드/스레드/토큰 제한은 SENTIMENT_CPU_MODE 등 환경변수, cpu_inference.py 참고)
+sentiment_analyzer = build_sentiment_pipeline()
 
 class SentimentResponse(BaseModel):
     signal: str    # positive / negative / neutral
@@ -2,7 +2,7 @@
 # /srv/autotrade-app/analysis_server/ai_sentiment_service.py
 
 from flask import Flask, jsonify, request
-from transformers import pipeline
+from analysis_server.cpu_inference import build_sentiment_pipeline
 import requests
 import os
 
@@ -10,14 +10,17 @@ app = Flask(__name__)
 
 # 1) HuggingFace transformers 감성분석 파이프라인 로드
 #    (로컬에 모델이 없으면 최초에 다운로드되며, 이후 캐시)
-sentiment_analyzer = pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
+#    (CPU 모드 fp32/int8/onnx, 스레드, 최대 토큰은 환경변수로 제어 → cpu_inference.py)
+SENTIMENT_MODEL = "nlptown/bert-base-multilingual-uncased-sentiment"
+sentiment_analyzer = build_sentiment_pipeline(SENTIMENT_MODEL)
 
 # 2) 뉴스/공시 등 텍스트 수집 함수 (예: Finnhub, NewsAPI 등)
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")  # 부하테스트 시 로컬 스텁
 def fetch_news(symbol, count=5):
     # 예시: NewsAPI 를 사용
     url = (
-        f"https://newsapi.org/v2/everything?"
+        f"{NEWS_API_URL}?"
         f"q={symbol}&"
         f"language=en&"
         f"sortBy=publishedAt&"
@@ -30,16 +33,16 @@ def fetch_news(symbol, count=5):
     articles = resp.json().get("articles", [])
     return [a.get("title","") + ". " + a.get("description","") for a in articles]
 
-@app.route("/sentiment/<symbol>", methods=["GET"])
-def sentiment(symbol):
+def analyze_symbol(symbol):
     """
     1) symbol 에 대한 최신 뉴스 5건을 가져와
     2) 각 문장별 감성 점수를 계산한 뒤
-    3) 전체 평균 점수로 signal과 score 반환
+    3) 전체 평균 점수로 (signal, score) 반환
+    (REST 라우트와 백그라운드 워커(sentiment_worker.py) 공용)
     """
     texts = fetch_news(symbol, count=5)
     if not texts:
-        return jsonify(signal="neutral", score=0.0)
+        return "neutral", 0.0
 
     results = sentiment_analyzer(texts)
     # 모델의 label 예: "1 star" ~ "5 stars" (nlptown 모델 기준)
@@ -58,9 +61,18 @@ def sentiment(symbol):
     else:
         sig = "neutral"
 
-    return jsonify(signal=sig, score=round(avg,3))
+    return sig, round(avg, 3)
+
+@app.route("/sentiment/<symbol>", methods=["GET"])
+def sentiment(symbol):
+    sig, score = analyze_symbol(symbol)
+    return jsonify(signal=sig, score=score)
 
 if __name__ == "__main__":
+    # (옵션) SENTIMENT_PRECOMPUTE=1 이면 스냅샷 백그라운드 워커 동시 기동
+    if os.getenv("SENTIMENT_PRECOMPUTE", "0") == "1":
+        from analysis_server.sentiment_worker import start_background_worker
+        start_background_worker(analyze_symbol)
     # 5001 포트에서 실행
     app.run(host="0.0.0.0", port=5001)
 
@@ -7,13 +7,14 @@ app = Flask(__name__)
 
 # (환경변수로 NEWS_API_KEY 설정 권장)
 NEWS_API_KEY = os.getenv("NEWS_API_KEY", "")
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")  # 부하테스트 시 로컬 스텁
 
 def fetch_news(symbol):
     """NewsAPI.org 에서 최근 뉴스 타이틀+설명 가져오기"""
     if not NEWS_API_KEY:
         return []
     url = (
-        "https://newsapi.org/v2/everything"
+        f"{NEWS_API_URL}"
         f"?q={symbol}&language=en&pageSize=5&apiKey={NEWS_API_KEY}"
     )
     try:
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# cpu_inference.py
+# 감성분석 모델 CPU 추론 모드(분석 서버 공용)
+# • fp32(기본) / int8(동적 양자화) / onnx(onnxruntime) 선택
+# • intra-op / inter-op 스레드 수 명시(트레이드 서버와 코어 공유)
+# • 헤드라인 최대 토큰 수 truncation(옵션)
+# • fp32 대비 라벨 일치율 점검 + 배치 크기별 지연/메모리 벤치마크
+# ----------------------------------------
+
+import os
+import sys
+import time
+import argparse
+import resource
+
+# ─── 환경변수 설정(서버 재시작 시 적용) ─────────────────────────────────
+DEFAULT_MODEL             = "distilbert-base-uncased-finetuned-sst-2-english"  # pipeline 기본 모델
+SENTIMENT_CPU_MODE        = os.getenv("SENTIMENT_CPU_MODE", "fp32").lower()    # fp32 / int8 / onnx
+SENTIMENT_INTRA_OP_THREADS = int(os.getenv("SENTIMENT_INTRA_OP_THREADS", "0"))  # 0=라이브러리 기본값
+SENTIMENT_INTER_OP_THREADS = int(os.getenv("SENTIMENT_INTER_OP_THREADS", "0"))  # 0=라이브러리 기본값
+SENTIMENT_MAX_TOKENS      = int(os.getenv("SENTIMENT_MAX_TOKENS", "0"))        # 0=truncation 안함
+SENTIMENT_MIN_AGREEMENT   = float(os.getenv("SENTIMENT_MIN_AGREEMENT", "0.97")) # fp32 대비 최소 일치율
+
+CPU_MODES = ("fp32", "int8", "onnx")
+
+# 일치율/벤치마크 기본 입력(실제 운영 헤드라인 형태)
+SAMPLE_HEADLINES = [
+    "Apple shares climb after record iPhone sales beat estimates",
+    "Tesla recalls 120,000 vehicles over seat belt defect",
+    "Nvidia raises full-year guidance on surging data center demand",
+    "Boeing stock slides as FAA extends 737 MAX production cap",
+    "Microsoft announces $60 billion share buyback program",
+    "Regional bank shares tumble after deposit outflows",
+    "Amazon to cut 9,000 more jobs in cost-saving push",
+    "Pfizer wins FDA approval for new RSV vaccine",
+    "Intel misses revenue estimates, shares fall in after-hours trading",
+    "Meta posts strongest quarterly growth in two years",
+    "Oil prices steady as traders await OPEC+ decision",
+    "Netflix subscriber growth stalls amid password crackdown backlash",
+    "AMD unveils new AI chip to challenge Nvidia",
+    "Disney shares flat after mixed earnings report",
+    "Coinbase sued by SEC for operating unregistered exchange",
+    "Walmart lifts outlook as shoppers trade down to discount retailers",
+]
+
+# ─── 스레드 설정 ────────────────────────────────────────────────────────
+def configure_threads(intra: int = SENTIMENT_INTRA_OP_THREADS,
+                      inter: int = SENTIMENT_INTER_OP_THREADS):
+    """
+    torch intra-op / inter-op 스레드 수 고정
+    - 0 이하이면 해당 항목은 라이브러리 기본값 유지
+    - inter-op 설정은 첫 병렬 연산 이전에만 가능(이후 호출 시 무시)
+    """
+    import torch
+    if intra > 0:
+        torch.set_num_threads(intra)
+    if inter > 0:
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError as e:
+            print(f"[cpu_inference] inter-op 스레드 설정 무시: {e}")
+
+class _TruncatingPipeline:
+    """
+    pipeline 호출 래퍼: max_tokens > 0 이면 truncation/max_length 자동 지정
+    - 기존 호출부(sentiment_analyzer(texts)) 그대로 사용 가능
+    """
+    def __init__(self, pipe, max_tokens: int = 0, mode: str = "fp32"):
+        self.pipe = pipe
+        self.max_tokens = max_tokens
+        self.mode = mode
+
+    def __call__(self, texts, **kwargs):
+        if self.max_tokens > 0:
+            kwargs.setdefault("truncation", True)
+            kwargs.setdefault("max_length", self.max_tokens)
+        return self.pipe(texts, **kwargs)
+
+# ─── 파이프라인 생성 ────────────────────────────────────────────────────
+def build_sentiment_pipeline(model: str = DEFAULT_MODEL,
+                             mode: str = None,
+                             intra: int = None,
+                             inter: int = None,
+                             max_tokens: int = None):
+    """
+    [운영] CPU 전용 감성분석 파이프라인 생성
+    - mode: "fp32"(원본) / "int8"(torch 동적 양자화, Linear 계층) / "onnx"(optimum+onnxruntime)
+    - intra/inter: 스레드 수(미지정 시 환경변수 값)
+    - max_tokens: 헤드라인 최대 토큰 수(미지정 시 환경변수 값, 0=제한 없음)
+    [반환] pipeline과 동일하게 호출 가능한 객체
+    """
+    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
+
+    mode = (mode or SENTIMENT_CPU_MODE).lower()
+    if mode not in CPU_MODES:
+        raise ValueError(f"지원하지 않는 CPU 모드: {mode} (허용: {CPU_MODES})")
+    intra = SENTIMENT_INTRA_OP_THREADS if intra is None else intra
+    inter = SENTIMENT_INTER_OP_THREADS if inter is None else inter
+    max_tokens = SENTIMENT_MAX_TOKENS if max_tokens is None else max_tokens
+
+    if mode == "onnx":
+        try:
+            import onnxruntime as ort
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise RuntimeError("onnx 모드는 optimum[onnxruntime] 설치 필요") from e
+        so = ort.SessionOptions()
+        if intra > 0:
+            so.intra_op_num_threads = intra
+        if inter > 0:
+            so.inter_op_num_threads = inter
+        tok = AutoTokenizer.from_pretrained(model)
+        ort_model = ORTModelForSequenceClassification.from_pretrained(
+            model, export=True, provider="CPUExecutionProvider", session_options=so
+        )
+        pipe = pipeline("sentiment-analysis", model=ort_model, tokenizer=tok)
+        return _TruncatingPipeline(pipe, max_tokens, mode)
+
+    configure_threads(intra, inter)
+    if mode == "int8":
+        import torch
+        tok = AutoTokenizer.from_pretrained(model)
+        m = AutoModelForSequenceClassification.from_pretrained(model)
+        m.eval()
+        qm = torch.quantization.quantize_dynamic(m, {torch.nn.Linear}, dtype=torch.qint8)
+        pipe = pipeline("sentiment-analysis", model=qm, tokenizer=tok, device=-1)
+    else:
+        pipe = pipeline("sentiment-analysis", model=model, device=-1)
+    return _TruncatingPipeline(pipe, max_tokens, mode)
+
+# ─── fp32 대비 라벨 일치율 점검 ─────────────────────────────────────────
+def check_label_agreement(reference, candidate, texts=None,
+                          threshold: float = SENTIMENT_MIN_AGREEMENT):
+    """
+    [운영 게이트] 기준(fp32) 파이프라인과 후보 파이프라인의 라벨 일치율 비교
+    [반환] (일치율:float, 통과여부:bool, 불일치 목록:list[(text, ref_label, cand_label)])
+    """
+    texts = texts or SAMPLE_HEADLINES
+    ref = reference(texts)
+    cand = candidate(texts)
+    mismatches = [
+        (t, r["label"], c["label"]) for t, r, c in zip(texts, ref, cand) if r["label"] != c["label"]
+    ]
+    rate = 1.0 - len(mismatches) / max(len(texts), 1)
+    return rate, rate >= threshold, mismatches
+
+# ─── 지연/메모리 벤치마크 ───────────────────────────────────────────────
+def _rss_mb() -> float:
+    """현재 RSS(MB). /proc 미지원 환경은 최대 RSS로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def benchmark(pipe, texts=None, batch_sizes=(1, 4, 8, 16), repeats: int = 5):
+    """
+    [운영] 배치 크기별 추론 지연/메모리 측정
+    - 배치마다 1회 워밍업 후 repeats회 측정
+    [반환] dict 리스트: batch_size, p50_ms, mean_ms, per_text_ms, rss_mb, peak_rss_mb
+    """
+    texts = texts or SAMPLE_HEADLINES
+    rows = []
+    for bs in batch_sizes:
+        batch = (texts * (bs // len(texts) + 1))[:bs]
+        pipe(batch, batch_size=bs)
+        laps = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            pipe(batch, batch_size=bs)
+            laps.append((time.perf_counter() - t0) * 1000)
+        laps.sort()
+        mean = sum(laps) / len(laps)
+        rows.append({
+            "batch_size": bs,
+            "p50_ms": round(laps[len(laps) // 2], 2),
+            "mean_ms": round(mean, 2),
+            "per_text_ms": round(mean / bs, 2),
+            "rss_mb": round(_rss_mb(), 1),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        })
+    return rows
+
+def _load_texts(path: str):
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def _cli(argv=None) -> int:
+    p = argparse.ArgumentParser(description="감성분석 CPU 추론 모드 점검/벤치마크")
+    p.add_argument("command", choices=("check", "bench"))
+    p.add_argument("--model", default=DEFAULT_MODEL)
+    p.add_argument("--mode", default=SENTIMENT_CPU_MODE, choices=CPU_MODES)
+    p.add_argument("--intra", type=int, default=SENTIMENT_INTRA_OP_THREADS)
+    p.add_argument("--inter", type=int, default=SENTIMENT_INTER_OP_THREADS)
+    p.add_argument("--max-tokens", type=int, default=SENTIMENT_MAX_TOKENS)
+    p.add_argument("--texts", default="", help="헤드라인 파일(한 줄에 하나)")
+    p.add_argument("--threshold", type=float, default=SENTIMENT_MIN_AGREEMENT)
+    p.add_argument("--batch-sizes", default="1,4,8,16")
+    p.add_argument("--repeats", type=int, default=5)
+    a = p.parse_args(argv)
+
+    texts = _load_texts(a.texts)
+    cand = build_sentiment_pipeline(a.model, a.mode, a.intra, a.inter, a.max_tokens)
+
+    if a.command == "check":
+        ref = build_sentiment_pipeline(a.model, "fp32", a.intra, a.inter, 0)
+        rate, ok, mismatches = check_label_agreement(ref, cand, texts, a.threshold)
+        for t, r, c in mismatches:
+            print(f"  [MISMATCH] fp32={r} {a.mode}={c} :: {t}")
+        print(f"[check] mode={a.mode} agreement={rate:.3f} threshold={a.threshold} → {'OK' if ok else 'FAIL'}")
+        return 0 if ok else 1
+
+    sizes = tuple(int(x) for x in a.batch_sizes.split(",") if x)
+    print(f"[bench] model={a.model} mode={a.mode} intra={a.intra} inter={a.inter} max_tokens={a.max_tokens}")
+    for r in benchmark(cand, texts, sizes, a.repeats):
+        print(f"  bs={r['batch_size']:>3}  p50={r['p50_ms']:>8}ms  mean={r['mean_ms']:>8}ms  "
+              f"per_text={r['per_text_ms']:>7}ms  rss={r['rss_mb']}MB  peak={r['peak_rss_mb']}MB")
+    return 0
+
+if __name__ == "__main__":
+    # 예) python3 -m analysis_server.cpu_inference check --mode int8 --max-tokens 64
+    #     python3 -m analysis_server.cpu_inference bench --mode onnx --intra 2 --inter 1
+    sys.exit(_cli())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# loadtest.py
+# 분석 서버 3종 부하 테스트(/sentiment/{symbol})
+# • 대상: fastapi(ai_sentiment.py) / bert(ai_sentiment_service.py) / textblob(app.py)
+# • 뉴스 소스는 로컬 스텁(NewsAPI 형식, 종목별 고정 기사 5건) → 외부 네트워크/키 불필요
+# • 동시성(concurrency) × 요청률(rate, 0이면 closed-loop 최대 처리량) 조합별 측정
+# • 결과: 처리량, p50/p95/p99 지연, 에러율, 타임아웃율(트레이드 서버 클라이언트 2초 기준),
+#   서버 프로세스 CPU%(평균/최대)·RSS(최대)
+# • 지연은 "예정 송신 시각" 기준(open-loop 밀림까지 포함, coordinated omission 보정)
+# ----------------------------------------
+
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+CLIENT_TIMEOUT = 2.0   # trade_server/ai_sentiment_client.py 요청 timeout과 동일
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# 변형별 기동 명령(포트는 {port}로 치환)
+VARIANTS = {
+    "fastapi":  [sys.executable, "-m", "uvicorn", "analysis_server.ai_sentiment:app",
+                 "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning"],
+    "bert":     [sys.executable, "-m", "flask", "--app", "analysis_server.ai_sentiment_service",
+                 "run", "--host", "127.0.0.1", "--port", "{port}"],
+    "textblob": [sys.executable, "-m", "flask", "--app", "analysis_server.app",
+                 "run", "--host", "127.0.0.1", "--port", "{port}"],
+}
+
+_HEADLINES = [
+    ("{s} beats earnings estimates", "Revenue grew strongly and guidance was raised."),
+    ("{s} shares slip after downgrade", "Analysts cited weaker margins and slowing demand."),
+    ("{s} announces new product line", "The company expects the launch to expand its market."),
+    ("Regulators open probe into {s}", "The investigation may delay several pending deals."),
+    ("{s} holds annual investor day", "Management reiterated its long-term targets."),
+]
+
+# ── 뉴스 스텁 ────────────────────────────────────────────────────────────
+class _NewsStubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        sym = (q.get("q") or ["UNKNOWN"])[0]
+        n = int((q.get("pageSize") or ["5"])[0])
+        off = sum(map(ord, sym)) % len(_HEADLINES)
+        arts = [{"title": t.format(s=sym), "description": d}
+                for t, d in (_HEADLINES[(off + i) % len(_HEADLINES)] for i in range(n))]
+        if self.delay:
+            time.sleep(self.delay)
+        body = json.dumps({"status": "ok", "articles": arts}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_news_stub(port: int = 0, delay: float = 0.0):
+    """
+    NewsAPI 형식 로컬 스텁 기동(데몬 스레드)
+    - delay: 응답 지연(초, 실제 뉴스 API 지연 모사)
+    [반환] (server, url)  → 서버 변형에 NEWS_API_URL=url 로 전달
+    """
+    handler = type("NewsStub", (_NewsStubHandler,), {"delay": delay})
+    srv = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}/v2/everything"
+
+# ── 서버 프로세스 ────────────────────────────────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_variant(name: str, news_url: str, port: int = 0, env: dict = None):
+    """
+    서버 변형 기동 → (Popen, base_url)
+    - stderr는 임시파일로(요청마다 쓰는 werkzeug 접근 로그가 파이프 버퍼를 채워 서버가 멈추지 않도록)
+      → proc.log 에 파일 객체, 종료 시 마지막 부분만 오류 메시지로 사용
+    """
+    port = port or _free_port()
+    cmd = [c.replace("{port}", str(port)) for c in VARIANTS[name]]
+    e = {**os.environ, "NEWS_API_URL": news_url, "NEWS_API_KEY": "stub",
+         "PYTHONPATH": BASE_DIR, **(env or {})}
+    log = tempfile.TemporaryFile(prefix=f"loadtest-{name}-")
+    proc = subprocess.Popen(cmd, cwd=BASE_DIR, env=e, stdout=subprocess.DEVNULL, stderr=log)
+    proc.log = log
+    return proc, f"http://127.0.0.1:{port}"
+
+def _log_tail(proc, size: int = 2000) -> str:
+    log = getattr(proc, "log", None)
+    if log is None:
+        return ""
+    log.seek(max(0, os.fstat(log.fileno()).st_size - size))
+    return log.read().decode(errors="replace")
+
+def wait_ready(base_url: str, proc=None, timeout: float = 300.0) -> float:
+    """첫 정상 응답까지 대기(모델 로드 포함) [반환] 준비 소요초"""
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < timeout:
+        if proc is not None and proc.poll() is not None:
+            err = _log_tail(proc)
+            raise RuntimeError(f"서버 종료(code={proc.returncode}): {err}")
+        try:
+            if requests.get(f"{base_url}/sentiment/WARMUP", timeout=30).status_code == 200:
+                return time.monotonic() - t0
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"서버 준비 시간 초과: {base_url}")
+
+def stop_variant(proc):
+    if proc is None:
+        return
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    if getattr(proc, "log", None) is not None:
+        proc.log.close()
+
+# ── 자원 사용량 샘플러(/proc, Linux) ──────────────────────────────────────
+class ProcSampler:
+    """
+    프로세스(+자식) CPU%/RSS 주기 샘플링(/proc 기반, psutil 불필요)
+    - CPU% 는 코어 1개 = 100%
+    """
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu = []
+        self.rss = []
+        self._stop = threading.Event()
+        self._tick = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+        self._page = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._thread = None
+
+    def _pids(self) -> list:
+        out, stack = [], [self.pid]
+        while stack:
+            p = stack.pop()
+            out.append(p)
+            try:
+                with open(f"/proc/{p}/task/{p}/children") as f:
+                    stack += [int(c) for c in f.read().split()]
+            except OSError:
+                pass
+        return out
+
+    def _read(self):
+        ticks = rss = 0
+        for p in self._pids():
+            try:
+                with open(f"/proc/{p}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+                ticks += int(fields[11]) + int(fields[12])          # utime + stime
+                rss += int(fields[21]) * self._page
+            except (OSError, IndexError, ValueError):
+                continue
+        return ticks, rss
+
+    def _run(self):
+        prev_t, (prev_ticks, _) = time.monotonic(), self._read()
+        while not self._stop.wait(self.interval):
+            now, (ticks, rss) = time.monotonic(), self._read()
+            self.cpu.append(100.0 * (ticks - prev_ticks) / self._tick / (now - prev_t))
+            self.rss.append(rss)
+            prev_t, prev_ticks = now, ticks
+
+    def start(self):
+        if os.path.exists(f"/proc/{self.pid}/stat"):
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if not self.cpu:
+            return {"cpu_avg": None, "cpu_max": None, "rss_max_mb": None}
+        return {"cpu_avg": round(sum(self.cpu) / len(self.cpu), 1),
+                "cpu_max": round(max(self.cpu), 1),
+                "rss_max_mb": round(max(self.rss) / 2**20, 1)}
+
+# ── 부하 생성 ────────────────────────────────────────────────────────────
+def _percentile(sorted_vals: list, p: float):
+    if not sorted_vals:
+        return None
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+def run_load(base_url: str, symbols: list, concurrency: int = 8, rate: float = 0.0,
+             duration: float = 30.0, timeout: float = CLIENT_TIMEOUT) -> dict:
+    """
+    /sentiment/{symbol} 부하 1회
+    - concurrency: 동시 요청 수(워커 스레드, 스레드별 세션)
+    - rate: 초당 요청 수(open-loop, 예정 시각 기준 지연 측정). 0이면 closed-loop(쉬지 않고 연속 요청)
+    - timeout: 요청 timeout(초), 초과는 에러가 아닌 타임아웃으로 집계
+    [반환] dict: requests, ok, errors, timeouts, throughput, p50/p95/p99(ms), error_rate, timeout_rate
+    """
+    local = threading.local()
+    lock = threading.Lock()
+    lat, counts = [], {"ok": 0, "errors": 0, "timeouts": 0}
+
+    def one(symbol: str, scheduled: float):
+        s = getattr(local, "session", None)
+        if s is None:
+            s = local.session = requests.Session()
+        kind = "ok"
+        try:
+            r = s.get(f"{base_url}/sentiment/{symbol}", timeout=timeout)
+            if r.status_code != 200:
+                kind = "errors"
+            else:
+                r.json()
+        except requests.Timeout:
+            kind = "timeouts"
+        except (requests.RequestException, ValueError):
+            kind = "errors"
+        elapsed = time.monotonic() - scheduled
+        with lock:
+            counts[kind] += 1
+            if kind == "ok":
+                lat.append(elapsed)
+
+    t0 = time.monotonic()
+    end = t0 + duration
+    sent = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        if rate > 0:
+            interval = 1.0 / rate
+            while True:
+                scheduled = t0 + sent * interval
+                if scheduled >= end:
+                    break
+                delay = scheduled - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                ex.submit(one, symbols[sent % len(symbols)], scheduled)
+                sent += 1
+        else:
+            def loop(offset: int):
+                i = offset
+                while time.monotonic() < end:
+                    one(symbols[i % len(symbols)], time.monotonic())
+                    i += concurrency
+            futs = [ex.submit(loop, w) for w in range(concurrency)]
+            for f in futs:
+                f.result()
+    wall = time.monotonic() - t0
+    total = sum(counts.values())
+    lat.sort()
+    ms = lambda v: None if v is None else round(v * 1000, 1)
+    return {
+        "requests": total, **counts,
+        "throughput": round(counts["ok"] / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": ms(_percentile(lat, 50)), "p95_ms": ms(_percentile(lat, 95)),
+        "p99_ms": ms(_percentile(lat, 99)),
+        "error_rate": round(counts["errors"] / total, 4) if total else 0.0,
+        "timeout_rate": round(counts["timeouts"] / total, 4) if total else 0.0,
+        "wall_sec": round(wall, 2),
+    }
+
+def load_symbols(n: int = 100) -> list:
+    """shared_data/universe.csv(Top100) 우선, 없으면 가상 종목 SYM000…"""
+    from analysis_server.sentiment_worker import load_target_symbols
+    syms = load_target_symbols()
+    return syms[:n] if syms else [f"SYM{i:03d}" for i in range(n)]
+
+def benchmark_variant(name: str, symbols: list, levels: list, duration: float,
+                      timeout: float = CLIENT_TIMEOUT, news_delay: float = 0.0,
+                      base_url: str = None, pid: int = None) -> list:
+    """
+    서버 변형 1개: 기동 → 준비 대기 → (concurrency, rate) 조합별 부하 + 자원 측정 → 종료
+    - base_url 지정 시 이미 떠 있는 서버 대상(pid 지정 시 해당 프로세스 자원 측정)
+    [반환] 조합별 결과 dict 리스트
+    """
+    stub, news_url = start_news_stub(delay=news_delay)
+    proc = None
+    try:
+        if base_url is None:
+            proc, base_url = start_variant(name, news_url)
+            pid = proc.pid
+        ready = wait_ready(base_url, proc)
+        rows = []
+        for conc, rate in levels:
+            sampler = ProcSampler(pid).start() if pid else None
+            res = run_load(base_url, symbols, conc, rate, duration, timeout)
+            usage = sampler.stop() if sampler else {"cpu_avg": None, "cpu_max": None, "rss_max_mb": None}
+            rows.append({"variant": name, "concurrency": conc, "rate": rate,
+                         "ready_sec": round(ready, 1), **res, **usage})
+            print(format_row(rows[-1]), flush=True)
+        return rows
+    finally:
+        stop_variant(proc)
+        stub.shutdown()
+
+_COLS = ("variant", "concurrency", "rate", "requests", "throughput", "p50_ms", "p95_ms", "p99_ms",
+         "error_rate", "timeout_rate", "cpu_avg", "cpu_max", "rss_max_mb")
+
+def format_header() -> str:
+    return "  ".join(f"{c:>12}" for c in _COLS)
+
+def format_row(r: dict) -> str:
+    return "  ".join(f"{'-' if r.get(c) is None else r[c]!s:>12}" for c in _COLS)
+
+if __name__ == "__main__":
+    # 예) 3종 비교:  python3 -m analysis_server.loadtest --concurrency 1,8,32 --duration 30
+    #     요청률 고정: python3 -m analysis_server.loadtest --variants textblob --concurrency 16 --rate 50
+    #     기동 중 서버: python3 -m analysis_server.loadtest --variants bert --url http://127.0.0.1:5001 --pid 1234
+    import argparse
+    p = argparse.ArgumentParser(description="분석 서버 /sentiment 부하 테스트")
+    p.add_argument("--variants", default=",".join(VARIANTS), help="쉼표 구분: fastapi,bert,textblob")
+    p.add_argument("--concurrency", default="8", help="쉼표 구분 동시성 목록")
+    p.add_argument("--rate", default="0", help="쉼표 구분 초당 요청 수 목록(0=closed-loop)")
+    p.add_argument("--duration", type=float, default=30.0, help="조합별 측정 시간(초)")
+    p.add_argument("--timeout", type=float, default=CLIENT_TIMEOUT, help="요청 timeout(초)")
+    p.add_argument("--symbols", type=int, default=100, help="요청 종목 수(Top100 팬아웃)")
+    p.add_argument("--news-delay", type=float, default=0.0, help="뉴스 스텁 응답 지연(초)")
+    p.add_argument("--url", help="이미 기동된 서버 주소(변형 1개만)")
+    p.add_argument("--pid", type=int, help="--url 서버 프로세스 pid(자원 측정)")
+    p.add_argument("--json", help="결과 JSON 저장 경로")
+    a = p.parse_args()
+
+    names = [v.strip() for v in a.variants.split(",") if v.strip()]
+    unknown = [v for v in names if v not in VARIANTS]
+    if unknown:
+        p.error(f"알 수 없는 변형: {unknown}")
+    if a.url and len(names) != 1:
+        p.error("--url 은 변형 1개와 함께 사용")
+    levels = [(int(c), float(r)) for c in a.concurrency.split(",") for r in a.rate.split(",")]
+    symbols = load_symbols(a.symbols)
+
+    print(format_header())
+    results = []
+    for name in names:
+        try:
+            results += benchmark_variant(name, symbols, levels, a.duration, a.timeout,
+                                         a.news_delay, a.url, a.pid)
+        except Exception as e:
+            print(f"[{name}] 실패: {e}", flush=True)
+    if a.json:
+        with open(a.json, "w") as f:
+            json.dump(results, f, indent=2)
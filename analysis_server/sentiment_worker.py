@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# sentiment_worker.py
+# 감성 점수 백그라운드 사전계산 워커(분석 서버)
+# • 대상: shared_data/universe.csv(Top100) + positions.csv(보유 open 종목)
+# • SENTIMENT_REFRESH_SEC 주기로 전체 재계산 → sentiment_snapshot.bin 원자적 발행
+# • 종목별 updated_at 기록(트레이드 서버가 SENTIMENT_MAX_AGE_SEC로 만료 판단)
+# • 실패 종목은 이전 점수/시각 유지(만료 판단은 읽는 쪽 책임)
+# ----------------------------------------
+
+import os
+import csv
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from common.sentiment_snapshot import write_snapshot, read_snapshot
+
+BASE_DIR        = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SHARED_DATA_DIR = os.getenv("SHARED_DATA_DIR", os.path.join(BASE_DIR, "shared_data"))
+UNIVERSE_FILE   = os.path.join(SHARED_DATA_DIR, "universe.csv")
+POSITIONS_FILE  = os.path.join(SHARED_DATA_DIR, "positions.csv")
+SNAPSHOT_FILE   = os.path.join(SHARED_DATA_DIR, "sentiment_snapshot.bin")
+
+SENTIMENT_REFRESH_SEC    = float(os.getenv("SENTIMENT_REFRESH_SEC", "300"))  # 5분 스크리닝 주기
+SENTIMENT_WORKER_THREADS = int(os.getenv("SENTIMENT_WORKER_THREADS", "4"))  # 뉴스 조회 병렬도
+
+def load_target_symbols(universe_file: str = UNIVERSE_FILE,
+                        positions_file: str = POSITIONS_FILE) -> list[str]:
+    """Top100(universe.csv) + 보유(open) 종목, 중복 제거/순서 유지"""
+    out = []
+    if os.path.exists(universe_file):
+        with open(universe_file, newline="") as f:
+            out += [r["symbol"] for r in csv.DictReader(f) if r.get("symbol")]
+    if os.path.exists(positions_file):
+        with open(positions_file, newline="") as f:
+            out += [r["symbol"] for r in csv.DictReader(f)
+                    if r.get("symbol") and r.get("status", "open") in ("open", "")]
+    return list(dict.fromkeys(out))
+
+def refresh_once(scorer, entries: dict, symbols: list[str],
+                 snapshot_file: str = SNAPSHOT_FILE,
+                 threads: int = SENTIMENT_WORKER_THREADS) -> int:
+    """
+    [운영] 대상 종목 1회 재계산 후 스냅샷 발행
+    - scorer(symbol) → (signal, score)
+    - entries: 이전 점수 dict(제자리 갱신), 대상에서 빠진 종목은 제거
+    [반환] 이번 회차 갱신 성공 종목 수
+    """
+    def _score(sym):
+        try:
+            sig, score = scorer(sym)
+            return sym, (sig, float(score), time.time())
+        except Exception as e:
+            print(f"[sentiment_worker] {sym} 분석 실패: {e}")
+            return sym, None
+
+    with ThreadPoolExecutor(max_workers=max(1, threads)) as ex:
+        results = list(ex.map(_score, symbols))
+
+    ok = 0
+    for sym, entry in results:
+        if entry is not None:
+            entries[sym] = entry
+            ok += 1
+    for sym in set(entries) - set(symbols):
+        del entries[sym]
+    write_snapshot(snapshot_file, entries)
+    return ok
+
+def run_forever(scorer, interval: float = SENTIMENT_REFRESH_SEC,
+                snapshot_file: str = SNAPSHOT_FILE, stop_event: threading.Event = None):
+    """주기 실행 루프(stop_event 설정 시 종료). 회차 소요시간만큼 대기시간 차감"""
+    stop_event = stop_event or threading.Event()
+    entries = read_snapshot(snapshot_file)
+    while not stop_event.is_set():
+        t0 = time.monotonic()
+        symbols = load_target_symbols()
+        try:
+            ok = refresh_once(scorer, entries, symbols, snapshot_file)
+            print(f"[sentiment_worker] 발행 {ok}/{len(symbols)} ({time.monotonic() - t0:.1f}s)")
+        except Exception as e:
+            print(f"[sentiment_worker] 회차 실패: {e}")
+        stop_event.wait(max(0.0, interval - (time.monotonic() - t0)))
+
+def start_background_worker(scorer, interval: float = SENTIMENT_REFRESH_SEC) -> threading.Event:
+    """분석 서버 프로세스 내 데몬 스레드로 기동. 반환된 Event.set()으로 종료"""
+    stop = threading.Event()
+    threading.Thread(target=run_forever, args=(scorer, interval, SNAPSHOT_FILE, stop),
+                     name="sentiment-worker", daemon=True).start()
+    return stop
+
+if __name__ == "__main__":
+    # 단독 실행: python3 -m analysis_server.sentiment_worker
+    from analysis_server.ai_sentiment_service import analyze_symbol
+    run_forever(analyze_symbol)
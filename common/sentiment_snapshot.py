@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# sentiment_snapshot.py
+# 감성 점수 스냅샷(shared_data/sentiment_snapshot.bin) 포맷/쓰기/읽기
+# • 분석 서버 워커가 원자적으로 발행(tmp 작성 → os.replace)
+# • 트레이드 서버는 mmap으로 읽기만(네트워크 호출 없음, 조회 수 µs)
+# • 표준 라이브러리만 사용(common/: 양쪽 서버가 서로를 import하지 않고 공유)
+# ----------------------------------------
+
+import os
+import mmap
+import time
+import struct
+
+# 헤더: magic(8) / version(u32) / count(u32) / published_at(f8, epoch)
+HEADER = struct.Struct("<8sIId")
+# 레코드: symbol(16, NUL 패딩) / signal(i8) / pad(7) / score(f8) / updated_at(f8, epoch)
+RECORD = struct.Struct("<16sb7xdd")
+MAGIC = b"SNTSNAP1"
+VERSION = 1
+
+SIGNAL_CODES = {"negative": -1, "neutral": 0, "positive": 1}
+CODE_SIGNALS = {v: k for k, v in SIGNAL_CODES.items()}
+
+def write_snapshot(path: str, entries: dict, published_at: float = None):
+    """
+    [운영] 감성 스냅샷 원자적 발행
+    - entries: {symbol: (signal, score, updated_at)}
+    - 같은 디렉토리에 임시파일 작성 후 fsync → os.replace(읽는 쪽은 항상 완전한 파일만 봄)
+    """
+    published_at = time.time() if published_at is None else published_at
+    buf = bytearray(HEADER.size + RECORD.size * len(entries))
+    HEADER.pack_into(buf, 0, MAGIC, VERSION, len(entries), published_at)
+    off = HEADER.size
+    for sym, (sig, score, ts) in sorted(entries.items()):
+        RECORD.pack_into(buf, off, sym.encode("ascii")[:16], SIGNAL_CODES.get(sig, 0), float(score), float(ts))
+        off += RECORD.size
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(buf)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def read_snapshot(path: str) -> dict:
+    """스냅샷 전체를 dict로 로드(워커 재시작 시 이전 점수 유지용). 없거나 손상 시 빈 dict"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, count, _ = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            return {}
+        out = {}
+        for i in range(count):
+            sym, code, score, ts = RECORD.unpack_from(data, HEADER.size + i * RECORD.size)
+            out[sym.rstrip(b"\0").decode("ascii")] = (CODE_SIGNALS.get(code, "neutral"), score, ts)
+        return out
+    except (OSError, struct.error):
+        return {}
+
+class SnapshotReader:
+    """
+    [운영] mmap 기반 스냅샷 리더(트레이드 경로 전용)
+    - 파일 교체 여부는 check_interval(초)마다 stat으로만 확인
+    - 교체 감지 시 새 파일을 다시 mmap하고 symbol→offset 인덱스 재구성
+    - get(): dict 조회 + unpack_from 1회(µs 단위)
+    """
+    def __init__(self, path: str, check_interval: float = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._state = (None, {})   # (mmap, symbol→offset) 한 번에 교체
+        self._stamp = None
+        self._checked = 0.0
+        self.published_at = 0.0
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._state, self._stamp = (None, {}), None
+            return
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp or st.st_size < HEADER.size:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, count, published_at = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION or len(mm) < HEADER.size + count * RECORD.size:
+                mm.close()
+                return
+            index = {}
+            for i in range(count):
+                off = HEADER.size + i * RECORD.size
+                index[bytes(mm[off:off + 16]).rstrip(b"\0").decode("ascii")] = off
+        except (OSError, ValueError, struct.error) as e:
+            print(f"[sentiment_snapshot] 스냅샷 로드 실패: {e}")
+            return
+        # 이전 매핑은 참조가 사라지면 GC가 해제(조회 중인 스레드 안전)
+        self._state, self._stamp = (mm, index), stamp
+        self.published_at = published_at
+
+    def available(self) -> bool:
+        self._maybe_reload()
+        return self._state[0] is not None
+
+    def get(self, symbol: str):
+        """[반환] (signal, score, updated_at) 또는 None(스냅샷/종목 없음)"""
+        self._maybe_reload()
+        mm, index = self._state
+        off = index.get(symbol)
+        if off is None:
+            return None
+        _, code, score, ts = RECORD.unpack_from(mm, off)
+        return CODE_SIGNALS.get(code, "neutral"), score, ts
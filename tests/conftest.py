@@ -0,0 +1,10 @@
+import os
+import sys
+
+# trade_server.config는 import 시 Alpaca REST 객체를 만듦 → 더미 키(테스트는 네트워크 호출 없음)
+os.environ.setdefault("APCA_PAPER_API_KEY_ID", "test")
+os.environ.setdefault("APCA_PAPER_API_SECRET_KEY", "test")
+os.environ.setdefault("TRADE_MODE", "paper")
+os.environ.setdefault("DECISION_JOURNAL", "0")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
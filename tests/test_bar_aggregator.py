@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_server.bar_aggregator import BarAggregator
+
+def _minutes(n=2880, start="2026-10-14 08:00", seed=0):
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(start, periods=n, freq="1min", tz="UTC")
+    ts = ts[np.sort(rng.choice(n, size=n * 3 // 4, replace=False))]   # 빈 분/세션 공백 포함
+    c = 100 + rng.standard_normal(len(ts)).cumsum()
+    return pd.DataFrame({"timestamp": ts, "Open": c, "High": c + rng.random(len(ts)),
+                         "Low": c - rng.random(len(ts)), "Close": c + 0.1,
+                         "Volume": rng.integers(1, 1000, len(ts)).astype(float)})
+
+def _loop(df, maxlen):
+    # 기준: 1분봉을 하나씩 on_bar로 반영(증분 경로)
+    agg = BarAggregator(maxlen=maxlen)
+    for r in df.itertuples(index=False):
+        agg.on_bar("A", r.timestamp, r.Open, r.High, r.Low, r.Close, r.Volume)
+    return agg
+
+@pytest.mark.parametrize("maxlen,chunks", [(5000, 1), (50, 1), (5000, 7), (3, 5)])
+def test_bulk_ingest_matches_bar_by_bar(maxlen, chunks):
+    df = _minutes()
+    bulk = BarAggregator(maxlen=maxlen)
+    for part in np.array_split(np.arange(len(df)), chunks):
+        # 겹치는 구간 재조회도 새 봉만 반영
+        bulk.ingest("A", df.iloc[max(0, part[0] - 10):part[-1] + 1])
+    ref = _loop(df, maxlen)
+    for tf in ("1Min", "5Min", "15Min", "1Day", "1Hour"):
+        pd.testing.assert_frame_equal(bulk.get_bars("A", tf), ref.get_bars("A", tf))
+    assert bulk.session("A") == ref.session("A")
+    assert bulk.prev_close_map("A") == ref.prev_close_map("A")
+
+def test_prev_close_values_maps_each_row_to_prior_session():
+    df = _minutes()
+    agg = BarAggregator()
+    agg.ingest("A", df)
+    day = df["timestamp"].dt.date
+    expected = day.map(df.groupby(day)["Close"].last().shift(1).to_dict()).astype("float64")
+    np.testing.assert_array_equal(agg.prev_close_values("A", df["timestamp"]), expected.to_numpy())
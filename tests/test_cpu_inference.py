@@ -0,0 +1,50 @@
+import pytest
+
+from analysis_server import cpu_inference
+from analysis_server.cpu_inference import SAMPLE_HEADLINES, SENTIMENT_MIN_AGREEMENT, check_label_agreement
+
+SCORE_TOLERANCE = 0.05   # 라벨 일치 헤드라인의 fp32/int8 점수 차 허용치
+
+class _FakePipe:
+    """고정 입력 → 고정 라벨(flip에 든 인덱스만 반대 라벨)"""
+    def __init__(self, flip=()):
+        self.flip = set(flip)
+
+    def __call__(self, texts, **kw):
+        out = []
+        for i, t in enumerate(texts):
+            pos = ("climb" in t or "raises" in t) != (i in self.flip)
+            out.append({"label": "POSITIVE" if pos else "NEGATIVE", "score": 0.9})
+        return out
+
+def test_agreement_gate_on_fixed_headlines():
+    ref = _FakePipe()
+    rate, ok, mismatches = check_label_agreement(ref, _FakePipe(), threshold=SENTIMENT_MIN_AGREEMENT)
+    assert (rate, ok, mismatches) == (1.0, True, [])
+
+    # 16개 중 1개 불일치 = 0.9375 → 기본 임계값(0.97) 미달
+    rate, ok, mismatches = check_label_agreement(ref, _FakePipe(flip=[0]), threshold=SENTIMENT_MIN_AGREEMENT)
+    assert rate == pytest.approx(1 - 1 / len(SAMPLE_HEADLINES)) and not ok
+    assert mismatches == [(SAMPLE_HEADLINES[0], "POSITIVE", "NEGATIVE")]
+
+def test_check_command_exits_nonzero_below_threshold(monkeypatch, capsys):
+    pipes = {"fp32": _FakePipe(), "int8": _FakePipe(flip=[1])}
+    monkeypatch.setattr(cpu_inference, "build_sentiment_pipeline", lambda model, mode, *a: pipes[mode])
+    assert cpu_inference._cli(["check", "--mode", "int8"]) == 1
+    assert "[MISMATCH]" in capsys.readouterr().out
+    assert cpu_inference._cli(["check", "--mode", "int8", "--threshold", "0.9"]) == 0
+
+def test_int8_matches_fp32_on_sample_headlines():
+    # 실제 양자화 경로(torch/transformers + 모델 다운로드 가능할 때만)
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    try:
+        ref = cpu_inference.build_sentiment_pipeline(mode="fp32", max_tokens=0)
+        cand = cpu_inference.build_sentiment_pipeline(mode="int8", max_tokens=0)
+    except OSError as e:
+        pytest.skip(f"모델 로드 불가: {e}")
+    rate, ok, mismatches = check_label_agreement(ref, cand, SAMPLE_HEADLINES, SENTIMENT_MIN_AGREEMENT)
+    assert ok, mismatches
+    for r, c in zip(ref(SAMPLE_HEADLINES), cand(SAMPLE_HEADLINES)):
+        if r["label"] == c["label"]:
+            assert abs(r["score"] - c["score"]) <= SCORE_TOLERANCE
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from trade_server import buy_strategies, main_trading
+from trade_server.decision_journal import REASON_BLOCKED, REASON_INSUFFICIENT, REASON_NO_SIGNAL
+
+def _bars(n):
+    c = 100 + np.arange(n, dtype=float) * 0.01
+    return pd.DataFrame({"Open": c, "High": c + 0.1, "Low": c - 0.1, "Close": c, "Volume": np.full(n, 1000.0)})
+
+@pytest.fixture
+def journal(monkeypatch):
+    rows = []
+    monkeypatch.setattr(main_trading.JOURNAL, "record",
+                        lambda symbol, strategy, outcome, reason, f=None, *a, **kw: rows.append((outcome, reason, f)))
+    return rows
+
+@pytest.mark.parametrize("n", [5, 40])   # 지표 없음(봉 부족)/있음 모두 시간대 차단이 우선
+def test_market_stage_is_journaled_as_blocked(monkeypatch, journal, n):
+    monkeypatch.setattr(buy_strategies, "market_allows_entry", lambda: False)
+    out = main_trading.evaluate_entries("AAPL", fetch=lambda s: _bars(n))
+    assert out[main_trading.DEFAULT_STRATEGY.name] == (None, "진입 시간대 아님")
+    assert [(o, r) for o, r, _ in journal] == [(False, REASON_BLOCKED)]
+
+def test_insufficient_bars_in_session_are_journaled_as_insufficient(monkeypatch, journal):
+    monkeypatch.setattr(buy_strategies, "market_allows_entry", lambda: True)
+    main_trading.evaluate_entries("AAPL", fetch=lambda s: _bars(5))
+    assert [(o, r, f) for o, r, f in journal] == [(False, REASON_INSUFFICIENT, None)]
+
+def test_conditions_stage_keeps_features(monkeypatch, journal):
+    monkeypatch.setattr(buy_strategies, "market_allows_entry", lambda: True)
+    main_trading.evaluate_entries("AAPL", fetch=lambda s: _bars(40))
+    (outcome, reason, f), = journal
+    assert (outcome, reason) == (False, REASON_NO_SIGNAL) and f["ma20"] > 0
@@ -0,0 +1,46 @@
+from trade_server.notifier import AlertDispatcher, StubSink
+
+class _BrokenSink:
+    name = "broken"
+
+    def send(self, text):
+        raise OSError("down")
+
+def _overflow(d, n):
+    # 스레드 기동 전 적재 → 큐 상한 초과분이 결정적으로 스필/폐기 경로로
+    for i in range(n):
+        d.send(f"m{i}")
+
+def test_overflow_is_spilled_and_reported_in_digest(tmp_path):
+    spill = tmp_path / "alerts_spill.log"
+    stub = StubSink()
+    d = AlertDispatcher([stub], interval=60, maxsize=3, spill_path=str(spill))
+    _overflow(d, 5)
+    assert (d.spilled, d.dropped) == (2, 0)
+    assert [line.split("] ", 1)[1] for line in spill.read_text().splitlines()] == ["m3", "m4"]
+
+    d.start().flush(timeout=2)
+    assert stub.sent == [f"[알림 3건]\nm0\nm1\nm2\n(큐 초과 2건 → {spill})"]
+    assert d.spilled == 0 and d.sent_digests == 1
+
+def test_overflow_without_spill_is_dropped_and_counted():
+    stub = StubSink()
+    d = AlertDispatcher([stub], interval=60, maxsize=2)
+    _overflow(d, 4)
+    assert (d.spilled, d.dropped) == (0, 2)
+    d.start().flush(timeout=2)
+    assert stub.sent == ["[알림 2건]\nm0\nm1\n(큐 초과 2건 폐기)"]
+
+def test_digest_truncates_and_failing_sink_is_isolated():
+    stub = StubSink()
+    d = AlertDispatcher([_BrokenSink(), stub], interval=60, maxsize=100, max_digest_lines=2)
+    _overflow(d, 5)
+    d.start().flush(timeout=2)
+    assert stub.sent == ["[알림 5건]\nm0\nm1\n... 외 3건"]
+
+def test_single_message_is_sent_as_is():
+    stub = StubSink()
+    d = AlertDispatcher([stub], interval=0.05).start()
+    d.send("체결")
+    d.flush(timeout=2)
+    assert stub.sent == ["체결"]
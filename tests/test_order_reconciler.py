@@ -0,0 +1,137 @@
+import json
+
+import pandas as pd
+import pytest
+
+from trade_server.order_reconciler import OrderReconciler, FakeTradeStream
+from trade_server.position_manager import add_position, load_positions
+
+def _order(oid="o1", symbol="AAPL", side="buy", qty=10, filled=0, avg=0.0, status="new"):
+    return {"id": oid, "symbol": symbol, "side": side, "qty": qty, "filled_qty": filled,
+            "filled_avg_price": avg, "status": status, "submitted_at": "2026-10-19T14:30:00Z"}
+
+@pytest.fixture
+def files(tmp_path):
+    return {"positions_file": str(tmp_path / "positions.csv"), "trades_file": str(tmp_path / "trades.csv"),
+            "state_file": str(tmp_path / "reconciler_state.json")}
+
+@pytest.fixture
+def rec(files):
+    r = OrderReconciler(**files)
+    stream = r.attach(FakeTradeStream())
+    return r, stream
+
+def _trades(files):
+    return pd.read_csv(files["trades_file"]).fillna({"reason": ""})
+
+def _state(files):
+    with open(files["state_file"]) as f:
+        return json.load(f)
+
+def _pos(files, symbol="AAPL"):
+    df = load_positions(files["positions_file"])
+    return df[df["symbol"] == symbol].iloc[0]
+
+def test_partial_then_fill_applies_each_delta(rec, files):
+    r, stream = rec
+    r.track(_order(), "entry")
+    assert "o1" in _state(files)["orders"]
+
+    stream.emit("partial_fill", _order(filled=4, avg=10.0, status="partially_filled"), price=10.0, qty=4)
+    assert _state(files)["orders"]["o1"]["filled"] == 4
+    assert float(_pos(files)["qty"]) == 4
+
+    stream.emit("fill", _order(filled=10, avg=10.6, status="filled"), price=11.0, qty=6)
+    t = _trades(files)
+    assert t[["side", "qty", "price", "reason"]].values.tolist() == [["buy", 4, 10.0, "entry"],
+                                                                    ["buy", 6, 11.0, "entry"]]
+    p = _pos(files)
+    assert float(p["qty"]) == 10 and float(p["entry_price"]) == pytest.approx(10.6)
+    st = _state(files)
+    assert st["orders"] == {} and st["done"] == {"o1": 10}
+    assert not r.has_open_order("AAPL")
+
+def test_cancel_applies_fills_missing_from_the_stream(rec, files):
+    r, stream = rec
+    r.track(_order(), "entry")
+    stream.emit("partial_fill", _order(filled=3, avg=10.0, status="partially_filled"), price=10.0, qty=3)
+    # 2주 부분 체결 이벤트 유실 → canceled 스냅샷(누적 5주)으로 보충
+    stream.emit("canceled", _order(filled=5, avg=10.4, status="canceled"))
+    assert _trades(files)["qty"].tolist() == [3, 2]
+    assert float(_pos(files)["qty"]) == 5
+    assert _state(files)["orders"] == {} and not r.has_open_order("AAPL", "buy")
+
+def test_out_of_order_events_are_not_applied_twice(rec, files):
+    r, stream = rec
+    r.track(_order(), "entry")
+    stream.emit("fill", _order(filled=10, avg=10.0, status="filled"), price=10.0, qty=10)
+    # 종결 후 늦게 도착한 부분 체결/신규 이벤트는 무시
+    stream.emit("partial_fill", _order(filled=4, avg=10.0, status="partially_filled"), price=10.0, qty=4)
+    stream.emit("new", _order())
+    assert _trades(files)["qty"].tolist() == [10]
+    assert float(_pos(files)["qty"]) == 10
+    assert _state(files)["orders"] == {}
+
+    # 부분 체결 순서 역전: 누적량이 줄어든 이벤트는 차분 0
+    r.track(_order("o2", "MSFT"), "entry")
+    stream.emit("partial_fill", _order("o2", "MSFT", filled=6, avg=20.0), price=20.0, qty=6)
+    stream.emit("partial_fill", _order("o2", "MSFT", filled=2, avg=20.0), price=20.0, qty=2)
+    assert float(_pos(files, "MSFT")["qty"]) == 6
+    assert _state(files)["orders"]["o2"]["filled"] == 6
+
+def test_sell_fill_realizes_pnl_and_closes_position(rec, files):
+    r, stream = rec
+    add_position("AAPL", 10, 100.0, files["positions_file"])
+    r.track(_order("s1", side="sell", qty=10), "stop_loss")
+    stream.emit("fill", _order("s1", side="sell", qty=10, filled=10, avg=97.0, status="filled"), price=97.0, qty=10)
+    row = _trades(files).iloc[-1]
+    assert (row["side"], row["qty"], row["pnl"], row["reason"]) == ("sell", 10, -30.0, "stop_loss")
+    p = _pos(files)
+    assert p["status"] == "closed" and float(p["qty"]) == 0
+
+def test_state_survives_restart_without_double_counting(rec, files):
+    r, stream = rec
+    r.track(_order(), "entry")
+    stream.emit("partial_fill", _order(filled=4, avg=10.0), price=10.0, qty=4)
+
+    r2 = OrderReconciler(**files)
+    s2 = r2.attach(FakeTradeStream())
+    assert r2.has_open_order("AAPL", "buy")
+    s2.emit("partial_fill", _order(filled=4, avg=10.0), price=10.0, qty=4)   # 재전송(중복)
+    s2.emit("fill", _order(filled=10, avg=10.0, status="filled"), price=10.0, qty=6)
+    assert _trades(files)["qty"].tolist() == [4, 6]
+    assert float(_pos(files)["qty"]) == 10
+
+class _Api:
+    def __init__(self, orders):
+        self.orders = orders
+        self.calls = []
+
+    def list_orders(self, **kw):
+        self.calls.append(("list_orders", kw))
+        return self.orders
+
+    def get_order(self, oid):
+        self.calls.append(("get_order", oid))
+        raise KeyError(oid)
+
+def test_catch_up_only_after_connect_or_gap(rec, files):
+    r, stream = rec
+    r.track(_order(), "entry")
+    r.last_resync = 9e18    # 전체 대조 주기 미도래
+    api = _Api([_order(filled=10, avg=10.0, status="filled")])
+
+    r.maybe_resync(api)     # 연결 직후: 연결 전 구간 체결을 list_orders 1회로 보충
+    assert [c[0] for c in api.calls] == ["list_orders"]
+    assert api.calls[0][1]["after"] == "2026-10-19T14:29:59+00:00"
+    assert _trades(files)["qty"].tolist() == [10]
+    assert _state(files)["orders"] == {}
+
+    r.track(_order("o2"), "entry")
+    r.maybe_resync(api)     # 스트림 연결 유지 중: REST 폴링 없음
+    assert len(api.calls) == 1
+
+    r.attach(FakeTradeStream())   # 재연결 → 다시 1회 보충(응답에 없는 주문만 get_order)
+    api.orders = []
+    r.maybe_resync(api)
+    assert [c[0] for c in api.calls] == ["list_orders", "list_orders", "get_order"]
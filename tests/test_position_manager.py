@@ -0,0 +1,30 @@
+import os
+import threading
+
+from analysis_server.sentiment_worker import load_target_symbols
+from trade_server.position_manager import add_position, reduce_position
+
+def test_worker_never_sees_a_partial_positions_file(tmp_path):
+    positions = str(tmp_path / "positions.csv")
+    symbols = [f"S{i:03d}" for i in range(200)]
+    for s in symbols:
+        add_position(s, 1, 10.0, positions)
+    stop = threading.Event()
+
+    def writer():
+        # 락 없는 다른 프로세스(감성 워커) 관점: 쓰기 도중에도 전체 행이 보여야 함
+        while not stop.is_set():
+            add_position("S000", 1, 10.0, positions)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        for _ in range(200):
+            assert load_target_symbols(str(tmp_path / "none.csv"), positions) == symbols
+    finally:
+        stop.set()
+        t.join()
+
+    reduce_position("S000", 1e9, positions)
+    assert load_target_symbols(str(tmp_path / "none.csv"), positions) == symbols[1:]
+    assert os.listdir(tmp_path) == ["positions.csv"]
@@ -2,23 +2,50 @@
 # ----------------------------------------
 # ai_sentiment_client.py
 # 미국주식 자동매매 - 외부 AI 감성분석 REST API 연동 클라이언트
-# • 감성분석 서버(Flask/FastAPI) 호출
+# • 기본: 분석 서버가 발행한 mmap 스냅샷 조회(네트워크 호출 없음, µs 단위)
+# • 스냅샷 미사용/부재 시 감성분석 서버(Flask/FastAPI) 호출
 # • 네트워크/서버/데이터 예외 완전 처리
 # • 실전 운영 상세 주석
 # ----------------------------------------
 
+import time
 import requests
 
+from trade_server.config import SENTIMENT_SOURCE, SENTIMENT_SNAPSHOT_FILE, SENTIMENT_MAX_AGE_SEC
+from trade_server.cycle_recorder import recorded
+from common.sentiment_snapshot import SnapshotReader
+
+_snapshot = SnapshotReader(SENTIMENT_SNAPSHOT_FILE)
+
+def get_snapshot_sentiment(symbol, max_age: float = SENTIMENT_MAX_AGE_SEC):
+    """
+    [실전 전략] 스냅샷 조회(네트워크 없음)
+    [반환] (신호, 점수) / 만료(updated_at이 max_age초 초과)·미등록 종목은 ("neutral", 0)
+    """
+    hit = _snapshot.get(symbol)
+    if hit is None:
+        return "neutral", 0
+    sig, score, updated_at = hit
+    if time.time() - updated_at > max_age:
+        return "neutral", 0
+    return sig, score
+
+@recorded("sentiment", key=lambda symbol: symbol)
 def get_ai_sentiment(symbol):
     """
-    [실전 전략] 감성분석 서버(REST API) 호출, 종목별 신호/점수 반환
+    [실전 전략] 종목별 감성 신호/점수 반환
     - symbol: 감성분석 대상(티커)
     [반환] (신호:str, 점수:float) → 예: ("positive"/"neutral"/"negative", -1.0~+1.0)
     [정책]
+      - SENTIMENT_SOURCE=snapshot: 스냅샷만 사용(없거나 만료 시 neutral)
+      - SENTIMENT_SOURCE=auto(기본): 스냅샷 파일이 있으면 snapshot과 동일, 없으면 REST
+      - SENTIMENT_SOURCE=rest: 기존 방식(REST 2초 타임아웃)
       - REST 응답 포맷: {"signal": "positive", "score": 0.47}
       - 서버/네트워크/응답 예외시 ("neutral", 0) 반환
       - 운영환경에서 서버주소/포트(localhost:5001 등) 반드시 확인/관리
     """
+    if SENTIMENT_SOURCE == "snapshot" or (SENTIMENT_SOURCE == "auto" and _snapshot.available()):
+        return get_snapshot_sentiment(symbol)
     try:
         # 운영 감성분석 서버 주소/포트에 맞게 수정
         r = requests.get(f"http://localhost:5001/sentiment/{symbol}", timeout=2)
@@ -33,4 +60,3 @@ if __name__ == "__main__":
     # 단독 실행 테스트: 임의 티커 감성분석 결과 출력
     sig, score = get_ai_sentiment("AAPL")
     print(f"AAPL 감성: {sig}, 점수: {score}")
-
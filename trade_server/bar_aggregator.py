@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# bar_aggregator.py
+# 분봉 → 상위 타임프레임(5Min/15Min/1Day 등) 증분 집계
+# • get_price_data가 받아온 1분봉 중 "새로 들어온 봉"만 반영(전체 재리샘플 없음)
+#   엔진은 사이클당 1프로세스(매 사이클 빈 집계기) → 여러 봉은 NumPy reduceat으로 일괄 반영(파이썬 루프 없음)
+# • 종목별 세션 값(전일종가/세션 시가·고가·저가) 유지 → PrevClose 계산에 groupby 불필요
+# • 전략은 추가 API 호출 없이 get_bars(symbol, "15Min") 등으로 조회
+# • 세션 기준일은 get_price_data 기존 정책과 동일(UTC 날짜)
+# ----------------------------------------
+
+import os
+import re
+import threading
+from collections import deque, OrderedDict
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+BAR_HISTORY      = int(os.getenv("BAR_HISTORY", "5000"))        # 타임프레임별 보관 봉 수
+BAR_MAX_SYMBOLS  = int(os.getenv("BAR_MAX_SYMBOLS", "500"))     # 보관 종목 수(LRU)
+DEFAULT_TIMEFRAMES = ("1Min", "5Min", "15Min", "1Day")
+COLUMNS = ["timestamp", "Open", "High", "Low", "Close", "Volume"]
+
+_EPOCH = pd.Timestamp(0, tz="UTC")
+_EPOCH_DATE = date(1970, 1, 1)
+_TF_RE = re.compile(r"^(\d+)(Min|Hour|Day)$")
+
+def _tf_seconds(tf: str) -> int:
+    """'5Min' → 300, '1Hour' → 3600, '1Day' → 86400 (Day는 N=1만 지원)"""
+    m = _TF_RE.match(tf)
+    if not m:
+        raise ValueError(f"지원하지 않는 타임프레임: {tf} (예: 1Min, 5Min, 15Min, 1Hour, 1Day)")
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "Day" and n != 1:
+        raise ValueError("Day 타임프레임은 1Day만 지원")
+    return n * {"Min": 60, "Hour": 3600, "Day": 86400}[unit]
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """정렬된 키 배열에서 값이 바뀌는 위치(구간 시작 인덱스)"""
+    return np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+
+class _SymbolBars:
+    """종목 1개의 타임프레임별 완성봉(deque) + 진행봉 + 세션 상태"""
+    def __init__(self, timeframes, maxlen: int):
+        self.maxlen = maxlen
+        self.last_ts = None                                   # 마지막 반영 1분봉(epoch 초)
+        self.done = {}                                        # tf → deque[(ts,o,h,l,c,v)]
+        self.cur = {}                                         # tf → [ts,o,h,l,c,v] | None
+        self.secs = {}
+        for tf in ("1Min",) + tuple(t for t in timeframes if t != "1Min"):
+            self.add_timeframe(tf)
+        self.session_date = None
+        self.session_open = self.session_high = self.session_low = None
+        self.prev_close = None                                # 직전 세션 종가
+        self.last_close = None
+        self.session_closes = OrderedDict()                   # date → 세션 종가(최근 maxlen일)
+
+    def add_timeframe(self, tf: str):
+        if tf in self.secs:
+            return
+        self.secs[tf] = _tf_seconds(tf)
+        self.done[tf] = deque(maxlen=self.maxlen)
+        self.cur[tf] = None
+        # 신규 타임프레임: 보관 중인 1분봉으로 1회 백필, 이후 증분
+        if tf != "1Min" and "1Min" in self.done:
+            minutes = list(self.done["1Min"])
+            if self.cur["1Min"] is not None:
+                minutes.append(tuple(self.cur["1Min"]))
+            for b in minutes:
+                self._roll(tf, *b)
+
+    def _roll(self, tf: str, ts: int, o, h, l, c, v):
+        bucket = ts - ts % self.secs[tf]
+        cur = self.cur[tf]
+        if cur is None or cur[0] != bucket:
+            if cur is not None:
+                self.done[tf].append(tuple(cur))
+            self.cur[tf] = [bucket, o, h, l, c, v]
+        else:
+            if h > cur[2]:
+                cur[2] = h
+            if l < cur[3]:
+                cur[3] = l
+            cur[4] = c
+            cur[5] += v
+
+    def _roll_many(self, tf: str, ts, o, h, l, c, v):
+        """_roll 일괄 버전(버킷 구간별 시가/고가/저가/종가/거래량을 reduceat으로 계산)"""
+        buckets = ts - ts % self.secs[tf]
+        starts = _group_starts(buckets)
+        ends = np.append(starts[1:], len(ts)) - 1
+        rows = list(zip(buckets[starts].tolist(), o[starts].tolist(),
+                        np.maximum.reduceat(h, starts).tolist(), np.minimum.reduceat(l, starts).tolist(),
+                        c[ends].tolist(), np.add.reduceat(v, starts).tolist()))
+        cur = self.cur[tf]
+        if cur is not None and cur[0] == rows[0][0]:
+            _, _, bh, bl, bc, bv = rows.pop(0)
+            if bh > cur[2]:
+                cur[2] = bh
+            if bl < cur[3]:
+                cur[3] = bl
+            cur[4] = bc
+            cur[5] += bv
+            if not rows:
+                return
+        if cur is not None:
+            self.done[tf].append(tuple(cur))
+        self.done[tf].extend(rows[max(0, len(rows) - 1 - self.maxlen):-1])
+        self.cur[tf] = list(rows[-1])
+
+    def on_bars(self, ts, o, h, l, c, v):
+        """
+        시간순(비감소) 1분봉 배열 일괄 반영 — on_bar 반복과 같은 결과
+        - ts: epoch 초 int64 배열, o/h/l/c/v: float64 배열
+        """
+        for tf in self.secs:
+            self._roll_many(tf, ts, o, h, l, c, v)
+        days = ts // 86400
+        starts = _group_starts(days)
+        ends = np.append(starts[1:], len(ts)) - 1
+        highs = np.maximum.reduceat(h, starts).tolist()
+        lows = np.minimum.reduceat(l, starts).tolist()
+        for k, (s, e) in enumerate(zip(starts.tolist(), ends.tolist())):
+            d = _EPOCH_DATE + timedelta(days=int(days[s]))
+            if d != self.session_date:
+                if self.session_date is not None:
+                    self.prev_close = self.last_close
+                self.session_date = d
+                self.session_open, self.session_high, self.session_low = float(o[s]), highs[k], lows[k]
+            else:
+                self.session_high = max(self.session_high, highs[k])
+                self.session_low = min(self.session_low, lows[k])
+            self.last_close = float(c[e])
+            self.session_closes[d] = self.last_close
+        while len(self.session_closes) > self.maxlen:
+            self.session_closes.popitem(last=False)
+        self.last_ts = int(ts[-1])
+
+    def on_bar(self, ts: int, o, h, l, c, v):
+        date = datetime.fromtimestamp(ts, timezone.utc).date()
+        if date != self.session_date:
+            if self.session_date is not None:
+                self.prev_close = self.last_close
+            self.session_date = date
+            self.session_open, self.session_high, self.session_low = o, h, l
+        else:
+            self.session_high = max(self.session_high, h)
+            self.session_low = min(self.session_low, l)
+        self.last_close = c
+        self.session_closes[date] = c
+        if len(self.session_closes) > self.maxlen:
+            self.session_closes.popitem(last=False)
+        for tf in self.secs:
+            self._roll(tf, ts, o, h, l, c, v)
+        self.last_ts = ts
+
+class BarAggregator:
+    """
+    [실전 운영] 종목별 멀티 타임프레임 봉 집계기(프로세스 공용 BARS 인스턴스 사용)
+    - ingest(symbol, df): 1분봉 DataFrame 중 마지막 반영 시각 이후 봉만 반영
+    - get_bars(symbol, tf): 타임프레임 봉 DataFrame(진행 중인 봉 포함 여부 선택)
+    - session(symbol): 전일종가/세션 시가·고가·저가/최근가
+    - prev_close_map(symbol): {세션일: 직전 세션 종가}
+    - prev_close_values(symbol, timestamps): 행별 직전 세션 종가 배열(PrevClose 컬럼용)
+    """
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES, maxlen: int = BAR_HISTORY,
+                 max_symbols: int = BAR_MAX_SYMBOLS):
+        self.timeframes = tuple(timeframes)
+        self.maxlen = maxlen
+        self.max_symbols = max_symbols
+        self._symbols = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, symbol: str, create: bool = False):
+        sb = self._symbols.get(symbol)
+        if sb is None and create:
+            sb = self._symbols[symbol] = _SymbolBars(self.timeframes, self.maxlen)
+            if len(self._symbols) > self.max_symbols:
+                self._symbols.popitem(last=False)
+        if sb is not None:
+            self._symbols.move_to_end(symbol)
+        return sb
+
+    def ingest(self, symbol: str, df: pd.DataFrame) -> int:
+        """
+        1분봉(df: timestamp(UTC), Open, High, Low, Close, Volume; 시간순) 증분 반영
+        [반환] 새로 반영된 봉 수
+        """
+        if df is None or df.empty:
+            return 0
+        ts = (pd.to_datetime(df["timestamp"], utc=True, cache=False) - _EPOCH) // pd.Timedelta(seconds=1)
+        with self._lock:
+            sb = self._get(symbol, create=True)
+            new = ts > sb.last_ts if sb.last_ts is not None else ts.notna()
+            if not new.any():
+                return 0
+            sub = df.loc[new.values]
+            t = ts[new].to_numpy(dtype="int64")
+            cols = [sub[k].to_numpy(dtype="float64") for k in ("Open", "High", "Low", "Close", "Volume")]
+            if len(t) > 1 and (t[1:] < t[:-1]).any():
+                # 시간 역순이 섞인 입력: 봉 단위 반영(기존 방식)
+                for row in zip(t.tolist(), *(a.tolist() for a in cols)):
+                    sb.on_bar(*row)
+            else:
+                sb.on_bars(t, *cols)
+            return len(t)
+
+    def on_bar(self, symbol: str, ts, o, h, l, c, v):
+        """스트리밍 등 1분봉 1개 직접 반영(ts: epoch 초 또는 datetime)"""
+        t = int(pd.Timestamp(ts).timestamp()) if not isinstance(ts, (int, float)) else int(ts)
+        with self._lock:
+            sb = self._get(symbol, create=True)
+            if sb.last_ts is None or t > sb.last_ts:
+                sb.on_bar(t, float(o), float(h), float(l), float(c), float(v))
+
+    def get_bars(self, symbol: str, timeframe: str = "5Min", include_partial: bool = True,
+                 limit: int = None) -> pd.DataFrame:
+        """타임프레임 봉 조회(미등록 타임프레임은 보관 1분봉으로 1회 백필 후 증분 유지)"""
+        with self._lock:
+            sb = self._get(symbol)
+            if sb is None:
+                return pd.DataFrame(columns=COLUMNS)
+            sb.add_timeframe(timeframe)
+            bars = list(sb.done[timeframe])
+            if include_partial and sb.cur[timeframe] is not None:
+                bars.append(tuple(sb.cur[timeframe]))
+        if limit:
+            bars = bars[-limit:]
+        df = pd.DataFrame(bars, columns=COLUMNS)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", utc=True)
+        return df
+
+    def session(self, symbol: str) -> dict:
+        with self._lock:
+            sb = self._get(symbol)
+            if sb is None:
+                return {}
+            return {
+                "date": sb.session_date, "prev_close": sb.prev_close,
+                "open": sb.session_open, "high": sb.session_high, "low": sb.session_low,
+                "last": sb.last_close,
+            }
+
+    def prev_close_map(self, symbol: str) -> dict:
+        with self._lock:
+            sb = self._get(symbol)
+            if sb is None:
+                return {}
+            dates = list(sb.session_closes)
+            return {d: sb.session_closes[p] for p, d in zip(dates, dates[1:])}
+
+    def prev_close_values(self, symbol: str, timestamps) -> np.ndarray:
+        """
+        timestamp 열(UTC) → 행별 직전 세션 종가 배열(미상은 NaN, PrevClose 컬럼용)
+        - UTC 일 번호 정수로 매핑(행마다 date 객체 생성 없음)
+        """
+        closes = self.prev_close_map(symbol)
+        days = (pd.to_datetime(timestamps, utc=True, cache=False) - _EPOCH) // pd.Timedelta(days=1)
+        index = pd.Index([(d - _EPOCH_DATE).days for d in closes], dtype="int64")
+        pos = index.get_indexer(np.asarray(days, dtype="int64"))
+        vals = np.append(np.fromiter(closes.values(), dtype="float64", count=len(closes)), np.nan)
+        return vals[pos]   # 미등록(-1) → 마지막 NaN
+
+# 프로세스 공용 인스턴스(config.get_price_data가 반영, 전략은 get_bars로 조회)
+BARS = BarAggregator()
+
+def get_bars(symbol: str, timeframe: str = "5Min", include_partial: bool = True, limit: int = None):
+    """[전략용] 추가 API 호출 없이 상위 타임프레임 봉 조회"""
+    return BARS.get_bars(symbol, timeframe, include_partial, limit)
+
+def get_session(symbol: str) -> dict:
+    """[전략용] 전일종가/세션 시가·고가·저가/최근가"""
+    return BARS.session(symbol)
@@ -7,13 +7,11 @@
 #  3) 현재 거래량 > 10일 평균 거래량 * 1.5
 #  4) 현재 가격 > 볼린저밴드 상단(BB_high)
 #  5) 현재 거래량 > 5일 평균 거래량 * 2
-# (옵션) 감성 필터/동적 임계값은 config 플래그로 제어
+# (옵션) 감성 필터/동적 임계값은 config 플래그로 제어(전략별 값은 StrategyConfig)
 # ----------------------------------------
 
 import pandas as pd
-from trade_server.config import (
-    USE_SENTIMENT_FILTER, USE_DYNAMIC_THRESHOLDS
-)
+from trade_server.strategy_config import StrategyConfig, DEFAULT_STRATEGY
 from trade_server.ai_sentiment_client import get_ai_sentiment
 from trade_server.market_filter import market_allows_entry
 
@@ -35,54 +33,84 @@ def _has_enough_data(df: pd.DataFrame) -> bool:
     need = 20  # BB/MA20 계산 최소치
     return len(df) >= need
 
-def buy_signal(symbol: str, df: pd.DataFrame) -> bool:
-    try:
-        if not market_allows_entry():
-            return False
-        if not _has_enough_data(df):
-            return False
+def entry_features(df: pd.DataFrame) -> dict:
+    """
+    진입 판단 지표 1회 계산(전략 여러 개가 같은 지표를 공유 → 전략 추가 시 임계값 비교만 추가)
+    [반환] dict(ma5, ma20, rsi, vol5, vol10, curr_vol, price, bb_high, atr_pct) | None(데이터 부족)
+    """
+    if not _has_enough_data(df):
+        return None
+    close = df["Close"]
+    vol = df["Volume"]
+    _, bb_high = bollinger(close, 20, 2.0)
+    price = float(close.iloc[-1])
+    tr = (df["High"] - df["Low"]).rolling(14).mean().iloc[-1]
+    return {
+        "ma5": float(close.rolling(5).mean().iloc[-1]),
+        "ma20": float(close.rolling(20).mean().iloc[-1]),
+        "rsi": float(compute_rsi(close, 14).iloc[-1]),
+        "vol5": float(vol.rolling(5).mean().iloc[-1]),
+        "vol10": float(vol.rolling(10).mean().iloc[-1]),
+        "curr_vol": float(vol.iloc[-1]),
+        "price": price,
+        "bb_high": float(bb_high.iloc[-1]),
+        "atr_pct": float(tr / max(price, 1e-9)),
+    }
 
-        # (옵션) 감성 필터: 부정이면 차단
-        if USE_SENTIMENT_FILTER:
-            ai_sig, _ = get_ai_sentiment(symbol)
-            if ai_sig == "negative":
-                return False
+def entry_thresholds(f: dict, params: StrategyConfig = DEFAULT_STRATEGY):
+    """전략 임계값(동적 임계값 사용 시 ATR% 반영) → (rsi_limit, mul10, mul5)"""
+    rsi_limit, mul10, mul5 = params.rsi_limit, params.mul10, params.mul5
+    # (옵션) 변동성 기반 동적 임계값 - 기본 OFF
+    if params.dynamic_thresholds:
+        atr_pct = f["atr_pct"]
+        rsi_limit = max(40.0, rsi_limit - atr_pct * 100.0)
+        mul10 += atr_pct
+        mul5 += atr_pct
+    return rsi_limit, mul10, mul5
 
-        close = df["Close"]
-        vol = df["Volume"]
+# 진입 조건 비트(판단 저널에 통과 여부 기록)
+COND_MA, COND_RSI, COND_VOL10, COND_BB, COND_VOL5 = 1, 2, 4, 8, 16
+COND_ALL = COND_MA | COND_RSI | COND_VOL10 | COND_BB | COND_VOL5
 
-        ma5 = close.rolling(5).mean().iloc[-1]
-        ma20 = close.rolling(20).mean().iloc[-1]
-        rsi = compute_rsi(close, 14).iloc[-1]
-        vol5 = vol.rolling(5).mean().iloc[-1]
-        vol10 = vol.rolling(10).mean().iloc[-1]
-        curr_vol = vol.iloc[-1]
-        curr_price = close.iloc[-1]
-        _, bb_high = bollinger(close, 20, 2.0)
-        bb_high_last = bb_high.iloc[-1]
+def entry_conditions(f: dict, rsi_limit: float, mul10: float, mul5: float) -> int:
+    """지침 5개 조건 통과 비트마스크(COND_ALL이면 진입 조건 충족)"""
+    return ((COND_MA if f["ma5"] > f["ma20"] else 0) |
+            (COND_RSI if f["rsi"] < rsi_limit else 0) |
+            (COND_VOL10 if f["curr_vol"] > f["vol10"] * mul10 else 0) |
+            (COND_BB if f["price"] > f["bb_high"] else 0) |
+            (COND_VOL5 if f["curr_vol"] > f["vol5"] * mul5 else 0))
 
-        # 지침 고정 임계값
-        rsi_limit = 65.0
-        mul10 = 1.5
-        mul5 = 2.0
+def buy_decision(symbol: str, df: pd.DataFrame, params: StrategyConfig = None,
+                 features: dict = None) -> tuple:
+    """
+    buy_signal 판단 + 실제로 진입을 멈춘 단계(판단 저널 사유용, 검사 순서 그대로)
+    [반환] (진입 여부, "signal" | "market" | "insufficient" | "sentiment" | "conditions" | "error")
+    """
+    params = params or DEFAULT_STRATEGY
+    try:
+        if not market_allows_entry():
+            return False, "market"
+        f = features if features is not None else entry_features(df)
+        if f is None:
+            return False, "insufficient"
 
-        # (옵션) 변동성 기반 동적 임계값 - 기본 OFF
-        if USE_DYNAMIC_THRESHOLDS:
-            tr = (df["High"] - df["Low"]).rolling(14).mean().iloc[-1]
-            atr_pct = tr / max(curr_price, 1e-9)
-            rsi_limit = max(40.0, 65.0 - atr_pct * 100.0)
-            mul10 += atr_pct
-            mul5 += atr_pct
+        # (옵션) 감성 필터: 부정이면 차단
+        if params.sentiment_filter:
+            ai_sig = f["sentiment"] if "sentiment" in f else get_ai_sentiment(symbol)[0]
+            if ai_sig == "negative":
+                return False, "sentiment"
 
-        cond = (
-            ma5 > ma20 and
-            rsi < rsi_limit and
-            curr_vol > vol10 * mul10 and
-            curr_price > bb_high_last and
-            curr_vol > vol5 * mul5
-        )
-        return bool(cond)
+        if entry_conditions(f, *entry_thresholds(f, params)) == COND_ALL:
+            return True, "signal"
+        return False, "conditions"
     except Exception as e:
         print(f"[buy_signal 오류] {symbol}: {e}")
-        return False
+        return False, "error"
 
+def buy_signal(symbol: str, df: pd.DataFrame, params: StrategyConfig = None,
+               features: dict = None) -> bool:
+    """
+    - params: 전략 설정(미지정 시 config 플래그 기본 전략)
+    - features: entry_features(df) 사전계산값(멀티 전략 공유, "sentiment" 키가 있으면 재조회 없음)
+    """
+    return buy_decision(symbol, df, params, features)[0]
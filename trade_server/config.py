@@ -9,11 +9,16 @@
 
 import os
 import sys
-import requests
+import atexit
+import threading
 from datetime import datetime, timedelta, timezone
 import alpaca_trade_api as tradeapi
 import pandas as pd
 
+from trade_server.bar_aggregator import BARS
+from trade_server.cycle_recorder import RECORDER, recorded
+from trade_server.notifier import AlertDispatcher, SlackSink, TelegramSink, FileSink
+
 # ─── 실행 모드(paper/prod) 및 데이터피드(sip/iex) ──────────────────────
 _arg = sys.argv[1].lower() if len(sys.argv) > 1 and sys.argv[1].lower() in ("prod","paper") else None
 TRADE_MODE = _arg or os.getenv("TRADE_MODE", "paper").lower()
@@ -37,9 +42,18 @@ if project_root not in sys.path:
 BASE_DIR         = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SHARED_DATA_DIR  = os.path.join(BASE_DIR, "shared_data")
 LOG_DIR          = os.path.join(BASE_DIR, "logs")
+if RECORDER.replaying:
+    # 재생 모드: 운영 CSV/로그(cycle_reports.csv 등)를 건드리지 않도록 샌드박스 디렉토리 사용
+    SHARED_DATA_DIR = os.path.join(SHARED_DATA_DIR, "replay")
+    LOG_DIR         = os.path.join(SHARED_DATA_DIR, "logs")
 POSITIONS_FILE      = os.path.join(SHARED_DATA_DIR, "positions.csv")
 POSITIONS_TEST_FILE = os.path.join(SHARED_DATA_DIR, "positions_test.csv")
 TRADES_LOG_FILE     = os.path.join(SHARED_DATA_DIR, "trades.csv")
+MARKS_LOG_FILE      = os.path.join(SHARED_DATA_DIR, "marks.csv")                 # 사이클별 보유 평가가
+HISTORY_DIR         = os.path.join(SHARED_DATA_DIR, "history")                   # 날짜 파티션 Parquet
+UNIVERSE_FILE       = os.path.join(SHARED_DATA_DIR, "universe.csv")              # Top100(분석 서버 워커 대상)
+SENTIMENT_SNAPSHOT_FILE = os.path.join(SHARED_DATA_DIR, "sentiment_snapshot.bin")
+JOURNAL_DIR         = os.path.join(SHARED_DATA_DIR, "journal")                   # 진입 판단 바이너리 저널(일별)
 SLACK_WEBHOOK_URL   = os.getenv("SLACK_WEBHOOK_URL", "")
 
 # ─── 전략 플래그/임계값(환경변수로 제어 가능) ──────────────────────────
@@ -51,28 +65,60 @@ TRAILING_STOP_RATE     = float(os.getenv("TRAILING_STOP_RATE", "0.03"))     # -3
 STOP_LOSS_ENABLED      = bool(int(os.getenv("STOP_LOSS_ENABLED", "1")))     # 손절 사용
 STOP_LOSS_RATE         = float(os.getenv("STOP_LOSS_RATE", "0.03"))         # -3% 손절
 
+# ─── 감성 조회 경로(snapshot: mmap 스냅샷만 / rest: 분석서버 호출 / auto: 스냅샷 있으면 스냅샷) ──
+SENTIMENT_SOURCE       = os.getenv("SENTIMENT_SOURCE", "auto").lower()
+SENTIMENT_MAX_AGE_SEC  = float(os.getenv("SENTIMENT_MAX_AGE_SEC", "900"))   # 초과 시 neutral 처리
+
+# ─── 체결 리컨실리에이션(trade_updates 체결 시점 반영, 주기 전체 대조는 안전망) ──
+RECONCILE_FILLS        = bool(int(os.getenv("RECONCILE_FILLS", "1")))        # 0이면 주문 접수 즉시 반영(기존)
+RECONCILE_RESYNC_SEC   = float(os.getenv("RECONCILE_RESYNC_SEC", "900"))    # list_positions 전체 대조 주기
+RECONCILER_STATE_FILE  = os.path.join(SHARED_DATA_DIR, "reconciler_state.json") # 추적 주문/마지막 대조 시각(사이클 프로세스 간 유지)
+
+# ─── 사이클 시간예산(5분 주기 내 종료 목표: 청산 점검 우선, 진입 후보는 마감 임박 시 연기/폐기) ──
+CYCLE_BUDGET_SEC       = float(os.getenv("CYCLE_BUDGET_SEC", "240"))        # 사이클 시작~마감(초)
+CYCLE_RESERVE_SEC      = float(os.getenv("CYCLE_RESERVE_SEC", "15"))        # 마감 전 여유(이력 이관 등)
+CYCLE_STATE_FILE       = os.path.join(SHARED_DATA_DIR, "cycle_state.json")  # 연기 후보/소요시간 추정치(사이클 프로세스 간 유지)
+
+# ─── 샤드 스캔(진입 후보 평가만 워커 분산, 주문/포지션 쓰기는 코디네이터 단독) ──
+# SHARD_WORKERS: 0=미사용 / N=로컬 워커 프로세스 N개 / "host:port,host:port"=원격 워커
+SHARD_WORKERS          = os.getenv("SHARD_WORKERS", "0").strip()
+SHARD_TOKEN            = os.getenv("SHARD_TOKEN", "")                         # 워커 접속 공유 토큰(루프백 외 주소 바인딩 시 필수)
+SHARD_TIMEOUT_SEC      = float(os.getenv("SHARD_TIMEOUT_SEC", "30"))        # 워커 응답 간격 상한(초과 시 해당 샤드만 로컬 재평가)
+SHARD_IDLE_SEC         = float(os.getenv("SHARD_IDLE_SEC", "1800"))         # 로컬 워커 유휴 자동 종료(사이클 간 상주, BARS 캐시 유지)
+SHARD_REGISTRY_FILE    = os.path.join(SHARED_DATA_DIR, "shard_workers.json")  # 상주 로컬 워커 pid/포트(다음 사이클 프로세스가 재접속)
+
+# ─── 진입 판단 저널(평가마다 지표/임계값/결과를 고정폭 바이너리로 기록, 사후분석·임계값 보정용) ──
+DECISION_JOURNAL       = bool(int(os.getenv("DECISION_JOURNAL", "1")))
+JOURNAL_FLUSH_SEC      = float(os.getenv("JOURNAL_FLUSH_SEC", "5"))         # 버퍼 flush 최대 간격(버퍼 가득 차면 즉시)
+
 # ─── Alpaca REST 클라이언트 ────────────────────────────────────────────
 alpaca = tradeapi.REST(API_KEY, API_SECRET, API_URL, api_version="v2")
 
 # ─── 거래 가능 종목 리스트(예: NYSE/NASDAQ, marginable) ────────────────
+@recorded("assets", key=lambda: "")
 def get_tradable_symbols() -> list[str]:
     assets = alpaca.list_assets(status="active")
     return [a.symbol for a in assets if a.exchange in ("NYSE", "NASDAQ") and a.marginable]
 
 # ─── 가격 데이터 조회(분봉, OHLCV 대문자, PrevClose 포함) ────────────────
+@recorded("bars", key=lambda symbol, start, end: symbol)
+def _fetch_minute_bars(symbol: str, start: datetime, end: datetime):
+    """Alpaca 1분봉 원본 조회(기록/재생 지점, 재생 시 시각 인자는 매칭에서 제외)"""
+    api = tradeapi.REST(API_KEY, API_SECRET, API_URL, api_version="v2")
+    return api.get_bars(symbol, "1Min", start=start.isoformat(), end=end.isoformat(), feed=DATA_FEED).df
+
 def get_price_data(symbol: str, days: int = 3):
     """
     분봉(1Min) 데이터 조회(프리+정규+애프터). 없으면 10일로 fallback.
     반환: DataFrame columns = ['timestamp','Open','High','Low','Close','Volume','PrevClose']
     """
     try:
-        api = tradeapi.REST(API_KEY, API_SECRET, API_URL, api_version="v2")
         end = datetime.now(timezone.utc)
         start = end - timedelta(days=days)
-        bars = api.get_bars(symbol, "1Min", start=start.isoformat(), end=end.isoformat(), feed=DATA_FEED).df
+        bars = _fetch_minute_bars(symbol, start, end)
         if bars is None or bars.empty:
             start = end - timedelta(days=10)
-            bars = api.get_bars(symbol, "1Min", start=start.isoformat(), end=end.isoformat(), feed=DATA_FEED).df
+            bars = _fetch_minute_bars(symbol, start, end)
         if bars is None or bars.empty:
             return None
         # 인덱스→컬럼, 컬럼명 표준화(대문자)
@@ -84,27 +130,50 @@ def get_price_data(symbol: str, days: int = 3):
         if df.empty:
             return None
         # PrevClose: 전일 종가(없으면 직전 바 종가로 대체)
-        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        # 새 분봉만 BARS(bar_aggregator)에 증분 반영 → 세션 종가 맵으로 매핑(groupby 없음)
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, cache=False)   # 고유 시각 → 변환 캐시 불필요
         df.sort_values("timestamp", inplace=True)
-        df["Date"] = df["timestamp"].dt.date
-        daily_last = df.groupby("Date")["Close"].last()
-        prev_daily = daily_last.shift(1)
-        df["PrevClose"] = df["Date"].map(prev_daily.to_dict())
+        BARS.ingest(symbol, df)
+        df["PrevClose"] = BARS.prev_close_values(symbol, df["timestamp"])
         df["PrevClose"] = df["PrevClose"].fillna(df["Close"].shift(1))
-        df.drop(columns=["Date"], inplace=True)
         return df.reset_index(drop=True)
     except Exception as e:
         print(f"[WARN] get_price_data({symbol}) 실패: {e}")
         return None
 
-# ─── 슬랙 알림 ──────────────────────────────────────────────────────────
+# ─── 알림(비동기 다이제스트: Slack/Telegram/파일) ──────────────────────
+TELEGRAM_BOT       = os.getenv("TELEGRAM_BOT", "")
+TELEGRAM_CHAT_ID   = os.getenv("TELEGRAM_CHAT_ID", "")
+ALERT_FILE         = os.getenv("ALERT_FILE", "")                          # 로컬 파일 싱크(선택)
+if RECORDER.replaying and ALERT_FILE:
+    ALERT_FILE = os.path.join(LOG_DIR, os.path.basename(ALERT_FILE))      # 재생: 샌드박스 로그로
+ALERT_DIGEST_SEC   = float(os.getenv("ALERT_DIGEST_SEC", "5"))            # 다이제스트 병합 주기
+ALERT_QUEUE_MAX    = int(os.getenv("ALERT_QUEUE_MAX", "1000"))            # 큐 상한(초과분 스필/폐기)
+ALERT_SPILL_FILE   = os.path.join(LOG_DIR, "alerts_spill.log")
+_alert_dispatcher  = None
+_alert_lock        = threading.Lock()
+
+def get_alert_dispatcher() -> AlertDispatcher:
+    """프로세스 공용 디스패처(최초 호출 시 생성/기동, 종료 시 flush). 재생 모드는 외부 싱크 제외"""
+    global _alert_dispatcher
+    with _alert_lock:
+        if _alert_dispatcher is None:
+            sinks = []
+            if not RECORDER.replaying:
+                if SLACK_WEBHOOK_URL:
+                    sinks.append(SlackSink(SLACK_WEBHOOK_URL))
+                if TELEGRAM_BOT and TELEGRAM_CHAT_ID:
+                    sinks.append(TelegramSink(TELEGRAM_BOT, TELEGRAM_CHAT_ID))
+            if ALERT_FILE:
+                sinks.append(FileSink(ALERT_FILE))
+            _alert_dispatcher = AlertDispatcher(sinks, ALERT_DIGEST_SEC, ALERT_QUEUE_MAX,
+                                                ALERT_SPILL_FILE).start()
+            atexit.register(_alert_dispatcher.flush)
+        return _alert_dispatcher
+
 def send_slack_alert(message: str):
-    if not SLACK_WEBHOOK_URL:
-        return
-    try:
-        requests.post(SLACK_WEBHOOK_URL, json={"text": message}, timeout=3)
-    except Exception:
-        pass
+    # 주문 흐름에서 호출: 큐 적재만 하고 즉시 반환(전송은 디스패처 스레드)
+    get_alert_dispatcher().send(message)
 
 # ─── 뉴스 API 헤더(Investing via RapidAPI) ─────────────────────────────
 NEWSAPI_KEY   = os.getenv("NEWSAPI_KEY", "")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# cycle_recorder.py
+# 실거래 사이클 기록/재생(record & replay)
+# • CYCLE_RECORD=경로.pkl.gz : 사이클의 모든 외부 응답(종목/분봉/감성/시계/주문응답/포지션)과
+#   소요시간을 압축 파일로 저장(사이클 시작 시 positions.csv 내용 포함)
+# • CYCLE_REPLAY=경로.pkl.gz : 같은 코드 경로에 기록된 응답을 공급(네트워크/실주문 없음)
+#   - shared_data/replay/ 샌드박스에서 실행(config 참고), 기록 당시 positions.csv 복원
+#   - CYCLE_REPLAY_TIMING=1 이면 기록된 응답 지연까지 재현
+# • 호출 키는 (이름, 인자)별 FIFO → 스레드풀 실행 순서가 달라도 같은 응답 매칭
+# • config 등 운영 모듈을 import하지 않음(config가 이 모듈을 import)
+# ----------------------------------------
+
+import os
+import sys
+import gzip
+import time
+import pickle
+import threading
+import functools
+from collections import defaultdict, deque
+
+class ReplayMissError(RuntimeError):
+    """재생 중 기록에 없는 외부 호출"""
+
+class CycleRecorder:
+    """
+    [운영] 외부 호출 기록/재생기(프로세스 공용 RECORDER 사용)
+    - mode: "off" / "record" / "replay"
+    - recorded(name, key, encode) 데코레이터로 외부 호출 지점을 감쌈
+    """
+    def __init__(self, record_path: str = "", replay_path: str = "", replay_timing: bool = False):
+        self.record_path = record_path
+        self.replay_path = replay_path
+        self.replay_timing = replay_timing
+        self.mode = "replay" if replay_path else ("record" if record_path else "off")
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic()
+        self.calls = defaultdict(list)      # key → [(ok, value, elapsed)]
+        self.timeline = []                  # [(t_offset, name, elapsed)]
+        self.files = {}                     # 사이클 시작 시점 파일 스냅샷 {이름: bytes}
+        self.meta = {}
+        self.misses = defaultdict(int)
+        self._queues = None
+        if self.mode == "replay":
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    # ── 파일 입출력 ──────────────────────────────────────────────────
+    def _load(self):
+        with gzip.open(self.replay_path, "rb") as f:
+            data = pickle.load(f)
+        self.meta, self.files = data.get("meta", {}), data.get("files", {})
+        self.timeline = data.get("timeline", [])
+        self._queues = {k: deque(v) for k, v in data["calls"].items()}
+
+    def save(self):
+        """기록 모드: 압축 파일로 저장(임시파일 → 교체)"""
+        if self.mode != "record":
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.record_path)), exist_ok=True)
+        tmp = f"{self.record_path}.tmp"
+        with self._lock:
+            data = {"meta": self.meta, "files": self.files,
+                    "calls": dict(self.calls), "timeline": list(self.timeline)}
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.record_path)
+        print(f"[RECORD] {sum(len(v) for v in data['calls'].values())} calls → {self.record_path}")
+
+    # ── 사이클 경계 ──────────────────────────────────────────────────
+    def begin_cycle(self, files: dict, **meta):
+        """
+        사이클 시작: 기록 모드는 상태 파일 내용 저장, 재생 모드는 기록 당시 내용으로 복원
+        - files: {이름: 경로} (예: {"positions": POSITIONS_FILE})
+        """
+        if self.mode == "record":
+            self.meta = {"started_at": time.time(), "argv": sys.argv, **meta}
+            for name, path in files.items():
+                if os.path.exists(path):
+                    with open(path, "rb") as f:
+                        self.files[name] = f.read()
+        elif self.mode == "replay":
+            for name, path in files.items():
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if name in self.files:
+                    with open(path, "wb") as f:
+                        f.write(self.files[name])
+                elif os.path.exists(path):
+                    os.remove(path)
+        self._t0 = time.monotonic()
+
+    def report(self) -> dict:
+        """재생 결과: 기록에 없던 호출(misses) / 소비되지 않은 기록(unused) 건수(이름별)"""
+        unused = defaultdict(int)
+        for (name, _), q in (self._queues or {}).items():
+            if q:
+                unused[name] += len(q)
+        return {"misses": dict(self.misses), "unused": dict(unused)}
+
+    # ── 호출 감싸기 ──────────────────────────────────────────────────
+    def recorded(self, name: str, key=None, encode=None, on_miss=None):
+        """
+        외부 호출 기록/재생 데코레이터
+        - key(*args, **kwargs): 응답 매칭 키(시각 등 재생 시 달라지는 인자는 제외), 기본 repr(args)
+        - encode(result): 저장 전 변환(예: Alpaca Entity → _raw dict)
+        - on_miss(*args, **kwargs): 재생 중 기록 없음 시 대체값(미지정 시 ReplayMissError)
+        """
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if self.mode == "off":
+                    return fn(*args, **kwargs)
+                k = (name, key(*args, **kwargs) if key else repr(args) + repr(sorted(kwargs.items())))
+                if self.mode == "replay":
+                    return self._replay(k, on_miss, args, kwargs)
+                t = time.monotonic()
+                try:
+                    res = fn(*args, **kwargs)
+                except Exception as e:
+                    self._store(k, False, _picklable_exc(e), time.monotonic() - t)
+                    raise
+                self._store(k, True, encode(res) if encode else res, time.monotonic() - t)
+                return res
+            return wrapper
+        return deco
+
+    def _store(self, k, ok, value, elapsed):
+        with self._lock:
+            self.calls[k].append((ok, value, elapsed))
+            self.timeline.append((time.monotonic() - self._t0 - elapsed, k[0], elapsed))
+
+    def _replay(self, k, on_miss, args, kwargs):
+        with self._lock:
+            q = self._queues.get(k)
+            entry = q.popleft() if q else None
+            if entry is None:
+                self.misses[k[0]] += 1
+        if entry is None:
+            if on_miss is not None:
+                return on_miss(*args, **kwargs)
+            raise ReplayMissError(f"기록 없음: {k[0]} {k[1]}")
+        ok, value, elapsed = entry
+        if self.replay_timing:
+            time.sleep(elapsed)
+        if not ok:
+            raise value
+        return value
+
+def _picklable_exc(e: Exception) -> Exception:
+    try:
+        pickle.loads(pickle.dumps(e))
+        return e
+    except Exception:
+        return RuntimeError(f"{type(e).__name__}: {e}")
+
+# 프로세스 공용 인스턴스(환경변수로 모드 결정)
+RECORDER = CycleRecorder(
+    record_path=os.getenv("CYCLE_RECORD", ""),
+    replay_path=os.getenv("CYCLE_REPLAY", ""),
+    replay_timing=bool(int(os.getenv("CYCLE_REPLAY_TIMING", "0"))),
+)
+recorded = RECORDER.recorded
+
+def summarize(path: str) -> list:
+    """기록 파일 요약: 호출 이름별 (건수, 총 소요초, 최대 소요초)"""
+    with gzip.open(path, "rb") as f:
+        data = pickle.load(f)
+    agg = defaultdict(lambda: [0, 0.0, 0.0])
+    for _, name, elapsed in data.get("timeline", []):
+        a = agg[name]
+        a[0] += 1
+        a[1] += elapsed
+        a[2] = max(a[2], elapsed)
+    return sorted(((n, c, round(t, 3), round(m, 3)) for n, (c, t, m) in agg.items()),
+                  key=lambda r: -r[2])
+
+if __name__ == "__main__":
+    # 기록 요약:  python3 -m trade_server.cycle_recorder info cycle.pkl.gz
+    # 재생 실행:  python3 -m trade_server.cycle_recorder replay cycle.pkl.gz [--profile]
+    import argparse
+    p = argparse.ArgumentParser(description="사이클 기록 요약/재생")
+    p.add_argument("command", choices=("info", "replay"))
+    p.add_argument("path")
+    p.add_argument("--profile", action="store_true", help="cProfile 누적시간 상위 30개 출력")
+    p.add_argument("--timing", action="store_true", help="기록된 응답 지연 재현")
+    a = p.parse_args()
+    if a.command == "info":
+        for name, cnt, total, mx in summarize(a.path):
+            print(f"  {name:<16} calls={cnt:<6} total={total:>8}s  max={mx}s")
+        sys.exit(0)
+    # 재생: 환경변수 설정 후 운영 모듈 import(config가 RECORDER 모드를 참조)
+    os.environ["CYCLE_REPLAY"] = a.path
+    os.environ["CYCLE_REPLAY_TIMING"] = "1" if a.timing else "0"
+    os.environ.pop("CYCLE_RECORD", None)
+    for k in ("APCA_LIVE_API_KEY_ID", "APCA_LIVE_API_SECRET_KEY",
+              "APCA_PAPER_API_KEY_ID", "APCA_PAPER_API_SECRET_KEY"):
+        os.environ.setdefault(k, "replay")   # REST 객체 생성용 더미(재생 중 네트워크 호출 없음)
+    from trade_server import cycle_recorder as _cr
+    mode = _cr.RECORDER.meta.get("mode", "paper")
+    os.environ["TRADE_MODE"] = mode
+    from trade_server.engine import run
+    t0 = time.perf_counter()
+    if a.profile:
+        import cProfile, pstats
+        prof = cProfile.Profile()
+        prof.runcall(run, mode)
+        pstats.Stats(prof).sort_stats("cumulative").print_stats(30)
+    else:
+        run(mode)
+    print(f"[REPLAY] {time.perf_counter() - t0:.3f}s {_cr.RECORDER.report()}")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# cycle_scheduler.py
+# 사이클 시간예산(deadline) 기반 작업 우선순위
+# • 예산은 사이클 시작(engine.run)부터: 청산 점검 → 스크리닝(Top100) → 진입 후보 순으로 소진
+# • 보유 포지션 청산 점검 먼저(리스크 우선, 예산 초과여도 생략하지 않음, 스크리닝 지연에 묶이지 않음)
+# • 진입 후보는 사전점수(Top100 거래대금) 순으로 처리, 마감 임박 시 잔여 후보 연기/폐기
+# • 연기된 후보는 다음 사이클 맨 앞(1회만), 그 다음에도 못 하면 폐기
+#   (연기 목록/소요시간 추정치는 CYCLE_STATE_FILE에 저장 → 사이클마다 새 프로세스여도 이어짐)
+# • 사이클별 리포트(소요/초과/생략) 출력 + logs/cycle_reports.csv 기록
+# ----------------------------------------
+
+import os
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from trade_server.config import CYCLE_BUDGET_SEC, CYCLE_RESERVE_SEC, CYCLE_STATE_FILE, LOG_DIR
+
+CYCLE_REPORT_FILE = os.path.join(LOG_DIR, "cycle_reports.csv")
+
+class CycleBudget:
+    """
+    [실전 운영] 사이클 마감시각 + 작업 종류별 소요시간 추정(EWMA)
+    - can_start(kind): 남은 시간 - 예비시간 >= 추정 소요 × safety 이면 시작 허용
+    """
+    def __init__(self, seconds: float = CYCLE_BUDGET_SEC, reserve: float = CYCLE_RESERVE_SEC,
+                 estimates: dict = None, alpha: float = 0.3, safety: float = 1.5):
+        self.seconds = seconds
+        self.reserve = reserve
+        self.alpha = alpha
+        self.safety = safety
+        self.estimates = dict(estimates or {"exit": 1.0, "entry": 1.0})
+        self.started = time.monotonic()
+        self.deadline = self.started + seconds
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def observe(self, kind: str, seconds: float):
+        prev = self.estimates.get(kind)
+        self.estimates[kind] = seconds if prev is None else prev + self.alpha * (seconds - prev)
+
+    def can_start(self, kind: str) -> bool:
+        return self.remaining() - self.reserve >= self.estimates.get(kind, 0.0) * self.safety
+
+@dataclass
+class CycleReport:
+    budget: float
+    exits_total: int = 0
+    exits_done: int = 0
+    exits_over_budget: int = 0        # 마감 이후 수행된 청산 점검 수(생략하지 않음)
+    entries_total: int = 0
+    entries_done: int = 0
+    deferred: list = field(default_factory=list)
+    dropped: list = field(default_factory=list)
+    exit_phase_sec: float = 0.0
+    screen_phase_sec: float = 0.0     # 스크리닝(전 종목 거래대금 스캔) 소요
+    entry_phase_sec: float = 0.0
+    elapsed: float = 0.0
+
+    @property
+    def overrun(self) -> bool:
+        return self.elapsed > self.budget
+
+    def summary(self) -> str:
+        return (f">>> CYCLE {self.elapsed:.1f}s/{self.budget:g}s{' OVERRUN' if self.overrun else ''} | "
+                f"exit {self.exits_done}/{self.exits_total} ({self.exit_phase_sec:.1f}s, 초과 {self.exits_over_budget}) | "
+                f"screen {self.screen_phase_sec:.1f}s | "
+                f"entry {self.entries_done}/{self.entries_total} ({self.entry_phase_sec:.1f}s) | "
+                f"연기 {len(self.deferred)} 폐기 {len(self.dropped)}")
+
+    def save(self, path: str = CYCLE_REPORT_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        need_header = not os.path.exists(path)
+        with open(path, "a", newline="") as f:
+            w = csv.writer(f)
+            if need_header:
+                w.writerow(["timestamp", "elapsed", "budget", "overrun", "exits_done", "exits_total",
+                            "exits_over_budget", "entries_done", "entries_total", "deferred", "dropped"])
+            w.writerow([datetime.now(timezone.utc).isoformat(), round(self.elapsed, 3), self.budget,
+                        int(self.overrun), self.exits_done, self.exits_total, self.exits_over_budget,
+                        self.entries_done, self.entries_total,
+                        " ".join(self.deferred), " ".join(self.dropped)])
+
+class EntryScheduler:
+    """
+    진입 후보 순서 결정 + 연기 관리(프로세스 공용 ENTRY_SCHEDULER 사용)
+    - order(symbols, scores): 지난 사이클 연기분(아직 유니버스 내) → 나머지, 각 그룹은 점수 내림차순
+    - defer(rest): 이번 사이클 미처리 후보 기록. 이미 1회 연기됐던 종목은 폐기 목록으로 반환
+    - estimates: 작업 종류별 소요시간 추정치(사이클 간 유지 → 다음 CycleBudget 초기값)
+    - load()/save(): 연기 목록 + 추정치를 state_file(JSON)에서 복원/원자적 교체 저장(생성 시 load)
+    """
+    def __init__(self, state_file: str = CYCLE_STATE_FILE):
+        self.state_file = state_file
+        self._carried = set()
+        self.load()
+
+    def load(self):
+        self._deferred, self.estimates = set(), {"exit": 1.0, "entry": 1.0}
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._deferred = set(state.get("deferred", []))
+        self.estimates.update(state.get("estimates", {}))
+
+    def save(self):
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp = f"{self.state_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"deferred": sorted(self._deferred), "estimates": self.estimates}, f)
+            os.replace(tmp, self.state_file)
+        except OSError as e:
+            print(f"[WARN] cycle state 저장 실패: {e}")
+
+    def order(self, symbols: list, scores: dict = None) -> list:
+        rank = {s: i for i, s in enumerate(symbols)}
+        key = (lambda s: (-scores.get(s, 0.0), rank[s])) if scores else (lambda s: rank[s])
+        carried = sorted((s for s in symbols if s in self._deferred), key=key)
+        rest = sorted((s for s in symbols if s not in self._deferred), key=key)
+        self._carried = set(carried)
+        self._deferred = set()
+        return carried + rest
+
+    def defer(self, rest: list):
+        """[반환] (연기, 폐기) 목록"""
+        deferred = [s for s in rest if s not in self._carried]
+        dropped = [s for s in rest if s in self._carried]
+        self._deferred = set(deferred)
+        return deferred, dropped
+
+ENTRY_SCHEDULER = EntryScheduler()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# decision_journal.py
+# 진입 판단 저널(평가 1건 = 고정폭 160바이트 레코드, 일별 append-only 파일)
+# • 기록: 지표(MA5/MA20/RSI/BB상단/거래량·비율/ATR%), 전략 임계값(동적 포함), 감성, 조건 통과 비트, 결과/사유
+# • 쓰기: 미리 할당한 bytearray 버퍼에 struct.pack_into(레코드별 bytes 생성 없음)
+#   → 버퍼 가득/JOURNAL_FLUSH_SEC 경과/일자 변경/사이클 끝/프로세스 종료 시 O_APPEND로 통째 기록
+#   (레코드 단위 write 1회 → 샤드 워커 등 여러 프로세스가 같은 일자 파일에 추가해도 레코드 경계 유지)
+# • 읽기: load_day(날짜) → NumPy structured array(np.fromfile, 복사·파싱 없음)
+# • 파일: shared_data/journal/YYYY-MM-DD.dj1 (UTC 날짜, 확장자 = 레이아웃 버전)
+# ----------------------------------------
+
+import os
+import time
+import math
+import struct
+import atexit
+import threading
+
+from trade_server.config import JOURNAL_DIR, JOURNAL_FLUSH_SEC, DECISION_JOURNAL
+
+# ts, symbol, strategy, outcome, reason, sentiment, flags, conds, pad,
+# ma5, ma20, rsi, bb_high, price, curr_vol, vol5, vol10, vol_ratio5, vol_ratio10, atr_pct,
+# rsi_limit, mul10, mul5
+RECORD = struct.Struct("<d16s16sBBbBB3x14d")
+EXT = ".dj1"
+
+# 판단 사유 코드
+REASON_SIGNAL       = 0   # 진입 신호
+REASON_NO_SIGNAL    = 1   # 조건 미충족(conds 비트로 어느 조건인지 확인)
+REASON_NO_DATA      = 2   # 분봉 없음
+REASON_INSUFFICIENT = 3   # 봉 수 부족(MA20/BB 계산 불가)
+REASON_SENTIMENT    = 4   # 부정 감성 차단
+REASON_BLOCKED      = 5   # 진입 시간대 아님(가장 먼저 검사 → 감성/조건보다 우선, conds 비트는 그대로 기록)
+REASON_NAMES = {REASON_SIGNAL: "signal", REASON_NO_SIGNAL: "no_signal", REASON_NO_DATA: "no_data",
+                REASON_INSUFFICIENT: "insufficient", REASON_SENTIMENT: "sentiment", REASON_BLOCKED: "blocked"}
+
+# flags 비트
+FLAG_DYNAMIC, FLAG_SENTIMENT_FILTER, FLAG_SHADOW = 1, 2, 4
+
+_SENTIMENT = {"positive": 1, "neutral": 0, "negative": -1}
+_NAN = float("nan")
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+class DecisionJournal:
+    """
+    [실전 운영] 진입 판단 저널(프로세스 공용 JOURNAL 사용)
+    - record(...): 버퍼에 1건 추가(락 + pack_into, 파일 I/O는 flush 시에만)
+    - capacity: 버퍼 레코드 수(기본 4096건 ≈ 640KB)
+    """
+    def __init__(self, journal_dir: str = JOURNAL_DIR, capacity: int = 4096,
+                 flush_interval: float = JOURNAL_FLUSH_SEC, enabled: bool = True):
+        self.journal_dir = journal_dir
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self._buf = bytearray(RECORD.size * capacity)
+        self._view = memoryview(self._buf)
+        self._n = 0
+        self._day_no = None          # 버퍼에 담긴 레코드의 UTC 일 번호(ts // 86400)
+        self._last_flush = time.monotonic()
+        self._names = {}             # 종목/전략명 → 인코딩 bytes 캐시(반복 인코딩 없음)
+        self._lock = threading.Lock()
+        self.written = 0
+
+    def _enc(self, s: str) -> bytes:
+        b = self._names.get(s)
+        if b is None:
+            b = self._names[s] = s.encode()[:16]
+        return b
+
+    def record(self, symbol: str, strategy: str, outcome: bool, reason: int, f: dict = None,
+               thresholds=None, conds: int = 0, sentiment: str = None, flags: int = 0, ts: float = None):
+        """
+        평가 1건 기록
+        - f: entry_features() 결과(None이면 지표 NaN)
+        - thresholds: (rsi_limit, mul10, mul5) 적용 임계값(동적 반영 후)
+        """
+        if not self.enabled:
+            return
+        ts = time.time() if ts is None else ts
+        day_no = int(ts // 86400)
+        rl, m10, m5 = thresholds if thresholds is not None else (_NAN, _NAN, _NAN)
+        sent = _SENTIMENT.get(sentiment, -2)
+        with self._lock:
+            if self._n and (day_no != self._day_no or self._n >= self.capacity):
+                self._flush_locked()
+            self._day_no = day_no
+            if f is None:
+                RECORD.pack_into(self._buf, self._n * RECORD.size, ts, self._enc(symbol), self._enc(strategy),
+                                 outcome, reason, sent, flags, conds,
+                                 _NAN, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN,
+                                 rl, m10, m5)
+            else:
+                cv, v5, v10 = f["curr_vol"], f["vol5"], f["vol10"]
+                RECORD.pack_into(self._buf, self._n * RECORD.size, ts, self._enc(symbol), self._enc(strategy),
+                                 outcome, reason, sent, flags, conds,
+                                 f["ma5"], f["ma20"], f["rsi"], f["bb_high"], f["price"], cv, v5, v10,
+                                 cv / v5 if v5 else _NAN, cv / v10 if v10 else _NAN, f["atr_pct"],
+                                 rl, m10, m5)
+            self._n += 1
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        n, self._n = self._n, 0
+        self._last_flush = time.monotonic()
+        if not n:
+            return
+        path = os.path.join(self.journal_dir, _day(self._day_no * 86400) + EXT)
+        try:
+            os.makedirs(self.journal_dir, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, self._view[:n * RECORD.size])
+            finally:
+                os.close(fd)
+            self.written += n
+        except OSError as e:
+            print(f"[WARN] decision journal 기록 실패({n}건 폐기): {e}")
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+# 프로세스 공용 인스턴스(DECISION_JOURNAL=0 이면 기록 생략)
+JOURNAL = DecisionJournal(enabled=DECISION_JOURNAL)
+atexit.register(JOURNAL.flush)
+
+# ── 읽기(분석용, NumPy) ──────────────────────────────────────────────────
+FIELDS = ["ma5", "ma20", "rsi", "bb_high", "price", "curr_vol", "vol5", "vol10",
+          "vol_ratio5", "vol_ratio10", "atr_pct", "rsi_limit", "mul10", "mul5"]
+
+def record_dtype():
+    """RECORD와 동일한 바이트 레이아웃의 NumPy structured dtype"""
+    import numpy as np
+    dt = np.dtype([("ts", "<f8"), ("symbol", "S16"), ("strategy", "S16"),
+                   ("outcome", "u1"), ("reason", "u1"), ("sentiment", "i1"), ("flags", "u1"),
+                   ("conds", "u1"), ("_pad", "V3")] + [(n, "<f8") for n in FIELDS])
+    assert dt.itemsize == RECORD.size
+    return dt
+
+def load_day(day: str, journal_dir: str = JOURNAL_DIR):
+    """
+    [분석] 일자(YYYY-MM-DD) 저널 → NumPy structured array(레코드 경계 밖 꼬리 바이트는 무시)
+    예) a = load_day("2026-10-19"); a[a["reason"] == REASON_NO_SIGNAL]["rsi"]
+    """
+    import numpy as np
+    dt = record_dtype()
+    path = os.path.join(journal_dir, day + EXT)
+    if not os.path.exists(path):
+        return np.empty(0, dtype=dt)
+    count = os.path.getsize(path) // dt.itemsize
+    return np.fromfile(path, dtype=dt, count=count)
+
+def to_frame(arr):
+    """[분석] structured array → pandas DataFrame(문자열 디코드, ts → UTC datetime, 사유 이름)"""
+    import pandas as pd
+    df = pd.DataFrame({n: arr[n] for n in arr.dtype.names if n != "_pad"})
+    df["ts"] = pd.to_datetime(df["ts"], unit="s", utc=True)
+    for c in ("symbol", "strategy"):
+        df[c] = df[c].str.decode("utf-8")
+    df["reason"] = df["reason"].map(REASON_NAMES)
+    return df
+
+if __name__ == "__main__":
+    # 일자 요약: python3 -m trade_server.decision_journal [YYYY-MM-DD]
+    #  → 전략×사유 건수, 조건별 통과율(no_signal 중) — 임계값 보정 참고
+    import sys
+    from trade_server.buy_strategies import COND_MA, COND_RSI, COND_VOL10, COND_BB, COND_VOL5
+    day = sys.argv[1] if len(sys.argv) > 1 else _day(time.time())
+    a = load_day(day)
+    print(f"{day}: {len(a)} evaluations")
+    if len(a):
+        df = to_frame(a)
+        print(df.groupby(["strategy", "reason"]).size().unstack(fill_value=0).to_string())
+        ns = a[a["reason"] == REASON_NO_SIGNAL]
+        for name, bit in (("MA5>MA20", COND_MA), ("RSI<limit", COND_RSI), ("vol>10d", COND_VOL10),
+                          ("price>BB", COND_BB), ("vol>5d", COND_VOL5)):
+            rate = float((ns["conds"] & bit).astype(bool).mean()) if len(ns) else math.nan
+            print(f"  {name:<10} pass {rate:.1%}")
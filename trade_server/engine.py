@@ -3,30 +3,68 @@
 # engine.py
 # 실전 자동매매 시스템 공식 진입점
 # • TRADE_MODE(paper/prod) 분기(환경/인자)
-# • fetch_top100 + main (main_trading.py 기준)
+# • 사이클 예산 시작 → main(청산 점검 → fetch_top100 스크리닝 → 진입) (main_trading.py 기준)
 # • yfinance, 테스트, 임시, 예시 코드 절대 없음
 # • 실전 운영 문서·정책 100% 일치, 상세 주석
 # ----------------------------------------
 
 import sys                                    # 명령줄 인자 처리
 import os                                     # 환경변수 설정/확인
+import csv                                    # universe.csv 발행
 
 # main_trading.py 공식 함수(Top100, 자동매매 메인)
 from trade_server.main_trading import main, fetch_top100
+from trade_server.config import UNIVERSE_FILE, POSITIONS_FILE, RECONCILER_STATE_FILE, CYCLE_STATE_FILE
+from trade_server.cycle_recorder import RECORDER
+from trade_server.cycle_scheduler import CycleBudget, ENTRY_SCHEDULER
+from trade_server.history_store import compact_history
+
+def publish_universe(symbols: list[str], path: str = UNIVERSE_FILE):
+    """
+    [실전 운영] Top100을 shared_data/universe.csv로 원자적 발행
+    - 분석 서버 감성 워커(sentiment_worker.py)가 사전계산 대상으로 사용
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["rank", "symbol"])
+        w.writerows((i, s) for i, s in enumerate(symbols, start=1))
+    os.replace(tmp, path)
 
 def run(mode: str = "prod"):
     """
     [실전 운영]
     - mode: "prod"(실거래) or "paper"(모의투자, IEX)
     - TRADE_MODE 환경변수 자동설정(아래 분기에서 config.py까지 전달)
-    - Top100 종목 스크리닝 후 전체 자동매매 메인로직(main) 실행
+    - 사이클 예산(CYCLE_BUDGET_SEC)은 여기서 시작 → 보유 청산 점검 후 Top100 스크리닝, 진입 순
     """
     os.environ["TRADE_MODE"] = mode
-    # 1) Top100 선정 (프리+정규+애프터 전체, 데이터 fallback)
-    symbols = fetch_top100()
-    print(f"=== {mode.upper()} MODE: fetched Top100 ===")
-    # 2) 자동매매 메인로직
-    main(symbols)
+    # 0) (CYCLE_RECORD/CYCLE_REPLAY) 사이클 시작 상태 저장/복원
+    RECORDER.begin_cycle({"positions": POSITIONS_FILE, "reconciler": RECONCILER_STATE_FILE,
+                          "scheduler": CYCLE_STATE_FILE}, mode=mode)
+    if RECORDER.replaying:
+        ENTRY_SCHEDULER.load()   # 기록 당시 연기 목록/추정치
+    budget = CycleBudget(estimates=ENTRY_SCHEDULER.estimates)
+
+    def screen():
+        # Top100 선정(프리+정규+애프터 전체, 데이터 fallback) → 분석 서버용 universe 발행
+        symbols, scores = fetch_top100(with_scores=True)
+        print(f"=== {mode.upper()} MODE: fetched Top100 ===")
+        publish_universe(symbols)
+        return symbols, scores
+
+    try:
+        # 1) 자동매매 메인로직(시간예산: 청산 점검 우선 → 스크리닝 → 진입은 거래대금 순)
+        main(budget=budget, screen=screen)
+        # 2) 거래/평가 이력 증분 이관(Parquet, pyarrow 미설치 등 실패해도 매매에는 영향 없음)
+        try:
+            print(f">>> history compacted {compact_history()}")
+        except Exception as e:
+            print(f"[WARN] history 이관 실패: {e}")
+    finally:
+        # 예외/중단으로 끝난 사이클도 그 시점까지의 기록을 남김(재현 대상)
+        RECORDER.save()
 
 if __name__ == "__main__":
     """
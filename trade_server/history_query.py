@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# history_query.py
+# 거래/평가 이력 분석 쿼리(history_store 파티션 대상)
+# • 필요한 날짜 파티션/컬럼만 스캔(pyarrow.dataset, hive 파티션 pruning)
+# • 배치 단위 부분집계 후 합산 → 이력 규모와 무관하게 메모리 상한 유지
+# • 실현손익(종목×일), 낙폭(drawdown), 청산 사유별 승률/손익
+# ----------------------------------------
+
+from trade_server.config import HISTORY_DIR
+
+CHUNK_ROWS = 1 << 18   # 부분집계 단위 행수(메모리 상한 ≈ CHUNK_ROWS × 스캔 컬럼 폭)
+
+def _dataset(kind: str, history_dir: str = HISTORY_DIR):
+    import os
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    path = os.path.join(history_dir, kind)
+    if not os.path.isdir(path):
+        return None
+    part = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+    return ds.dataset(path, format="parquet", partitioning=part)
+
+def _filter(start: str = None, end: str = None, symbols: list = None, extra=None):
+    """날짜 범위(YYYY-MM-DD, 포함) / 종목 필터 → 파티션 pruning 가능한 dataset 표현식"""
+    import pyarrow.dataset as ds
+    expr = None
+    conds = []
+    if start:
+        conds.append(ds.field("date") >= start)
+    if end:
+        conds.append(ds.field("date") <= end)
+    if symbols:
+        conds.append(ds.field("symbol").isin(list(symbols)))
+    if extra is not None:
+        conds.append(extra)
+    for c in conds:
+        expr = c if expr is None else expr & c
+    return expr
+
+def _chunks(dset, columns: list, flt=None):
+    """파티션 배치를 CHUNK_ROWS 단위 Table로 묶어 반환(작은 일별 파일의 집계 호출 횟수 절감)"""
+    import pyarrow as pa
+    buf, rows = [], 0
+    for batch in dset.to_batches(columns=columns, filter=flt, fragment_readahead=16):
+        if batch.num_rows == 0:
+            continue
+        buf.append(batch)
+        rows += batch.num_rows
+        if rows >= CHUNK_ROWS:
+            yield pa.Table.from_batches(buf)
+            buf, rows = [], 0
+    if buf:
+        yield pa.Table.from_batches(buf)
+
+def _aggregate(kind: str, keys: list, aggs: list, columns: list, flt=None,
+               history_dir: str = HISTORY_DIR, derive=None):
+    """
+    배치별 group_by 부분집계 → 최종 재집계(sum/count/min/max 조합 가능한 집계만)
+    - aggs: [(column, "sum"|"count"|"min"|"max"), ...]
+    - derive(table) → table: 배치별 파생 컬럼 추가(예: 승/패 플래그)
+    [반환] pyarrow.Table (keys + "<col>_<agg>")
+    """
+    dset = _dataset(kind, history_dir)
+    if dset is None:
+        return None
+    combine = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+    partials = []
+    for t in _chunks(dset, columns, flt):
+        if derive is not None:
+            t = derive(t)
+        partials.append(t.group_by(keys).aggregate(aggs))
+        if len(partials) >= 64:
+            partials = [_recombine(partials, keys, aggs, combine)]
+    if not partials:
+        return None
+    return _recombine(partials, keys, aggs, combine)
+
+def _recombine(partials, keys, aggs, combine):
+    import pyarrow as pa
+    t = pa.concat_tables(partials)
+    names = [f"{c}_{a}" for c, a in aggs]
+    out = t.group_by(keys).aggregate([(n, combine[a]) for n, (_, a) in zip(names, aggs)])
+    # 재집계 컬럼명 "<col>_<agg>_<combine>" → "<col>_<agg>", 순서는 keys 먼저
+    return out.select(keys + [f"{n}_{combine[a]}" for n, (_, a) in zip(names, aggs)]) \
+              .rename_columns(keys + names)
+
+def realized_pnl(start: str = None, end: str = None, symbols: list = None,
+                 history_dir: str = HISTORY_DIR):
+    """
+    [분석] 종목×일 실현손익
+    [반환] DataFrame: date, symbol, pnl, qty, trades (date, symbol 정렬)
+    """
+    import pyarrow.dataset as ds
+    t = _aggregate("trades", ["date", "symbol"],
+                   [("pnl", "sum"), ("qty", "sum"), ("pnl", "count")],
+                   ["date", "symbol", "pnl", "qty"],
+                   _filter(start, end, symbols, ds.field("side") == "sell"), history_dir)
+    if t is None:
+        import pandas as pd
+        return pd.DataFrame(columns=["date", "symbol", "pnl", "qty", "trades"])
+    df = t.to_pandas().rename(columns={"pnl_sum": "pnl", "qty_sum": "qty", "pnl_count": "trades"})
+    return df.sort_values(["date", "symbol"]).reset_index(drop=True)
+
+def exit_reason_breakdown(start: str = None, end: str = None, symbols: list = None,
+                          history_dir: str = HISTORY_DIR):
+    """
+    [분석] 청산 사유별 건수/실현손익/승률
+    [반환] DataFrame: reason, trades, wins, win_rate, pnl, avg_pnl
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    def _wins(t):
+        return t.append_column("win", pc.cast(pc.greater(t["pnl"], 0), "int64"))
+
+    t = _aggregate("trades", ["reason"],
+                   [("pnl", "sum"), ("pnl", "count"), ("win", "sum")],
+                   ["reason", "pnl"],
+                   _filter(start, end, symbols, ds.field("side") == "sell"), history_dir, _wins)
+    if t is None:
+        import pandas as pd
+        return pd.DataFrame(columns=["reason", "trades", "wins", "win_rate", "pnl", "avg_pnl"])
+    df = t.to_pandas().rename(columns={"pnl_sum": "pnl", "pnl_count": "trades", "win_sum": "wins"})
+    df["reason"] = df["reason"].replace("", "unknown")
+    df["win_rate"] = (df["wins"] / df["trades"].where(df["trades"] > 0)).round(4)
+    df["avg_pnl"] = (df["pnl"] / df["trades"].where(df["trades"] > 0)).round(4)
+    return df[["reason", "trades", "wins", "win_rate", "pnl", "avg_pnl"]] \
+        .sort_values("trades", ascending=False).reset_index(drop=True)
+
+def _eod_unrealized(start: str = None, end: str = None, history_dir: str = HISTORY_DIR):
+    """일별 장마감 기준(그날 마지막 mark) 평가손익 합계 → {date: unrealized}"""
+    dset = _dataset("marks", history_dir)
+    if dset is None:
+        return {}
+    last = {}   # (date, symbol) → (ts, unrealized)
+    for t in _chunks(dset, ["date", "symbol", "ts", "unrealized"], _filter(start, end)):
+        g = t.sort_by("ts").group_by(["date", "symbol"], use_threads=False) \
+             .aggregate([("ts", "last"), ("unrealized", "last")])
+        for d, s, ts, u in zip(*(g[c].to_pylist() for c in ("date", "symbol", "ts_last", "unrealized_last"))):
+            prev = last.get((d, s))
+            if prev is None or ts >= prev[0]:
+                last[(d, s)] = (ts, u)
+    out = {}
+    for (d, _), (_, u) in last.items():
+        out[d] = out.get(d, 0.0) + (u or 0.0)
+    return out
+
+def drawdown(start: str = None, end: str = None, history_dir: str = HISTORY_DIR):
+    """
+    [분석] 일별 손익곡선/낙폭
+    - equity = 누적 실현손익 + 당일 마지막 mark 기준 평가손익
+    [반환] DataFrame: date, realized, unrealized, equity, peak, drawdown
+           (최대낙폭: df["drawdown"].min())
+    """
+    import pandas as pd
+    daily = realized_pnl(start, end, history_dir=history_dir).groupby("date")["pnl"].sum()
+    unreal = pd.Series(_eod_unrealized(start, end, history_dir), dtype="float64")
+    dates = sorted(set(daily.index) | set(unreal.index))
+    df = pd.DataFrame({"date": dates})
+    df["realized"] = df["date"].map(daily).fillna(0.0)
+    df["unrealized"] = df["date"].map(unreal).fillna(0.0)
+    df["equity"] = df["realized"].cumsum() + df["unrealized"]
+    df["peak"] = df["equity"].cummax()
+    df["drawdown"] = df["equity"] - df["peak"]
+    return df
+
+if __name__ == "__main__":
+    # 요약 리포트: python3 -m trade_server.history_query [start] [end]
+    import sys
+    s = sys.argv[1] if len(sys.argv) > 1 else None
+    e = sys.argv[2] if len(sys.argv) > 2 else None
+    print(realized_pnl(s, e).groupby("symbol")["pnl"].sum().sort_values().to_string())
+    print(exit_reason_breakdown(s, e).to_string(index=False))
+    dd = drawdown(s, e)
+    if len(dd):
+        print(f"max drawdown: {dd['drawdown'].min():.2f} (equity {dd['equity'].iloc[-1]:.2f})")
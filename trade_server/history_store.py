@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# history_store.py
+# 거래/평가 이력 날짜 파티션 Parquet 저장소
+# • trades.csv / marks.csv 증분 이관(마지막 처리 바이트 오프셋 기록, 재파싱 없음)
+# • 경로: history/{trades|marks}/date=YYYY-MM-DD/part-*.parquet (hive 파티션)
+# • 실현손익 미기록 매도(기존 로그)는 이동평균 단가로 보정 기록
+# • 파티션별 작은 파일은 MAX_PARTS 초과 시 1개로 병합
+# • 크래시 안전(중복 이관 없음):
+#   - _state.json을 먼저 전진(pending에 배치 번호/시작 위치 기록) → part 기록 → pending 해제
+#     (기록 도중 중단 시 다음 실행이 pending 구간을 같은 배치 번호로 재기록)
+#   - part 이름 = 배치 번호 범위 part-{lo}-{hi}: 이미 그 배치를 포함한 part가 있으면 건너뜀,
+#     병합 중단으로 남은 입력 part(다른 part 범위에 포함)는 다음 기록 시 삭제
+# • 조회는 history_query.py 참고
+# ----------------------------------------
+
+import os
+import re
+import csv
+import json
+from datetime import datetime, timezone
+
+from trade_server.config import TRADES_LOG_FILE, MARKS_LOG_FILE, HISTORY_DIR
+
+MAX_PARTS = 8   # 파티션당 part 파일 수 상한(초과 시 병합)
+_PART_RE = re.compile(r"^part-(\d+)-(\d+)\.parquet$")   # 배치 번호 범위(이전 형식 part-{ns}는 0)
+
+def _schemas():
+    import pyarrow as pa
+    ts = pa.timestamp("us", tz="UTC")
+    return {
+        "trades": pa.schema([
+            ("ts", ts), ("symbol", pa.string()), ("side", pa.string()),
+            ("qty", pa.float64()), ("price", pa.float64()), ("pnl", pa.float64()),
+            ("reason", pa.string()),
+        ]),
+        "marks": pa.schema([
+            ("ts", ts), ("symbol", pa.string()), ("qty", pa.float64()),
+            ("entry_price", pa.float64()), ("price", pa.float64()), ("unrealized", pa.float64()),
+        ]),
+    }
+
+def _state_path(history_dir: str) -> str:
+    return os.path.join(history_dir, "_state.json")
+
+def _load_state(history_dir: str) -> dict:
+    try:
+        with open(_state_path(history_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"trades": {}, "marks": {}, "cost_basis": {}, "seq": 0, "pending": {}}
+
+def _save_state(history_dir: str, state: dict):
+    tmp = _state_path(history_dir) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, _state_path(history_dir))
+
+def _resume_offset(f, cursor: dict, st) -> int:
+    """
+    이어 읽을 위치: 직전 헤더 길이(head) 대비 변화만큼 보정 후, 마지막 처리 줄(tail)이
+    그 위치 바로 앞에 그대로 있으면 이어서, 아니면 처음부터(파일 교체/잘림)
+    - trade_logger 헤더 이관(reason 추가, 원자적 교체 → inode 변경)도 재이관 없이 이어감
+    - tail 없는 이전 형식 cursor는 inode/크기 기준
+    """
+    offset = cursor.get("offset", 0)
+    if not offset:
+        return 0
+    tail = cursor.get("tail", "").encode("utf-8")
+    if not tail:
+        return offset if cursor.get("inode") == st.st_ino and st.st_size >= offset else 0
+    first = f.readline()
+    offset += len(first) - cursor.get("head", len(first))
+    if offset < len(tail) or offset > st.st_size:
+        return 0
+    f.seek(offset - len(tail))
+    return offset if f.read(len(tail)) == tail else 0
+
+def _read_new_rows(path: str, cursor: dict, limit: int = None) -> list:
+    """
+    cursor(inode/offset/head/tail) 이후 완결된 줄만 읽어 반환, cursor 제자리 갱신
+    - 파일 교체/잘림 시 처음부터(헤더만 바뀐 경우는 _resume_offset 참고)
+    - 마지막 줄이 쓰는 중(개행 없음)이면 다음 회차로 미룸
+    - limit: 최대 바이트(pending 배치 재기록 시 원래 배치 구간만)
+    """
+    if not os.path.exists(path):
+        return []
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        offset = _resume_offset(f, cursor, st)
+        f.seek(0)
+        head = len(f.readline())
+        f.seek(offset)
+        data = f.read() if limit is None else f.read(limit)
+    end = data.rfind(b"\n") + 1
+    cursor["inode"], cursor["offset"], cursor["head"] = st.st_ino, offset + end, head
+    if end:
+        cursor["tail"] = data[data.rfind(b"\n", 0, end - 1) + 1:end].decode("utf-8")
+    elif not offset:
+        cursor["tail"] = ""
+    lines = data[:end].decode("utf-8").splitlines()
+    return [r for r in csv.reader(lines) if r and r[0] != "timestamp"]
+
+def _to_float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def _parse_ts(s: str):
+    """trades/marks 타임스탬프(utcnow().isoformat(), tz 없음) → UTC datetime"""
+    dt = datetime.fromisoformat(s)
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _trade_records(rows: list, cost_basis: dict) -> list:
+    """trades.csv 행 → 레코드(실현손익 공란 매도는 이동평균 단가로 보정)"""
+    out = []
+    for r in rows:
+        ts, sym, side, qty, price = r[0], r[1], r[2], _to_float(r[3]), _to_float(r[4])
+        if qty is None or price is None:
+            continue
+        pnl = _to_float(r[5]) if len(r) > 5 else None
+        reason = r[6] if len(r) > 6 else ""
+        held, avg = cost_basis.get(sym, (0.0, 0.0))
+        if side == "buy":
+            new_qty = held + qty
+            avg = (avg * held + price * qty) / max(new_qty, 1e-9)
+            held = new_qty
+        else:
+            if pnl is None and held > 0:
+                pnl = round((price - avg) * qty, 4)
+            held = max(0.0, held - qty)
+        cost_basis[sym] = (held, avg)
+        out.append({"ts": ts, "symbol": sym, "side": side, "qty": qty, "price": price,
+                    "pnl": pnl, "reason": reason})
+    return out
+
+def _mark_records(rows: list) -> list:
+    out = []
+    for r in rows:
+        qty, ep, px = _to_float(r[2]), _to_float(r[3]), _to_float(r[4])
+        if qty is None or ep is None or px is None:
+            continue
+        out.append({"ts": r[0], "symbol": r[1], "qty": qty, "entry_price": ep,
+                    "price": px, "unrealized": round((px - ep) * qty, 4)})
+    return out
+
+def _part_range(name: str):
+    """part 파일 이름 → (lo, hi) 배치 번호 범위, 이전 형식(part-{ns}.parquet)은 (0, 0), 그 외 None"""
+    m = _PART_RE.match(name)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    if name.startswith("part-") and name.endswith(".parquet"):
+        return 0, 0
+    return None
+
+def _parts(part_dir: str) -> dict:
+    out = {}
+    for p in os.listdir(part_dir):
+        rng = _part_range(p)
+        if rng is not None:
+            out[p] = rng
+    return out
+
+def _drop_covered(part_dir: str) -> dict:
+    """다른 part 범위에 포함된 part(병합 후 삭제 전 중단된 입력) 삭제 [반환] 남은 {이름: 범위}"""
+    parts = _parts(part_dir)
+    for p, (lo, hi) in list(parts.items()):
+        if any(q != p and (qlo, qhi) != (lo, hi) and qlo <= lo and hi <= qhi
+               for q, (qlo, qhi) in parts.items()):
+            os.remove(os.path.join(part_dir, p))
+            del parts[p]
+    return parts
+
+def _write_table(table, part_dir: str, name: str):
+    """임시파일('.' 접두 → 조회 시 무시) 기록 후 원자적 교체"""
+    import pyarrow.parquet as pq
+    tmp = os.path.join(part_dir, f".{name}.tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, os.path.join(part_dir, name))
+
+def _write_partitions(kind: str, records: list, history_dir: str, seq: int) -> int:
+    """
+    레코드를 날짜(ts 앞 10자리)별로 나눠 배치 번호 seq의 part 파일 1개씩 기록
+    - 그 날짜 파티션에 seq를 포함한 part가 이미 있으면 건너뜀(재기록 멱등)
+    """
+    import pyarrow as pa
+
+    schema = _schemas()[kind]
+    by_date = {}
+    for rec in records:
+        by_date.setdefault(rec["ts"][:10], []).append(rec)
+    for date, recs in by_date.items():
+        part_dir = os.path.join(history_dir, kind, f"date={date}")
+        os.makedirs(part_dir, exist_ok=True)
+        if any(lo <= seq <= hi for lo, hi in _drop_covered(part_dir).values()):
+            continue
+        cols = {f.name: [r[f.name] for r in recs] for f in schema if f.name != "ts"}
+        ts = pa.array([_parse_ts(r["ts"]) for r in recs], type=schema.field("ts").type)
+        table = pa.table({"ts": ts, **cols}, schema=schema)
+        _write_table(table, part_dir, f"part-{seq:010d}-{seq:010d}.parquet")
+        _merge_if_needed(part_dir)
+    return len(records)
+
+def _merge_if_needed(part_dir: str, max_parts: int = MAX_PARTS):
+    """
+    파티션 내 part 파일이 max_parts 초과 시 ts 순 1개 파일로 병합(임시파일 → 교체 → 입력 삭제)
+    - 병합 파일 이름은 입력 배치 범위 전체(part-{min lo}-{max hi}) → 입력 삭제 전 중단되어도
+      남은 입력은 _drop_covered가 다음 기록 시 삭제
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parts = _parts(part_dir)
+    if len(parts) <= max_parts:
+        return
+    names = sorted(parts)
+    table = pa.concat_tables([pq.read_table(os.path.join(part_dir, p)) for p in names]).sort_by("ts")
+    lo, hi = min(r[0] for r in parts.values()), max(r[1] for r in parts.values())
+    merged = f"part-{lo:010d}-{hi:010d}.parquet"
+    _write_table(table, part_dir, merged)
+    for p in names:
+        if p != merged:
+            os.remove(os.path.join(part_dir, p))
+
+def _resume_offset_of(path: str, cursor: dict) -> int:
+    """cursor 기준 실제 이어 읽은 시작 위치(pending 배치 바이트 수 계산용)"""
+    with open(path, "rb") as f:
+        return _resume_offset(f, dict(cursor), os.stat(path))
+
+def _records(kind: str, rows: list, cost_basis: dict) -> list:
+    return _trade_records(rows, cost_basis) if kind == "trades" else _mark_records(rows)
+
+def compact_history(trades_file: str = TRADES_LOG_FILE, marks_file: str = MARKS_LOG_FILE,
+                    history_dir: str = HISTORY_DIR) -> dict:
+    """
+    [운영] trades.csv / marks.csv 신규 행을 날짜 파티션 Parquet으로 이관
+    - 원본 CSV는 그대로 둠(감사용), 처리 위치만 _state.json에 기록
+    - 배치마다 상태 먼저 저장(pending) → part 기록 → pending 해제(중단 시 다음 실행이 재기록)
+    [반환] {"trades": 이관 행수, "marks": 이관 행수}
+    """
+    os.makedirs(history_dir, exist_ok=True)
+    state = _load_state(history_dir)
+    state.setdefault("seq", 0)
+    pending = state.setdefault("pending", {})
+    out = {}
+    for kind, path in (("trades", trades_file), ("marks", marks_file)):
+        # 1) 지난 실행에서 상태만 전진하고 중단된 배치 → 같은 구간/배치 번호로 재기록
+        job = pending.get(kind)
+        if job:
+            cb = {k: tuple(v) for k, v in job.get("cost_basis", {}).items()}
+            recs = _records(kind, _read_new_rows(path, dict(job["start"]), job["bytes"]), cb)
+            _write_partitions(kind, recs, history_dir, job["seq"])
+            del pending[kind]
+            _save_state(history_dir, state)
+
+        # 2) 신규 배치: 상태(cursor/원가/pending) 먼저 저장 후 기록
+        cursor = dict(state.get(kind, {}))
+        start = dict(cursor)
+        cost_basis = {k: tuple(v) for k, v in state.get("cost_basis", {}).items()}
+        before = dict(cost_basis)
+        rows = _read_new_rows(path, cursor)
+        recs = _records(kind, rows, cost_basis)
+        state[kind] = cursor
+        if kind == "trades":
+            state["cost_basis"] = cost_basis
+        if not recs:
+            out[kind] = 0
+            _save_state(history_dir, state)
+            continue
+        state["seq"] += 1
+        resumed = _resume_offset_of(path, start)
+        pending[kind] = {"seq": state["seq"], "start": start, "bytes": cursor["offset"] - resumed,
+                         "cost_basis": before if kind == "trades" else {}}
+        _save_state(history_dir, state)
+        out[kind] = _write_partitions(kind, recs, history_dir, state["seq"])
+        del pending[kind]
+        _save_state(history_dir, state)
+    return out
+
+if __name__ == "__main__":
+    # 수동 이관: python3 -m trade_server.history_store
+    print(f"[history] compacted {compact_history()}")
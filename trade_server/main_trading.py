@@ -4,10 +4,14 @@
 # • Top100 스크리닝(거래대금)
 # • 매수: 지침 고정 조건 일괄 적용
 # • 매도: +5% 분할익절, -3% 트레일링, (옵션) -3% 손절
+# • 사이클 시간예산: 청산 점검 먼저 → 진입 후보는 거래대금 순, 마감 임박 시 연기/폐기
+# • (SHARD_WORKERS) 진입 후보 평가만 워커 분산, 주문/포지션 쓰기는 이 프로세스 단독
+# • (STRATEGY_CONFIG) 여러 전략을 같은 분봉으로 평가, 전략별 격리 파일/섀도우(가상 체결)
 # ----------------------------------------
 
 import os
 import time
+import threading
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from alpaca_trade_api.rest import REST, TimeFrame
@@ -16,11 +20,16 @@ import pandas as pd
 
 from trade_server.config import (
     API_KEY, API_SECRET, API_URL, DATA_FEED,
-    get_tradable_symbols, get_price_data, send_slack_alert,
-    PROFIT_TAKE_RATE, TRAILING_STOP_RATE, STOP_LOSS_ENABLED, STOP_LOSS_RATE,
-    USE_SENTIMENT_FILTER
+    get_tradable_symbols, get_price_data, send_slack_alert, RECONCILE_FILLS
 )
-from trade_server.buy_strategies import buy_signal
+from trade_server.buy_strategies import (
+    buy_decision, entry_features, entry_thresholds, entry_conditions
+)
+from trade_server.decision_journal import (
+    JOURNAL, REASON_SIGNAL, REASON_NO_SIGNAL, REASON_NO_DATA, REASON_INSUFFICIENT,
+    REASON_SENTIMENT, REASON_BLOCKED, FLAG_DYNAMIC, FLAG_SENTIMENT_FILTER, FLAG_SHADOW
+)
+from trade_server.strategy_config import StrategyConfig, DEFAULT_STRATEGY, load_strategies
 from trade_server.sell_strategies import (
     check_profit_take, check_trailing_stop, check_stop_loss
 )
@@ -28,10 +37,21 @@ from trade_server.position_manager import (
     load_positions, add_position, update_position, close_position, update_pnl
 )
 from trade_server.ai_sentiment_client import get_ai_sentiment
-from trade_server.trade_logger import log_trade
+from trade_server.trade_logger import log_trade, log_marks
+from trade_server.order_reconciler import OrderReconciler
+from trade_server.cycle_recorder import RECORDER, recorded
+from trade_server.cycle_scheduler import CycleBudget, CycleReport, ENTRY_SCHEDULER
+from trade_server.shard_coordinator import get_coordinator, ScanResult
+
+# 체결 리컨실러(RECONCILE_FILLS=1): 프로세스당 1개, main() 최초 호출 시 스트림 기동
+_reconciler = OrderReconciler() if RECONCILE_FILLS else None
 
 # ────────────────────────────────────────────────────────────────────────
-def fetch_top100() -> list[str]:
+def fetch_top100(with_scores: bool = False):
+    """
+    거래대금 상위 100 종목
+    - with_scores=True: (종목 리스트, {종목: 거래대금}) 반환(사이클 스케줄러 사전점수용)
+    """
     mode = os.getenv("TRADE_MODE", "prod").lower()
     feed = "sip" if mode == "prod" else "iex"
     api = REST(API_KEY, API_SECRET, API_URL, api_version="v2")
@@ -50,8 +70,11 @@ def fetch_top100() -> list[str]:
 
     top100 = sorted(dollar_vol, key=lambda s: dollar_vol[s], reverse=True)[:100]
     print(f">>> Top100 selected = {len(top100)}")
+    if with_scores:
+        return top100, {s: dollar_vol[s] for s in top100}
     return top100
 
+@recorded("top100_chunk", key=lambda api, chunk, feed: (tuple(chunk), feed))
 def _fetch_chunk(api: REST, chunk: list[str], feed: str) -> dict[str, float]:
     vol_map: dict[str, float] = {}
     now = datetime.utcnow().replace(microsecond=0)
@@ -81,106 +104,365 @@ def _fetch_chunk(api: REST, chunk: list[str], feed: str) -> dict[str, float]:
     return vol_map
 
 # ────────────────────────────────────────────────────────────────────────
-def _process_buy(api: REST, tkr: str, total: int, idx: int) -> str:
-    df = get_price_data(tkr)
-    if df is None or len(df) == 0:
-        return f"[BUY] {idx}/{total} ▶ {tkr} → 데이터 없음"
+def _replay_ack(api, **order):
+    # 재생 중 기록에 없는 주문(결정 변경): 실주문 없이 가상 접수 응답
+    return {"id": f"replay-{order['symbol']}-{order['side']}-{time.time_ns()}", **order}
+
+@recorded("order", key=lambda api, **o: (o["symbol"], o["side"]),
+          encode=lambda o: getattr(o, "_raw", o), on_miss=_replay_ack)
+def _submit_order(api: REST, **order):
+    # 기록/재생 지점: 재생 시 실주문 없이 기록된 접수 응답 반환
+    return api.submit_order(**order)
+
+def _record_order(order, symbol: str, side: str, qty: float, price: float, reason: str = ""):
+    """
+    주문 접수 후 포지션/로그 반영
+    - 리컨실러 사용 시: 주문만 등록, 포지션/trades.csv는 체결 이벤트에서 반영
+    - 미사용 시(RECONCILE_FILLS=0): 기존 방식(지정가 전량 체결 가정, 즉시 반영)
+    """
+    if _reconciler is not None:
+        if order is not None:
+            _reconciler.track(order, reason)
+        return
+    if side == "buy":
+        add_position(symbol, qty, price)
+    else:
+        close_position(symbol, qty, price)
+    log_trade(symbol, side, qty, price, reason=reason)
 
-    if not buy_signal(tkr, df):  # ← BUGFIX: (symbol, df)
-        return f"[BUY] {idx}/{total} ▶ {tkr} → 신호없음"
+def _shadow_fill(st: StrategyConfig, symbol: str, side: str, qty: float, price: float,
+                 reason: str, entry_price: float = None) -> bool:
+    """
+    섀도우 전략: 주문 없이 지정가 전량 체결 가정으로 전략 격리 파일에 반영(매도는 실현손익 기록)
+    - 매수는 그 전략에 이미 보유(open) 중이면 생략(신호마다 재매수 방지)
+    [반환] 반영 여부
+    """
+    if side == "buy":
+        df = load_positions(st.positions_file)
+        if ((df["symbol"] == symbol) & (df["status"] == "open")).any():
+            return False
+        add_position(symbol, qty, price, st.positions_file)
+        log_trade(symbol, side, qty, price, trades_file=st.trades_file, reason=reason)
+    else:
+        close_position(symbol, qty, price, st.positions_file)
+        pnl = round((price - entry_price) * qty, 6) if entry_price is not None else None
+        log_trade(symbol, side, qty, price, pnl, trades_file=st.trades_file, reason=reason)
+    return True
+
+def _tag(st: StrategyConfig) -> str:
+    return "" if st is DEFAULT_STRATEGY else f"[{st.name}{'/shadow' if st.shadow else ''}]"
+
+class PriceCache:
+    """
+    사이클 내 분봉 공유(종목당 get_price_data 1회 → 전략 수와 무관하게 시장 데이터 I/O 동일)
+    """
+    def __init__(self, fetch=get_price_data):
+        self._fetch = fetch
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, symbol: str):
+        with self._lock:
+            if symbol in self._data:
+                return self._data[symbol]
+        df = self._fetch(symbol)
+        with self._lock:
+            return self._data.setdefault(symbol, df)
+
+def evaluate_entries(tkr: str, strategies: list = None, fetch=get_price_data) -> dict:
+    """
+    진입 후보 1종목을 전략별로 평가(주문/포지션 변경 없음 → 샤드 워커에서도 그대로 사용)
+    - 분봉 조회/지표 계산/감성 조회는 1회, 전략별로는 임계값 비교만
+    - 전략별 판단 근거(지표/임계값/조건 비트/결과)는 판단 저널(JOURNAL)에 1건씩 기록
+    [반환] {전략 이름: (진입가 | None, 사유)}
+    """
+    strategies = strategies or [DEFAULT_STRATEGY]
+    df = fetch(tkr)
+    if df is None or len(df) == 0:
+        for st in strategies:
+            JOURNAL.record(tkr, st.name, False, REASON_NO_DATA, flags=_journal_flags(st))
+        return {st.name: (None, "데이터 없음") for st in strategies}
 
-    # (옵션) 부정 감성 시 진입 차단 플래그 사용 시, 2중 검증
-    if USE_SENTIMENT_FILTER:
-        ai_signal, _ = get_ai_sentiment(tkr)
-        if ai_signal == "negative":
-            return f"[BUY] {idx}/{total} ▶ {tkr} → AI 부정 감성 차단"
+    feats = entry_features(df)
+    # (옵션) 부정 감성 진입 차단: 필요한 전략이 있을 때만 1회 조회해 공유
+    if feats is not None and any(st.sentiment_filter for st in strategies):
+        feats["sentiment"] = get_ai_sentiment(tkr)[0]
+    sentiment = feats.get("sentiment") if feats is not None else None
 
     ep = float(df["Close"].iloc[-1])
+    out = {}
+    for st in strategies:
+        # 저널 사유 = buy_signal 검사 순서상 실제로 멈춘 단계(시간대 → 봉 수 → 감성 → 5개 조건)
+        ok, stage = buy_decision(tkr, df, st, feats)
+        out[st.name] = (ep, "신호") if ok else (None, _STAGE_TEXT.get(stage, "신호없음"))
+        if feats is None:
+            # 지표 없음: 시간대 차단(market)이 봉 수 부족보다 먼저 검사되므로 사유도 단계에서 도출
+            JOURNAL.record(tkr, st.name, False, _STAGE_REASON.get(stage, REASON_INSUFFICIENT),
+                           flags=_journal_flags(st))
+            continue
+        th = entry_thresholds(feats, st)
+        conds = entry_conditions(feats, *th)
+        JOURNAL.record(tkr, st.name, ok, _STAGE_REASON.get(stage, REASON_NO_SIGNAL),
+                       feats, th, conds, sentiment, _journal_flags(st))
+    return out
+
+_STAGE_TEXT = {"market": "진입 시간대 아님", "sentiment": "AI 부정 감성 차단"}
+_STAGE_REASON = {"signal": REASON_SIGNAL, "market": REASON_BLOCKED, "insufficient": REASON_INSUFFICIENT,
+                 "sentiment": REASON_SENTIMENT, "conditions": REASON_NO_SIGNAL}
+
+def _journal_flags(st: StrategyConfig) -> int:
+    return ((FLAG_DYNAMIC if st.dynamic_thresholds else 0) |
+            (FLAG_SENTIMENT_FILTER if st.sentiment_filter else 0) |
+            (FLAG_SHADOW if st.shadow else 0))
+
+def _place_entry(api: REST, st: StrategyConfig, tkr: str, ep: float, total: int, idx: int) -> str:
+    """매수 주문 접수/기록(코디네이터 전용: 주문·포지션 쓰기는 한 프로세스에서만)"""
+    if st.shadow:
+        if not _shadow_fill(st, tkr, "buy", st.qty, ep, "entry"):
+            return f"[SHADOW]{_tag(st)} BUY {idx}/{total} ▶ {tkr} → 보유중"
+        return f"[SHADOW]{_tag(st)} BUY {idx}/{total} ▶ {tkr} @ {ep}"
+
+    if _reconciler is not None and _reconciler.has_open_order(tkr, "buy"):
+        return f"[BUY]{_tag(st)} {idx}/{total} ▶ {tkr} → 미체결 매수주문 대기중"
+
     try:
-        api.submit_order(
-            symbol=tkr, qty=2, side='buy', type='limit',
+        order = _submit_order(api,
+            symbol=tkr, qty=st.qty, side='buy', type='limit',
             time_in_force='gtc', limit_price=ep, extended_hours=True
         )
     except Exception as e:
-        return f"[BUY] {idx}/{total} ▶ {tkr} → 주문실패: {e}"
+        return f"[BUY]{_tag(st)} {idx}/{total} ▶ {tkr} → 주문실패: {e}"
 
-    add_position(tkr, 2, ep)
-    log_trade(tkr, "buy", 2, ep)
-    send_slack_alert(f"[매수] {tkr} 2 @ {ep}")
-    return f"[EXEC] BUY {idx}/{total} ▶ {tkr} @ {ep}"
+    _record_order(order, tkr, "buy", st.qty, ep, "entry")
+    send_slack_alert(f"[매수] {tkr} {st.qty} @ {ep}")
+    return f"[EXEC]{_tag(st)} BUY {idx}/{total} ▶ {tkr} @ {ep}"
 
-def main(symbols: list[str]) -> None:
-    api = REST(API_KEY, API_SECRET, API_URL, api_version="v2")
-    mode = os.getenv("TRADE_MODE", "prod").upper()
-    print(f"=== MODE={mode} Top100={len(symbols)} ===")
-
-    # 1) 매수 루프
-    for idx, tkr in enumerate(symbols, start=1):
-        print(_process_buy(api, tkr, len(symbols), idx))
-
-    # 2) 보유 포지션 매도/청산 루프
-    df = load_positions()
-    open_df = df[df["status"] == "open"] if "status" in df.columns else df
-    print(f">>> Sell check for {len(open_df)} open positions")
-
-    for i, row in open_df.iterrows():
-        s = row["symbol"]
-        q = float(row["qty"])
-        ep = float(row.get("entry_price", 0))
-        hp = float(row.get("highest_price", ep))
-
-        px = get_price_data(s)
-        if px is None or len(px) == 0:
-            print(f"[SELL] {s} → 데이터 없음")
-            continue
-        cp = float(px["Close"].iloc[-1])
+def _act_on_entry(api: REST, tkr: str, results: dict, strategies: list, total: int, idx: int,
+                  error: str = "") -> None:
+    """전략별 평가 결과 → 신호 전략만 주문(실주문) 또는 가상 체결(섀도우)"""
+    for st in strategies:
+        ep, why = results.get(st.name) or (None, error or "평가 없음")
+        if ep is None:
+            print(f"[BUY]{_tag(st)} {idx}/{total} ▶ {tkr} → {why}")
+        else:
+            print(_place_entry(api, st, tkr, float(ep), total, idx))
 
-        # 미실현 손익률 기록(로그성)
-        update_pnl(s, cp)
+def _sell(api: REST, st: StrategyConfig, s: str, qty: float, cp: float, ep: float,
+          reason: str, label: str, alert: str):
+    """청산 주문(실주문 전략) 또는 가상 체결(섀도우)"""
+    if st.shadow:
+        _shadow_fill(st, s, "sell", qty, cp, reason, ep)
+        print(f"[SHADOW]{_tag(st)} {label} {s} {qty}@{cp}")
+        return
+    order = None
+    try:
+        order = _submit_order(api, symbol=s, qty=int(qty), side='sell', type='limit',
+                              time_in_force='gtc', limit_price=cp, extended_hours=True)
+    except Exception as e:
+        print(f"[SELL] {label} {s} 주문실패: {e}")
+    _record_order(order, s, "sell", qty, cp, reason)
+    send_slack_alert(alert)
+    print(f"[EXEC]{_tag(st)} {label} {s} {qty}@{cp}")
 
-        # 2-1) 분할 익절(+5% 기본): 50% 매도
-        if check_profit_take(ep, cp):
+def _exit_all(api: REST, st: StrategyConfig, s: str, q: float, cp: float, ep: float, pending: set,
+              reason: str, label: str, alert: str):
+    """
+    전량 청산(트레일링/손절): 같은 종류 미체결 청산 주문이 있으면 중복 접수 생략,
+    다른 종류(익절 지정가 등)가 걸려 있으면 리컨실러로 취소 요청 후 청산 주문
+    """
+    if reason in pending:
+        print(f"[SELL]{_tag(st)} {s} → 미체결 {label} 주문 대기중")
+        return
+    if pending:
+        n = _reconciler.cancel_open(api, s, "sell")
+        print(f"[SELL]{_tag(st)} {s} → 미체결 매도주문({', '.join(sorted(pending))}) {n}건 취소 후 {label}")
+    _sell(api, st, s, q, cp, ep, reason, label, alert)
+
+def _process_sell(api: REST, row, marks: list, st: StrategyConfig = DEFAULT_STRATEGY,
+                  prices: PriceCache = None) -> None:
+    """
+    보유 포지션 1건 청산 점검(익절/트레일링/손절, 전략별 비율) + 평가(mark) 수집
+    - 미체결 매도주문이 있어도 점검은 계속: 같은 종류 청산만 생략(익절 지정가가 손절을 막지 않음)
+    """
+    s = row["symbol"]
+    q = float(row["qty"])
+    ep = float(row.get("entry_price", 0))
+    hp = float(row.get("highest_price", ep))
+
+    px = prices.get(s) if prices is not None else get_price_data(s)
+    if px is None or len(px) == 0:
+        print(f"[SELL]{_tag(st)} {s} → 데이터 없음")
+        return
+    cp = float(px["Close"].iloc[-1])
+
+    # 미실현 손익률 기록(로그성)
+    update_pnl(s, cp, st.positions_file)
+    marks.append((s, q, ep, cp))
+
+    # 실주문 전략: 미체결 매도주문 종류(reason) → 같은 종류 재접수 방지
+    pending = (_reconciler.open_reasons(s, "sell")
+               if not st.shadow and _reconciler is not None else set())
+
+    # 1) 분할 익절(+5% 기본): 50% 매도
+    if check_profit_take(ep, cp, st.profit_take_rate):
+        if "take_profit" in pending:
+            print(f"[SELL]{_tag(st)} {s} → 미체결 TAKE-PROFIT 주문 대기중")
+        else:
             sell_qty = max(1, int(q // 2))
-            try:
-                api.submit_order(symbol=s, qty=sell_qty, side='sell', type='limit',
-                                 time_in_force='gtc', limit_price=cp, extended_hours=True)
-            except Exception as e:
-                print(f"[SELL] TAKE-PROFIT {s} 주문실패: {e}")
-            close_position(s, sell_qty, cp)
-            log_trade(s, "sell", sell_qty, cp)
-            send_slack_alert(f"[익절] {s} 분할 {sell_qty} @ {cp}")
-            print(f"[EXEC] TAKE-PROFIT {s} {sell_qty}@{cp}")
+            _sell(api, st, s, sell_qty, cp, ep, "take_profit", "TAKE-PROFIT",
+                  f"[익절] {s} 분할 {sell_qty} @ {cp}")
             # 분할 후 잔여 수량 갱신
             q -= sell_qty
 
-        # 2-2) 트레일링 스탑(최고가 대비 -3%): 전량
-        elif check_trailing_stop(hp, cp):
-            try:
-                api.submit_order(symbol=s, qty=int(q), side='sell', type='limit',
-                                 time_in_force='gtc', limit_price=cp, extended_hours=True)
-            except Exception as e:
-                print(f"[SELL] TRAILING {s} 주문실패: {e}")
-            close_position(s, q, cp)
-            log_trade(s, "sell", q, cp)
-            send_slack_alert(f"[트레일링스탑] {s} 전량 @ {cp}")
-            print(f"[EXEC] TRAILING-STOP {s} @ {cp}")
-            continue  # 전량 매도 후 다음
-
-        # 2-3) (옵션) 손절(진입가 대비 -3%): 전량
-        elif check_stop_loss(ep, cp):
-            try:
-                api.submit_order(symbol=s, qty=int(q), side='sell', type='limit',
-                                 time_in_force='gtc', limit_price=cp, extended_hours=True)
-            except Exception as e:
-                print(f"[SELL] STOP-LOSS {s} 주문실패: {e}")
-            close_position(s, q, cp)
-            log_trade(s, "sell", q, cp)
-            send_slack_alert(f"[손절] {s} 전량 @ {cp}")
-            print(f"[EXEC] STOP-LOSS {s} @ {cp}")
-            continue
+    # 2) 트레일링 스탑(최고가 대비 -3%): 전량
+    elif check_trailing_stop(hp, cp, st.trailing_stop_rate):
+        _exit_all(api, st, s, q, cp, ep, pending, "trailing_stop", "TRAILING-STOP",
+                  f"[트레일링스탑] {s} 전량 @ {cp}")
+        return  # 전량 매도 후 다음
+
+    # 3) (옵션) 손절(진입가 대비 -3%): 전량
+    elif check_stop_loss(ep, cp, st.stop_loss_rate, st.stop_loss_enabled):
+        _exit_all(api, st, s, q, cp, ep, pending, "stop_loss", "STOP-LOSS", f"[손절] {s} 전량 @ {cp}")
+        return
+
+    # 4) 최고가 갱신
+    if cp > hp:
+        update_position(s, "highest_price", cp, st.positions_file)
+        print(f"[UPDATE]{_tag(st)} highest_price {s} → {cp}")
+
+def _load_strategies_or_default():
+    """
+    STRATEGY_CONFIG 로드
+    [반환] (전략 목록, 진입 허용 여부)
+    - 오류(파일/JSON/검증) 시 ([DEFAULT_STRATEGY], False) + 알림 → 청산 점검만 수행, 이번 사이클 진입 생략
+      (운영자가 교체하려던 설정 대신 기본 전략으로 실주문 진입하지 않음)
+    """
+    try:
+        return load_strategies(), True
+    except Exception as e:
+        msg = f"[STRATEGY] STRATEGY_CONFIG 로드 실패 → 청산 점검만 수행, 이번 사이클 진입 생략: {e}"
+        print(msg)
+        send_slack_alert(msg)
+        return [DEFAULT_STRATEGY], False
 
-        # 2-4) 최고가 갱신
-        if cp > hp:
-            update_position(s, "highest_price", cp)
-            print(f"[UPDATE] highest_price {s} → {cp}")
+def _run_entries(api: REST, symbols, scores, strategies: list, budget: CycleBudget,
+                 report: CycleReport, prices: PriceCache, screen=None) -> None:
+    """스크리닝(symbols 미지정 시) → 사전점수 순 진입 평가/주문, 예산 부족분은 연기/폐기"""
+    # 3) 스크리닝(전 종목 거래대금 스캔): 청산 점검 뒤, 소요시간은 예산에 포함 → 진입 후보 예산 축소
+    if symbols is None:
+        t_phase = time.monotonic()
+        symbols, scores = screen() if screen is not None else fetch_top100(with_scores=True)
+        report.screen_phase_sec = time.monotonic() - t_phase
 
+    # 4) 매수 루프: 사전점수 순, 남은 예산으로 다음 후보를 못 끝낼 것 같으면 중단 → 잔여 연기/폐기
+    ordered = ENTRY_SCHEDULER.order(symbols, scores)
+    report.entries_total = len(ordered)
+    t_phase = time.monotonic()
+    coordinator = get_coordinator() if RECORDER.mode == "off" else None   # 기록/재생 중에는 단일 프로세스
+    if coordinator is not None:
+        # 3-a) 샤드 스캔: 평가만 워커 분산, 끝난 샤드 결과부터 이 프로세스가 주문(샤드 내 사전점수 순)
+        #      예산 소진 후 도착한 샤드 결과는 주문하지 않고 미평가 종목과 함께 연기
+        scan, late = ScanResult(), []
+        rank = {s: i for i, s in enumerate(ordered, start=1)}
+        for batch in coordinator.iter_scan(ordered, budget, lambda t: evaluate_entries(t, strategies, prices.get),
+                                           strategies, scan):
+            for tkr in sorted(batch, key=rank.get):
+                if budget.remaining() <= 0:
+                    late.append(tkr)
+                    continue
+                results, error = batch[tkr]
+                _act_on_entry(api, tkr, results, strategies, len(ordered), rank[tkr], error)
+                report.entries_done += 1
+        print(f">>> shard scan {len(scan.results)}/{len(ordered)} {scan.shard_sec}"
+              + (f" 실패 {scan.failed_shards}" if scan.failed_shards else ""))
+        if scan.skipped or late:
+            print(f"[BUDGET] 샤드 미평가 {len(scan.skipped)}종목, 예산 소진 후 도착 {len(late)}종목")
+        skipped = set(scan.skipped) | set(late)
+        report.deferred, report.dropped = ENTRY_SCHEDULER.defer([s for s in ordered if s in skipped])
+    else:
+        for idx, tkr in enumerate(ordered, start=1):
+            if not budget.can_start("entry"):
+                report.deferred, report.dropped = ENTRY_SCHEDULER.defer(ordered[idx - 1:])
+                print(f"[BUDGET] 남은 {budget.remaining():.1f}s → 진입 후보 {len(ordered) - idx + 1}개 중단")
+                break
+            t = time.monotonic()
+            _act_on_entry(api, tkr, evaluate_entries(tkr, strategies, prices.get),
+                          strategies, len(ordered), idx)
+            budget.observe("entry", time.monotonic() - t)
+            report.entries_done += 1
+        else:
+            ENTRY_SCHEDULER.defer([])
+    report.entry_phase_sec = time.monotonic() - t_phase
+
+def main(symbols: list[str] = None, scores: dict = None, strategies: list = None,
+         budget: CycleBudget = None, screen=None) -> CycleReport:
+    """
+    [실전 운영] 1사이클 매매(CYCLE_BUDGET_SEC 시간예산)
+    - symbols: 진입 후보. 미지정 시 청산 점검 후 screen()으로 스크리닝(예산에 포함)
+      screen() → (종목 리스트, {종목: 거래대금}), 기본 fetch_top100(with_scores=True)
+    - scores: {종목: 거래대금} 사전점수(symbols 지정 시), 없으면 입력 순서
+    - strategies: 전략 설정 목록(미지정 시 STRATEGY_CONFIG, 없으면 기본 단일 전략)
+      분봉은 사이클당 종목별 1회 조회해 모든 전략이 공유
+      STRATEGY_CONFIG 오류 시 기본 전략 파일로 청산 점검만 하고 스크리닝/진입 생략(연기 목록 유지)
+    - budget: 사이클 예산(engine.run이 사이클 시작 시 생성), 미지정 시 여기서 시작
+    [반환] CycleReport(소요/초과/연기·폐기 종목)
+    """
+    api = REST(API_KEY, API_SECRET, API_URL, api_version="v2")
+    mode = os.getenv("TRADE_MODE", "prod").upper()
+    strategies, entries_ok = (strategies, True) if strategies else _load_strategies_or_default()
+    print(f"=== MODE={mode} STRATEGIES={[st.name for st in strategies]} ===")
+    budget = budget or CycleBudget(estimates=ENTRY_SCHEDULER.estimates)
+    report = CycleReport(budget=budget.seconds)
+    prices = PriceCache()
+
+    # 0) 체결 스트림 연결 + 추적 주문 정리(지난 프로세스 종료 후 체결 보충)
+    #    + (주기 도래 시) 전체 포지션 대조 안전망(실주문 전략이 있을 때만)
+    if _reconciler is not None and any(not st.shadow for st in strategies):
+        if RECORDER.replaying:
+            _reconciler.load_state()     # begin_cycle이 복원한 기록 당시 추적 주문
+        try:
+            if not RECORDER.replaying:   # 재생 중에는 실시간 체결 스트림 미연결
+                _reconciler.start_stream()
+        except Exception as e:
+            print(f"[WARN] trade_updates 스트림 연결 실패: {e}")
+        _reconciler.maybe_resync(api)
+
+    # 1) 보유 포지션 청산 점검 먼저(리스크 우선: 예산 초과여도 생략하지 않음), 전략별 격리 파일
+    t_phase = time.monotonic()
+    for st in strategies:
+        df = load_positions(st.positions_file)
+        open_df = df[df["status"] == "open"] if "status" in df.columns else df
+        print(f">>> Sell check{_tag(st)} for {len(open_df)} open positions")
+        marks = []  # (symbol, qty, entry_price, price) → 청산 점검 후 marks.csv 일괄 기록
+        report.exits_total += len(open_df)
+        for _, row in open_df.iterrows():
+            if budget.remaining() <= 0:
+                report.exits_over_budget += 1
+            t = time.monotonic()
+            _process_sell(api, row, marks, st, prices)
+            budget.observe("exit", time.monotonic() - t)
+            report.exits_done += 1
+
+        # 2) 보유 평가(mark) 일괄 기록(history_store 낙폭/평가손익 분석용)
+        log_marks(marks, st.marks_file)
+    report.exit_phase_sec = time.monotonic() - t_phase
+
+    # 3~4) 스크리닝 + 진입(전략 설정 오류 시 생략)
+    if entries_ok:
+        _run_entries(api, symbols, scores, strategies, budget, report, prices, screen)
+    else:
+        print("[STRATEGY] 전략 설정 오류 → 진입 생략")
+    JOURNAL.flush()
+
+    # 5) 사이클 리포트(초과/생략 작업 가시화), 연기 목록/소요시간 추정치는 다음 사이클(프로세스)로 이월
+    ENTRY_SCHEDULER.estimates = dict(budget.estimates)
+    ENTRY_SCHEDULER.save()
+    report.elapsed = budget.elapsed()
+    print(report.summary())
+    try:
+        report.save()
+    except OSError as e:
+        print(f"[WARN] cycle report 기록 실패: {e}")
+    if report.overrun or report.dropped:
+        send_slack_alert(report.summary())
+    return report
@@ -7,11 +7,17 @@
 from datetime import datetime, time
 from zoneinfo import ZoneInfo
 from trade_server.config import ALLOW_EXTENDED_HOURS
+from trade_server.cycle_recorder import recorded
 
 ET = ZoneInfo("America/New_York")
 
+@recorded("clock", key=lambda: "")
+def _now_et() -> datetime:
+    # 기록/재생 지점: 재생 시 기록 당시 시각으로 진입 허용 판단 재현
+    return datetime.now(ET)
+
 def market_allows_entry() -> bool:
-    now = datetime.now(ET).time()
+    now = _now_et().time()
     regular = time(9, 30) <= now <= time(16, 0)
     if ALLOW_EXTENDED_HOURS:
         pre    = time(4, 0)  <= now < time(9, 30)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# notifier.py
+# 비동기 알림 디스패처(주문 흐름은 알림 전송을 절대 기다리지 않음)
+# • send(): 유한 큐에 넣기만 함(put_nowait) → 가득 차면 스필 파일 기록 또는 폐기(건수 집계)
+# • 백그라운드 스레드가 interval초 동안 모인 메시지를 다이제스트 1건으로 병합 전송
+# • 싱크: Slack / Telegram / 로컬 파일 / 스텁(테스트), 싱크별 실패는 서로 격리
+# • 프로세스 종료 시 남은 메시지 flush(최대 timeout초)
+# ----------------------------------------
+
+import os
+import time
+import queue
+import threading
+from datetime import datetime
+
+import requests
+
+class SlackSink:
+    name = "slack"
+
+    def __init__(self, webhook: str, timeout: float = 3):
+        self.webhook = webhook
+        self.timeout = timeout
+
+    def send(self, text: str):
+        requests.post(self.webhook, json={"text": text}, timeout=self.timeout)
+
+class TelegramSink:
+    name = "telegram"
+
+    def __init__(self, bot_token: str, chat_id: str, timeout: float = 3):
+        self.url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        self.chat_id = chat_id
+        self.timeout = timeout
+
+    def send(self, text: str):
+        # Telegram 메시지 최대 4096자
+        requests.post(self.url, json={"chat_id": self.chat_id, "text": text[:4096]}, timeout=self.timeout)
+
+class FileSink:
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, text: str):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(f"[{datetime.utcnow().isoformat()}] {text}\n")
+
+class StubSink:
+    """[테스트] 전송 내용을 메모리 리스트에 보관"""
+    name = "stub"
+
+    def __init__(self):
+        self.sent = []
+
+    def send(self, text: str):
+        self.sent.append(text)
+
+class AlertDispatcher:
+    """
+    [실전 운영] 유한 큐 + 다이제스트 병합 알림 디스패처
+    - interval: 병합 주기(초). 첫 메시지 수신 후 interval 동안 모인 메시지를 1건으로 전송
+    - maxsize: 큐 상한. 초과분은 spill_path에 기록(미지정 시 폐기), dropped/spilled 집계
+    - max_digest_lines: 다이제스트 1건 최대 줄 수(초과분은 "외 N건"으로 요약)
+    """
+    def __init__(self, sinks: list, interval: float = 5.0, maxsize: int = 1000,
+                 spill_path: str = "", max_digest_lines: int = 50):
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.spill_path = spill_path
+        self.max_digest_lines = max_digest_lines
+        self.dropped = 0
+        self.spilled = 0
+        self.sent_digests = 0
+        self._q = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._thread is None and self.sinks:
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def send(self, message: str):
+        """논블로킹 접수(싱크 없으면 무시)"""
+        if not self.sinks:
+            return
+        try:
+            self._q.put_nowait(message)
+        except queue.Full:
+            self._overflow(message)
+
+    def _overflow(self, message: str):
+        with self._lock:
+            if self.spill_path:
+                try:
+                    FileSink(self.spill_path).send(message)
+                    self.spilled += 1
+                    return
+                except OSError:
+                    pass
+            self.dropped += 1
+
+    def _collect(self) -> list:
+        """첫 메시지 대기 → interval 동안 추가 수집(종료 신호 시 즉시 남은 것 수거)"""
+        try:
+            first = self._q.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        msgs = [first]
+        deadline = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                msgs.append(self._q.get(timeout=min(0.2, remaining)))
+            except queue.Empty:
+                continue
+        return msgs + self._drain()
+
+    def _drain(self) -> list:
+        out = []
+        while True:
+            try:
+                out.append(self._q.get_nowait())
+            except queue.Empty:
+                return out
+
+    def _digest(self, msgs: list) -> str:
+        with self._lock:
+            lost, self.dropped = self.dropped, 0
+            spilled, self.spilled = self.spilled, 0
+        if len(msgs) == 1 and not lost and not spilled:
+            return msgs[0]
+        lines = msgs[:self.max_digest_lines]
+        if len(msgs) > len(lines):
+            lines.append(f"... 외 {len(msgs) - len(lines)}건")
+        if spilled:
+            lines.append(f"(큐 초과 {spilled}건 → {self.spill_path})")
+        if lost:
+            lines.append(f"(큐 초과 {lost}건 폐기)")
+        return f"[알림 {len(msgs)}건]\n" + "\n".join(lines)
+
+    def _deliver(self, text: str):
+        for sink in self.sinks:
+            try:
+                sink.send(text)
+            except Exception as e:
+                print(f"[notifier] {sink.name} 전송 실패: {e}")
+        self.sent_digests += 1
+
+    def _run(self):
+        while not self._stop.is_set():
+            msgs = self._collect()
+            if msgs:
+                self._deliver(self._digest(msgs))
+
+    def flush(self, timeout: float = 5.0):
+        """종료 처리: 수집 루프 중단 후 남은 메시지 1건으로 전송(최대 timeout초 대기)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        rest = self._drain()
+        if rest:
+            t = threading.Thread(target=lambda: self._deliver(self._digest(rest)), daemon=True)
+            t.start()
+            t.join(timeout)
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# order_reconciler.py
+# 주문/체결 증분 리컨실리에이션(trade_updates 스트림 기반)
+# • 주문 접수 시점이 아니라 체결(부분/전량) 이벤트 시점에 포지션/trades.csv 반영
+# • 체결량은 주문별 누적 filled_qty 차분으로 계산(중복/누락 이벤트에 안전)
+# • 전체 계좌 스캔(list_positions)은 RECONCILE_RESYNC_SEC 주기 안전망으로만 실행
+# • REST 보충(catch_up)은 스트림 (재)연결 직후/끊김 감지 시에만: 추적 주문을 list_orders 1회로 대조
+#   (응답에 없는 주문만 get_order) → 스트림이 살아 있는 동안은 주문 폴링 없음
+# • 종결(fill/canceled 등) 이벤트는 주문 누적 체결량까지 반영, 종결 후 늦게 도착한 이벤트는 무시
+# • 추적 주문/최근 종결 주문/마지막 전체 대조 시각은 RECONCILER_STATE_FILE에 유지(엔진은 사이클당 1프로세스)
+#   → 프로세스 종료 후 도착한 체결도 다음 사이클 연결 직후 catch_up()에서 trades.csv에 반영
+# • 전체 대조 보정도 trades.csv에 reason=resync 거래로 기록(실현손익/이력 누락 방지)
+# • 테스트용 로컬 FakeTradeStream 제공(네트워크 없음)
+# ----------------------------------------
+
+import os
+import json
+import time
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from trade_server.config import (
+    API_KEY, API_SECRET, API_URL, DATA_FEED,
+    POSITIONS_FILE, TRADES_LOG_FILE, RECONCILE_RESYNC_SEC, RECONCILER_STATE_FILE
+)
+from trade_server.position_manager import (
+    load_positions, add_position, close_position, update_position, POSITIONS_LOCK
+)
+from trade_server.trade_logger import log_trade
+from trade_server.cycle_recorder import recorded
+
+FILL_EVENTS = ("fill", "partial_fill")
+DONE_KEEP = 500   # 늦은 이벤트 무시용 최근 종결 주문 id 보관 수
+TERMINAL_EVENTS = ("fill", "canceled", "expired", "rejected", "done_for_day", "replaced")
+TERMINAL_STATUSES = ("filled", "canceled", "expired", "rejected", "done_for_day", "replaced")
+
+def _get(obj, key, default=None):
+    """Alpaca Entity/dict/SimpleNamespace 공통 필드 조회"""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    raw = getattr(obj, "_raw", None)
+    if isinstance(raw, dict) and key in raw:
+        return raw[key]
+    return getattr(obj, key, default)
+
+@recorded("positions", key=lambda api: "",
+          encode=lambda ps: [getattr(p, "_raw", p) for p in ps])
+def _list_positions(api):
+    # 기록/재생 지점: 브로커 전체 포지션(재생 시 _raw dict 리스트)
+    return api.list_positions()
+
+@recorded("orders_since", key=lambda api, after: "",
+          encode=lambda os_: [getattr(o, "_raw", o) for o in os_])
+def _list_orders_since(api, after: str = None):
+    # 기록/재생 지점: 브로커 주문(미체결+종결, after 이후 접수분) 최근 500건
+    return api.list_orders(status="all", after=after, limit=500)
+
+@recorded("order_status", key=lambda api, oid: oid, encode=lambda o: getattr(o, "_raw", o))
+def _get_order(api, oid: str):
+    # 기록/재생 지점: 주문 1건 최종 상태(누적 체결량/평균가)
+    return api.get_order(oid)
+
+@recorded("cancel_order", key=lambda api, oid: oid, on_miss=lambda api, oid: None)
+def _cancel_order(api, oid: str):
+    # 기록/재생 지점: 주문 취소 요청(재생 중 기록에 없으면 실제 취소 없이 무시)
+    return api.cancel_order(oid)
+
+@recorded("fill_activities", key=lambda api: "",
+          encode=lambda acts: [getattr(a, "_raw", a) for a in acts])
+def _list_fill_activities(api):
+    # 기록/재생 지점: 계좌 체결 내역(최근순, resync 보정 단가 조회용)
+    return api.get_activities(activity_types="FILL", direction="desc", page_size=100)
+
+def _new_state(order, reason: str = "") -> dict:
+    """추적 주문 상태(접수 응답/이벤트 주문 스냅샷 → 누적 체결량 0부터)"""
+    submitted = _get(order, "submitted_at")
+    return {
+        "symbol": _get(order, "symbol"), "side": _get(order, "side"),
+        "qty": float(_get(order, "qty", 0) or 0), "filled": 0.0, "avg": 0.0,
+        "reason": reason, "submitted_at": str(submitted) if submitted else None,
+    }
+
+def _submitted_floor(stamps):
+    """추적 주문 접수 시각 중 가장 이른 시각 - 1초(list_orders after는 초과 비교), 시각 미상 주문이 있으면 None"""
+    stamps = list(stamps)
+    if not stamps or not all(stamps):
+        return None
+    try:
+        t = min(datetime.fromisoformat(str(x).replace("Z", "+00:00")) for x in stamps)
+    except (TypeError, ValueError):
+        return None
+    return (t - timedelta(seconds=1)).isoformat()
+
+class OrderReconciler:
+    """
+    [실전 운영] 체결 이벤트 → position_manager / trade_logger 증분 반영
+    - track(order): submit_order 응답 등록(주문 접수만, 포지션 미반영)
+    - handle(update): trade_updates 이벤트 1건 처리(스트림 콜백)
+    - open_reasons(symbol, side) / cancel_open(api, symbol, side): 미체결 청산 주문 종류 확인/취소
+    - maybe_resync(api): 스트림 (재)연결/끊김 후에만 catch_up(추적 주문 REST 보충),
+      주기 도래 시에만 전체 포지션 대조(안전망)
+    - 추적 주문/최근 종결 주문/last_resync(epoch)는 state_file에 원자적 교체로 저장, 생성 시 복원
+    """
+    def __init__(self, positions_file: str = POSITIONS_FILE, trades_file: str = TRADES_LOG_FILE,
+                 resync_interval: float = RECONCILE_RESYNC_SEC, state_file: str = RECONCILER_STATE_FILE):
+        self.positions_file = positions_file
+        self.trades_file = trades_file
+        self.resync_interval = resync_interval
+        self.state_file = state_file
+        self.last_resync = 0.0
+        self._orders = {}          # order_id → {symbol, side, qty, filled, avg, reason, submitted_at}
+        self._done = {}            # 최근 종결 order_id → 누적 체결량(종결 후 늦은 이벤트 무시)
+        self._lock = threading.Lock()
+        self._stream = None
+        self._gap = True           # 스트림 미수신 구간 존재(프로세스 시작/연결/끊김) → 다음 maybe_resync에서 catch_up
+        self.load_state()
+
+    # ── 상태 파일(프로세스 간 유지) ───────────────────────────────────
+    def load_state(self):
+        """상태 파일 → 추적 주문/last_resync 복원(생성 시 자동, 재생 시 begin_cycle 복원 후 재호출)"""
+        with self._lock:
+            self._orders, self._done, self.last_resync, self._gap = {}, {}, 0.0, True
+        try:
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self.last_resync = float(state.get("last_resync", 0.0))
+            self._orders = dict(state.get("orders", {}))
+            self._done = dict(state.get("done", {}))
+
+    def _save_state(self):
+        """호출 측이 self._lock 보유(또는 단일 스레드) 상태에서 호출"""
+        if not self.state_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            tmp = f"{self.state_file}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"last_resync": self.last_resync, "orders": self._orders, "done": self._done}, f)
+            os.replace(tmp, self.state_file)
+        except OSError as e:
+            print(f"[WARN] reconciler 상태 저장 실패: {e}")
+
+    # ── 주문 등록/조회 ────────────────────────────────────────────────
+    def track(self, order, reason: str = ""):
+        oid = _get(order, "id")
+        if not oid:
+            return
+        with self._lock:
+            if oid in self._done:
+                return
+            self._orders.setdefault(oid, _new_state(order, reason))
+            self._save_state()
+
+    def has_open_order(self, symbol: str, side: str = None) -> bool:
+        with self._lock:
+            return any(o["symbol"] == symbol and (side is None or o["side"] == side)
+                       for o in self._orders.values())
+
+    def open_reasons(self, symbol: str, side: str = None) -> set:
+        """종목의 미체결 추적 주문 사유 집합(예: {"take_profit"}) → 같은 종류 청산 중복 접수 방지"""
+        with self._lock:
+            return {o["reason"] for o in self._orders.values()
+                    if o["symbol"] == symbol and (side is None or o["side"] == side)}
+
+    def cancel_open(self, api, symbol: str, side: str = None) -> int:
+        """
+        종목의 미체결 추적 주문 취소 요청(예: 손절 전 익절 지정가 정리)
+        - 추적은 canceled 이벤트(또는 catch_up)에서 종료 → 취소 전 부분 체결도 그대로 반영
+        [반환] 취소 요청 성공 건수
+        """
+        with self._lock:
+            targets = [oid for oid, o in self._orders.items()
+                       if o["symbol"] == symbol and (side is None or o["side"] == side)]
+        n = 0
+        for oid in targets:
+            try:
+                _cancel_order(api, oid)
+                n += 1
+            except Exception as e:
+                print(f"[CANCEL] 주문 {oid} {symbol} 취소 실패: {e}")
+        return n
+
+    # ── 이벤트 처리 ──────────────────────────────────────────────────
+    def handle(self, update):
+        """
+        trade_updates 이벤트 1건 처리
+        - update.event: new / partial_fill / fill / canceled / expired / rejected ...
+        - update.order: id, symbol, side, qty, filled_qty, filled_avg_price
+        - update.price/qty: 이번 체결 단가/수량(없으면 누적 평균가 차분으로 계산)
+        """
+        event = _get(update, "event")
+        terminal = event in TERMINAL_EVENTS
+        # 종결 이벤트의 주문 스냅샷(누적 체결량)도 반영: canceled 직전 부분 체결 이벤트 유실 대비
+        self._advance(_get(update, "order") or {}, event in FILL_EVENTS or terminal, terminal, update)
+
+    def _advance(self, order, filled: bool, terminal: bool, update=None):
+        """주문 누적 체결량(filled_qty) 차분만큼 반영, terminal이면 추적 종료(스트림 이벤트/주문 조회 공용)"""
+        oid = _get(order, "id")
+        if not oid:
+            return
+        with self._lock:
+            if oid in self._done:
+                return    # 종결 후 늦게 도착한(순서 뒤바뀐) 이벤트: 이미 최종 누적 체결량 반영됨
+            st = self._orders.get(oid)
+            if st is None:
+                # 재시작 등으로 미등록 주문: 이벤트 기준으로 편입
+                st = self._orders[oid] = _new_state(order)
+            fill = None
+            if filled:
+                cum = float(_get(order, "filled_qty", 0) or 0)
+                avg = float(_get(order, "filled_avg_price", 0) or 0)
+                delta = cum - st["filled"]
+                if delta > 1e-9:
+                    px = _get(update, "price") if update is not None else None
+                    q = _get(update, "qty") if update is not None else None
+                    if px is not None and q is not None and abs(float(q) - delta) < 1e-9:
+                        price = float(px)
+                    else:
+                        price = (avg * cum - st["avg"] * st["filled"]) / delta
+                    st["filled"], st["avg"] = cum, avg
+                    fill = (st["symbol"], st["side"], delta, price, st["reason"])
+            if terminal:
+                self._orders.pop(oid, None)
+                self._done[oid] = st["filled"]
+                while len(self._done) > DONE_KEEP:
+                    self._done.pop(next(iter(self._done)))
+            if fill or terminal:
+                self._save_state()
+        if fill:
+            self._apply_fill(*fill)
+
+    def _apply_fill(self, symbol: str, side: str, qty: float, price: float, reason: str = ""):
+        if side == "buy":
+            add_position(symbol, qty, price, self.positions_file)
+            log_trade(symbol, "buy", qty, price, trades_file=self.trades_file, reason=reason)
+        else:
+            with POSITIONS_LOCK:   # 진입가 조회~차감 사이 메인 스레드 갱신 끼어들기 방지
+                df = load_positions(self.positions_file)
+                row = df[df["symbol"] == symbol]
+                ep = float(row["entry_price"].iloc[0]) if len(row) else price
+                close_position(symbol, qty, price, self.positions_file)
+            log_trade(symbol, "sell", qty, price, pnl=round((price - ep) * qty, 4),
+                      trades_file=self.trades_file, reason=reason)
+        print(f"[FILL] {side.upper()} {symbol} {qty}@{round(price, 4)}")
+
+    # ── 스트림 연결 ──────────────────────────────────────────────────
+    def attach(self, stream):
+        """
+        subscribe_trade_updates(handler)를 제공하는 스트림(Alpaca Stream/FakeTradeStream)에 연결
+        - 연결 전 구간의 체결은 스트림이 재전송하지 않음 → 다음 maybe_resync에서 catch_up 1회
+        """
+        async def _on_update(update):
+            self.handle(update)
+        stream.subscribe_trade_updates(_on_update)
+        with self._lock:
+            self._stream, self._gap = stream, True
+        return stream
+
+    def start_stream(self):
+        """Alpaca trade_updates 웹소켓을 데몬 스레드로 기동(끊겨 종료된 경우 다음 호출에서 재기동)"""
+        if self._stream is not None:
+            return self._stream
+        from alpaca_trade_api.common import URL
+        from alpaca_trade_api.stream import Stream
+        stream = self.attach(Stream(API_KEY, API_SECRET, base_url=URL(API_URL), data_feed=DATA_FEED))
+        threading.Thread(target=self._run_stream, args=(stream,), name="trade-updates", daemon=True).start()
+        return stream
+
+    def _run_stream(self, stream):
+        try:
+            stream.run()
+        except Exception as e:
+            print(f"[WARN] trade_updates 스트림 종료: {e}")
+        finally:
+            # 끊김 감지: 재연결 전까지 체결 유실 가능 → 다음 maybe_resync에서 catch_up
+            with self._lock:
+                if self._stream is stream:
+                    self._stream, self._gap = None, True
+
+    # ── 안전망: 주기적 전체 대조 ─────────────────────────────────────
+    def maybe_resync(self, api, force: bool = False) -> bool:
+        """
+        - 전체 대조: 마지막 대조(상태 파일, epoch) 후 resync_interval 경과 시만(catch_up 포함)
+        - 그 외: 스트림 (재)연결 직후/끊김 감지(또는 스트림 없음) 때만 catch_up, 연결 유지 중에는 REST 호출 없음
+        [반환] 전체 대조 실행 여부
+        """
+        if not force and self.last_resync and time.time() - self.last_resync < self.resync_interval:
+            if self._gap or self._stream is None:
+                self.catch_up(api)
+            return False
+        self.resync(api)
+        with self._lock:
+            self.last_resync = time.time()
+            self._save_state()
+        return True
+
+    def catch_up(self, api):
+        """
+        스트림 미수신 구간 보충: 추적 주문 ↔ 브로커 주문(list_orders status=all, 가장 오래된 추적 주문
+        접수 시각 이후) 1회 대조 → 누적 체결량 차분 반영, 종결 주문은 추적 종료
+        (응답에 없는 주문만 get_order, 조회 불가 시 추적만 종료 → 수량 차이는 resync가 보정)
+        """
+        with self._lock:
+            self._gap = False
+            tracked = dict(self._orders)
+        if not tracked:
+            return
+        after = _submitted_floor(o.get("submitted_at") for o in tracked.values())
+        try:
+            orders = {_get(o, "id"): o for o in _list_orders_since(api, after)}
+        except Exception as e:
+            print(f"[RESYNC] list_orders 실패: {e}")
+            with self._lock:
+                self._gap = True     # 다음 maybe_resync에서 재시도
+            return
+        for oid, st in tracked.items():
+            order = orders.get(oid)
+            if order is None:
+                try:
+                    order = _get_order(api, oid)
+                except Exception as e:
+                    print(f"[RESYNC] 주문 {oid} 조회 실패({e}) → 추적 종료")
+                    with self._lock:
+                        self._orders.pop(oid, None)
+                        self._save_state()
+                    continue
+            status = _get(order, "status")
+            if float(_get(order, "filled_qty", 0) or 0) - st["filled"] > 1e-9 or status in TERMINAL_STATUSES:
+                print(f"[RESYNC] 주문 {oid} {_get(order, 'symbol')} 상태={status} → 누락 체결 보충")
+            self._advance(order, True, status in TERMINAL_STATUSES)
+
+    def resync(self, api):
+        """
+        브로커 포지션(list_positions)과 positions.csv 대조
+        - 먼저 catch_up()으로 종결된 추적 주문 정리(남은 것은 실제 미체결 주문)
+        - 진행 중 주문이 있는 종목은 체결 이벤트 도착 전이므로 건너뜀
+        - 수량/평단 불일치 → 브로커 기준으로 보정, 브로커에 없는 open 포지션 → closed
+        """
+        self.catch_up(api)
+        try:
+            broker = {_get(p, "symbol"): (float(_get(p, "qty")), float(_get(p, "avg_entry_price")))
+                      for p in _list_positions(api)}
+        except Exception as e:
+            print(f"[RESYNC] list_positions 실패: {e}")
+            return
+        fills = None   # 계좌 체결 내역(매도 보정 단가용, 필요할 때 1회 조회)
+        with POSITIONS_LOCK:
+            df = load_positions(self.positions_file)
+            local = {r["symbol"]: (float(r["qty"]), float(r["entry_price"]))
+                     for _, r in df[df["status"] == "open"].iterrows()}
+            for sym in set(broker) | set(local):
+                if self.has_open_order(sym):
+                    continue
+                bq, bep = broker.get(sym, (0.0, 0.0))
+                lq, lep = local.get(sym, (0.0, 0.0))
+                if abs(bq - lq) < 1e-9:
+                    continue
+                print(f"[RESYNC] {sym} local={lq} broker={bq} → 보정")
+                if bq > lq:
+                    # 누락 매수: 브로커 평단에서 역산한 추가분 단가
+                    q = bq - lq
+                    px = (bep * bq - lep * lq) / q
+                    log_trade(sym, "buy", q, round(px, 6), trades_file=self.trades_file, reason="resync")
+                else:
+                    # 누락 매도: 최근 계좌 체결 단가(없으면 진입가 → 손익 미상 공란)
+                    q = lq - bq
+                    if fills is None:
+                        fills = self._recent_fills(api)
+                    px = fills.get((sym, "sell"))
+                    pnl = round((px - lep) * q, 4) if px is not None else None
+                    log_trade(sym, "sell", q, px if px is not None else lep, pnl,
+                              trades_file=self.trades_file, reason="resync")
+                if sym not in df["symbol"].values:
+                    add_position(sym, bq, bep, self.positions_file)
+                elif bq > 1e-9:
+                    update_position(sym, "qty", bq, self.positions_file)
+                    update_position(sym, "entry_price", bep, self.positions_file)
+                    update_position(sym, "status", "open", self.positions_file)
+                else:
+                    close_position(sym, lq, 0.0, self.positions_file)
+
+    @staticmethod
+    def _recent_fills(api) -> dict:
+        """[반환] {(종목, side): 가장 최근 체결 단가}"""
+        out = {}
+        try:
+            for a in _list_fill_activities(api):
+                out.setdefault((_get(a, "symbol"), _get(a, "side")), float(_get(a, "price")))
+        except Exception as e:
+            print(f"[RESYNC] 체결 내역 조회 실패: {e}")
+        return out
+
+class FakeTradeStream:
+    """
+    [테스트] 로컬 trade_updates 스트림(네트워크 없음)
+    - emit(event, order, price=None, qty=None): 구독 핸들러를 동기 호출
+    """
+    def __init__(self):
+        self._handlers = []
+
+    def subscribe_trade_updates(self, handler):
+        self._handlers.append(handler)
+
+    def emit(self, event: str, order: dict, price: float = None, qty: float = None):
+        update = SimpleNamespace(event=event, order=order, price=price, qty=qty)
+        for h in self._handlers:
+            res = h(update)
+            if asyncio.iscoroutine(res):
+                asyncio.run(res)
+
+    def run(self):
+        pass
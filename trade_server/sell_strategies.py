@@ -14,8 +14,9 @@ def check_profit_take(entry_price: float, curr_price: float, rate: float = PROFI
 def check_trailing_stop(highest_price: float, curr_price: float, rate: float = TRAILING_STOP_RATE) -> bool:
     return (curr_price - highest_price) / max(highest_price, 1e-9) <= -rate
 
-def check_stop_loss(entry_price: float, curr_price: float, rate: float = STOP_LOSS_RATE) -> bool:
-    if not STOP_LOSS_ENABLED:
+def check_stop_loss(entry_price: float, curr_price: float, rate: float = STOP_LOSS_RATE,
+                    enabled: bool = STOP_LOSS_ENABLED) -> bool:
+    if not enabled:
         return False
     return (curr_price - entry_price) / max(entry_price, 1e-9) <= -rate
 
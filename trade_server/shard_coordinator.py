@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# shard_coordinator.py
+# 샤드 스캔 코디네이터(SHARD_WORKERS 설정 시 main()이 사용)
+# • 진입 후보(사전점수 순)를 종목 해시로 고정 샤드에 배정 → 워커별 BARS 캐시 재사용
+# • 샤드별 스레드가 워커에 scan 요청, 결과를 종목 단위로 수신(shard_worker.py 프로토콜)
+#   → iter_scan()이 끝난 샤드부터 결과를 넘겨 main()은 느린 샤드를 기다리지 않고 주문
+# • 워커 실패(연결 불가/응답 지연 SHARD_TIMEOUT_SEC/중도 종료) → 그 샤드의 남은 종목만 로컬 재평가
+#   (다른 샤드는 영향 없음, 로컬 워커 프로세스는 다음 사이클에 재기동)
+# • 로컬 워커(SHARD_WORKERS=N)는 상주 프로세스: 사이클마다 레지스트리(SHARD_REGISTRY_FILE)로 재접속,
+#   SHARD_IDLE_SEC 유휴 시 스스로 종료. 수동 종료: python3 -m trade_server.shard_coordinator --stop
+# • 주문 접수/포지션 쓰기는 하지 않음(결과만 반환 → main()이 단독 처리)
+# ----------------------------------------
+
+import os
+import sys
+import json
+import zlib
+import time
+import signal
+import socket
+import threading
+import subprocess
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from trade_server.config import (
+    BASE_DIR, LOG_DIR, SHARD_WORKERS, SHARD_TOKEN, SHARD_TIMEOUT_SEC, SHARD_IDLE_SEC, SHARD_REGISTRY_FILE
+)
+from trade_server.cycle_scheduler import CycleBudget
+from trade_server.shard_worker import encode, scan_symbols
+
+class _Worker:
+    """
+    워커 1개(원격 주소 고정 또는 상주 로컬 프로세스)
+    - 로컬(slot 지정): 레지스트리의 기존 워커에 ping → 살아 있으면 재사용, 없으면 분리 세션으로 기동
+      (엔진 사이클 프로세스가 끝나도 유지 → 다음 사이클이 같은 워커/BARS 캐시 사용)
+    """
+    def __init__(self, addr=None, slot: int = None):
+        self.addr = addr            # (host, port)
+        self.slot = slot            # 로컬 워커 번호(레지스트리 키), 원격은 None
+        self.pid = None
+        self.failures = 0
+
+    @property
+    def local(self) -> bool:
+        return self.slot is not None
+
+    def ping(self, token: str = SHARD_TOKEN, timeout: float = 2.0) -> bool:
+        try:
+            with socket.create_connection(self.addr, timeout=timeout) as sock:
+                sock.settimeout(timeout)
+                f = sock.makefile("rwb")
+                f.write(encode({"op": "ping", "token": token}))
+                f.flush()
+                return json.loads(f.readline() or b"{}").get("op") == "pong"
+        except (OSError, ValueError):
+            return False
+
+    def ensure(self):
+        """로컬 워커: 레지스트리 워커 재접속(ping) 또는 (재)기동 후 레지스트리 기록"""
+        if not self.local:
+            return
+        if self.addr is None:
+            ent = _load_registry().get(str(self.slot))
+            if ent:
+                self.addr, self.pid = ("127.0.0.1", int(ent["port"])), int(ent["pid"])
+        if self.addr is not None and self.ping():
+            return
+        self._kill()   # 응답 없는 이전 워커(멈춤) 정리 후 새로 기동
+        t0 = time.monotonic()
+        os.makedirs(LOG_DIR, exist_ok=True)
+        with open(os.path.join(LOG_DIR, f"shard_worker_{self.slot}.log"), "ab") as log:
+            proc = subprocess.Popen([sys.executable, "-m", "trade_server.shard_worker",
+                                     "--idle", str(SHARD_IDLE_SEC)],
+                                    cwd=BASE_DIR, stdout=subprocess.PIPE, stderr=log,
+                                    stdin=subprocess.DEVNULL, start_new_session=True)
+        line = proc.stdout.readline().split()
+        proc.stdout.close()
+        if len(line) != 2 or line[0] != b"READY":
+            proc.kill()
+            raise RuntimeError("샤드 워커 기동 실패")
+        self.addr, self.pid = ("127.0.0.1", int(line[1])), proc.pid
+        _update_registry(self.slot, {"pid": proc.pid, "port": self.addr[1]})
+        print(f"[SHARD] 로컬 워커 {self.slot} 기동 {self!r} ({time.monotonic() - t0:.2f}s)")
+
+    def stop(self):
+        """로컬 워커 종료 + 레지스트리 제거(다음 ensure()에서 재기동)"""
+        if not self.local:
+            return
+        self._kill()
+        self.addr = None
+        _update_registry(self.slot, None)
+
+    def _kill(self):
+        # pid 재사용 대비: 실제 샤드 워커 프로세스일 때만 종료
+        if self.pid and _is_worker_pid(self.pid):
+            try:
+                os.kill(self.pid, signal.SIGTERM)
+            except OSError:
+                pass
+        self.pid = None
+
+    def __repr__(self):
+        return f"{self.addr[0]}:{self.addr[1]}" if self.addr else f"local{self.slot}(pending)"
+
+def _is_worker_pid(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"trade_server.shard_worker" in f.read()
+    except OSError:
+        return False
+
+def _load_registry() -> dict:
+    try:
+        with open(SHARD_REGISTRY_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _update_registry(slot: int, entry):
+    """레지스트리(slot → {pid, port}) 갱신(entry=None이면 제거), 임시파일 → 원자적 교체"""
+    with _registry_lock:
+        reg = _load_registry()
+        if entry is None:
+            reg.pop(str(slot), None)
+        else:
+            reg[str(slot)] = entry
+        os.makedirs(os.path.dirname(SHARD_REGISTRY_FILE), exist_ok=True)
+        tmp = f"{SHARD_REGISTRY_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(reg, f)
+        os.replace(tmp, SHARD_REGISTRY_FILE)
+
+_registry_lock = threading.Lock()
+
+def parse_workers(spec: str) -> list:
+    """SHARD_WORKERS: "4" → 로컬 4개 / "h1:7001,h2:7001" → 원격 / "0"·"" → 미사용"""
+    spec = (spec or "").strip()
+    if not spec or spec == "0":
+        return []
+    if spec.isdigit():
+        return [_Worker(slot=i) for i in range(int(spec))]
+    out = []
+    for item in spec.split(","):
+        host, _, port = item.strip().rpartition(":")
+        out.append(_Worker((host or "127.0.0.1", int(port))))
+    return out
+
+@dataclass
+class ScanResult:
+    results: dict = field(default_factory=dict)    # 종목 → ({전략: (진입가 | None, 사유)}, 에러)
+    skipped: list = field(default_factory=list)    # 예산 부족 미평가
+    failed_shards: list = field(default_factory=list)
+    shard_sec: dict = field(default_factory=dict)  # 워커 → 소요초
+
+class ShardCoordinator:
+    """
+    [실전 운영] 진입 후보 분산 평가(프로세스 공용 인스턴스는 get_coordinator())
+    - iter_scan(symbols, budget, local_eval, strategies, res): 샤드 병렬 평가, 끝난 샤드 결과부터 yield
+      실패 샤드는 local_eval로 재평가 / scan(...): 전 샤드 완료 후 ScanResult 일괄 반환
+    """
+    def __init__(self, workers: list, token: str = SHARD_TOKEN, timeout: float = SHARD_TIMEOUT_SEC):
+        self.workers = workers
+        self.token = token
+        self.timeout = timeout
+
+    def assign(self, symbols: list) -> list:
+        """종목 해시로 샤드 고정 배정(샤드 내부는 입력 순서=사전점수 순 유지)"""
+        shards = [[] for _ in self.workers]
+        for s in symbols:
+            shards[zlib.crc32(s.encode()) % len(self.workers)].append(s)
+        return shards
+
+    def iter_scan(self, symbols: list, budget: CycleBudget, local_eval, strategies: list = None,
+                  res: ScanResult = None):
+        """
+        샤드 병렬 평가, 끝난 샤드부터 그 샤드 결과 {종목: ({전략: (진입가 | None, 사유)}, 에러)}를 yield
+        (느린/죽은 샤드를 기다리지 않고 호출 측이 먼저 끝난 샤드의 신호부터 주문) — 전체 누적은 res
+        """
+        res = res if res is not None else ScanResult()
+        jobs = [(w, shard) for w, shard in zip(self.workers, self.assign(symbols)) if shard]
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="shard") as ex:
+            futures = [ex.submit(self._run_shard, w, shard, budget, local_eval, strategies)
+                       for w, shard in jobs]
+            for f in as_completed(futures):
+                w, got, skipped, failed, sec = f.result()
+                res.results.update(got)
+                res.skipped += skipped
+                if failed:
+                    res.failed_shards.append(repr(w))
+                res.shard_sec[repr(w)] = sec
+                yield got
+
+    def scan(self, symbols: list, budget: CycleBudget, local_eval, strategies: list = None) -> ScanResult:
+        """전 샤드 완료까지 대기 후 누적 결과 반환(iter_scan 일괄 버전)"""
+        res = ScanResult()
+        for _ in self.iter_scan(symbols, budget, local_eval, strategies, res):
+            pass
+        return res
+
+    def _run_shard(self, w: _Worker, shard: list, budget: CycleBudget, local_eval, strategies) -> tuple:
+        """
+        샤드 1개 처리(스레드). 어떤 예외든(잘못된 응답 포함) 그 샤드의 남은 종목은 로컬 재평가,
+        로컬 재평가마저 실패하면 남은 종목은 미평가(skipped)로 → 모든 종목이 results/skipped 중 하나에 들어감
+        [반환] (워커, {종목: (결과, 에러)}, 미평가 종목, 실패 여부, 소요초)
+        """
+        t0 = time.monotonic()
+        got = {}
+        failed = False
+        try:
+            w.ensure()
+            skipped = self._remote(w, shard, budget, strategies, got)
+        except Exception as e:
+            w.failures += 1
+            failed = True
+            rest = [s for s in shard if s not in got]
+            print(f"[SHARD] {w!r} 실패({type(e).__name__}: {e}) → 남은 {len(rest)}종목 로컬 재평가")
+            try:
+                w.stop()    # 로컬 워커: 다음 사이클 ensure()에서 재기동
+            except Exception as e2:
+                print(f"[SHARD] {w!r} 정리 실패: {e2}")
+            try:
+                skipped = scan_symbols(rest, budget, local_eval,
+                                       lambda m: got.__setitem__(m["symbol"], (m["results"], m["error"])))
+            except Exception as e2:
+                print(f"[SHARD] {w!r} 로컬 재평가 실패({type(e2).__name__}: {e2}) → 남은 종목 미평가")
+                skipped = [s for s in rest if s not in got]
+        return w, got, skipped, failed, round(time.monotonic() - t0, 3)
+
+    def _remote(self, w: _Worker, shard: list, budget: CycleBudget, strategies, got: dict) -> list:
+        """
+        워커에 scan 요청 → 종목별 결과 수신 [반환] 워커가 보고한 미평가 종목
+        - 형식이 어긋난 응답/결과도 미보고 종목이 남는 done → 예외(호출 측이 남은 종목 로컬 재평가)
+        """
+        req = {"op": "scan", "symbols": shard, "budget": max(0.0, budget.remaining() - budget.reserve),
+               "estimates": dict(budget.estimates), "token": self.token,
+               "strategies": [st.to_dict() for st in strategies or []]}
+        with socket.create_connection(w.addr, timeout=self.timeout) as sock:
+            sock.settimeout(self.timeout)
+            f = sock.makefile("rwb")
+            f.write(encode(req))
+            f.flush()
+            for line in f:
+                msg = json.loads(line)
+                if msg.get("op") == "done":
+                    reported = set(msg.get("skipped") or [])
+                    skipped = [s for s in shard if s in reported and s not in got]
+                    missing = [s for s in shard if s not in got and s not in reported]
+                    if missing:
+                        raise ValueError(f"결과 누락 {len(missing)}종목")
+                    return skipped
+                if msg.get("op") == "error":
+                    raise RuntimeError(msg.get("error"))
+                got[msg["symbol"]] = (_decode_results(msg["results"]), msg.get("error", ""))
+        raise ConnectionError("워커 연결 종료(done 미수신)")
+
+    def close(self):
+        """로컬 워커 종료(사이클 종료 시에는 호출하지 않음 → 상주 유지)"""
+        for w in self.workers:
+            w.stop()
+
+def _decode_results(results) -> dict:
+    """워커 결과 {전략: [진입가 | null, 사유]}(JSON 리스트) → 로컬 평가와 같은 {전략: (진입가 | None, 사유)}"""
+    if not isinstance(results, dict):
+        raise ValueError(f"잘못된 결과 형식: {type(results).__name__}")
+    out = {}
+    for name, v in results.items():
+        if not isinstance(v, (list, tuple)) or len(v) != 2:
+            raise ValueError(f"잘못된 전략 결과({name}): {v!r}")
+        out[name] = tuple(v)
+    return out
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+def get_coordinator():
+    """SHARD_WORKERS 설정 시 프로세스 공용 코디네이터(최초 호출 시 생성), 미설정 시 None"""
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            workers = parse_workers(SHARD_WORKERS)
+            if not workers:
+                return None
+            _coordinator = ShardCoordinator(workers)
+        return _coordinator
+
+if __name__ == "__main__":
+    # 상주 로컬 워커 상태/종료: python3 -m trade_server.shard_coordinator [--stop]
+    reg = _load_registry()
+    for slot, ent in sorted(reg.items()):
+        w = _Worker(("127.0.0.1", int(ent["port"])), slot=int(slot))
+        w.pid = int(ent["pid"])
+        alive = w.ping()
+        print(f"local{slot} pid={w.pid} {w!r} {'alive' if alive else 'dead'}")
+        if "--stop" in sys.argv[1:] or not alive:
+            w.stop()
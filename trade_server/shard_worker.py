@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# shard_worker.py
+# 샤드 스캔 워커(진입 후보 평가 전용, 주문/포지션 쓰기 없음)
+# • 프로토콜: TCP + JSON lines(요청 1줄 → 종목별 결과 1줄씩 스트리밍 → done 1줄)
+#   요청:  {"op": "scan", "symbols": [...], "budget": 남은초, "strategies": [전략 설정], "token": "..."}
+#          {"op": "ping", "token": "..."}
+#   응답:  {"symbol": "AAPL", "results": {전략: [진입가 | null, 사유]}, "error": ""}  (종목별)
+#          {"op": "done", "skipped": [...], "elapsed": 초}              (예산 부족 미평가 종목)
+#          {"op": "pong"} / {"op": "error", "error": "..."}
+# • 결과를 종목 단위로 흘려보내므로 워커가 중간에 죽어도 코디네이터는 남은 종목만 재평가
+# • 프로세스가 살아 있는 동안 분봉 집계(BARS) 캐시 유지 → 코디네이터는 종목을 고정 샤드에 배정
+#   (로컬 워커는 엔진 사이클 프로세스와 분리된 상주 프로세스, --idle 초 동안 요청 없으면 자동 종료)
+# ----------------------------------------
+
+import sys
+import hmac
+import json
+import time
+import socket
+import ipaddress
+import threading
+import socketserver
+
+from trade_server.config import SHARD_TOKEN
+from trade_server.cycle_scheduler import CycleBudget
+from trade_server.decision_journal import JOURNAL
+
+def encode(msg: dict) -> bytes:
+    return json.dumps(msg, ensure_ascii=False).encode() + b"\n"
+
+def scan_symbols(symbols: list, budget: CycleBudget, evaluate, emit) -> list:
+    """
+    종목 순서대로 evaluate(symbol) → {전략: (진입가, 사유)} → emit(결과 dict), 예산 부족 시 중단
+    (워커와 코디네이터 로컬 재평가 공용)
+    [반환] 미평가(skipped) 종목
+    """
+    for i, sym in enumerate(symbols):
+        if not budget.can_start("entry"):
+            return list(symbols[i:])
+        t = time.monotonic()
+        try:
+            results, error = evaluate(sym), ""
+        except Exception as e:
+            results, error = {}, f"평가 실패: {e}"
+        budget.observe("entry", time.monotonic() - t)
+        emit({"symbol": sym, "results": results, "error": error})
+    return []
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.last_active = time.monotonic()
+        try:
+            req = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            self.wfile.write(encode({"op": "error", "error": "bad request"}))
+            return
+        if self.server.token and not _token_ok(req.get("token"), self.server.token):
+            self.wfile.write(encode({"op": "error", "error": "unauthorized"}))
+            return
+        if req.get("op") == "ping":
+            self.wfile.write(encode({"op": "pong"}))
+            return
+        if req.get("op") != "scan":
+            self.wfile.write(encode({"op": "error", "error": f"unknown op: {req.get('op')}"}))
+            return
+
+        from trade_server.main_trading import evaluate_entries
+        from trade_server.strategy_config import StrategyConfig
+        strategies = [StrategyConfig(**d) for d in req.get("strategies") or [{}]]
+        t0 = time.monotonic()
+        budget = CycleBudget(seconds=float(req.get("budget", 60)), reserve=0.0,
+                             estimates=req.get("estimates"))
+
+        def emit(msg: dict):
+            self.wfile.write(encode(msg))
+            self.wfile.flush()
+
+        skipped = scan_symbols(req.get("symbols", []), budget,
+                               lambda sym: evaluate_entries(sym, strategies), emit)
+        JOURNAL.flush()   # 판단 저널은 평가한 프로세스(워커 호스트)의 journal 디렉토리에 기록
+        emit({"op": "done", "skipped": skipped, "elapsed": round(time.monotonic() - t0, 3),
+              "estimates": budget.estimates})
+        self.server.last_active = time.monotonic()
+
+def _token_ok(given, token: str) -> bool:
+    """상수 시간 비교(hmac.compare_digest, 응답 시간으로 토큰 추측 방지)"""
+    return isinstance(given, str) and hmac.compare_digest(given.encode(), token.encode())
+
+class ShardWorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    last_active = 0.0
+    token = SHARD_TOKEN
+
+def _idle_watch(srv: ShardWorkerServer, idle: float):
+    while True:
+        time.sleep(min(idle, 30.0))
+        if time.monotonic() - srv.last_active >= idle:
+            print(f"[SHARD] {idle:g}s 유휴 → 종료")
+            srv.shutdown()
+            return
+
+def _is_loopback(host: str) -> bool:
+    """host가 가리키는 주소가 모두 루프백인지(0.0.0.0/외부 인터페이스/해석 실패는 False)"""
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except OSError:
+        return False
+    return bool(infos) and all(ipaddress.ip_address(i[4][0].split("%")[0]).is_loopback for i in infos)
+
+def serve(host: str = "127.0.0.1", port: int = 0, idle: float = 0.0, token: str = SHARD_TOKEN):
+    """
+    워커 기동: 바인딩 후 "READY <port>" 1줄 출력(로컬 워커 기동 시 코디네이터가 읽음)
+    - idle > 0: 마지막 요청 후 idle초 지나면 종료(코디네이터가 띄운 상주 로컬 워커)
+    - 루프백 외 주소 바인딩은 SHARD_TOKEN 필수(미설정 시 ValueError, 인증 없는 원격 평가 요청 차단)
+    """
+    if not token and not _is_loopback(host):
+        raise ValueError(f"SHARD_TOKEN 없이 루프백 외 주소({host}) 바인딩 불가")
+    srv = ShardWorkerServer((host, port), _Handler)
+    srv.token = token
+    srv.last_active = time.monotonic()
+    print(f"READY {srv.server_address[1]}", flush=True)
+    sys.stdout = sys.stderr   # 이후 진행 로그는 stderr(코디네이터는 stdout 첫 줄만 읽음)
+    if idle > 0:
+        threading.Thread(target=_idle_watch, args=(srv, idle), daemon=True).start()
+    try:
+        srv.serve_forever()
+    finally:
+        srv.server_close()
+
+if __name__ == "__main__":
+    # 원격 워커:  SHARD_TOKEN=... python3 -m trade_server.shard_worker --host 0.0.0.0 --port 7001
+    import argparse
+    p = argparse.ArgumentParser(description="샤드 스캔 워커")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=0)
+    p.add_argument("--idle", type=float, default=0.0, help="유휴 자동 종료(초, 0=상시)")
+    a = p.parse_args()
+    try:
+        serve(a.host, a.port, a.idle)
+    except ValueError as e:
+        p.error(str(e))
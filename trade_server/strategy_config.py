@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# ----------------------------------------
+# strategy_config.py
+# 전략 설정(진입 임계값/동적 임계값/감성 필터/청산 비율/격리 파일/섀도우)
+# • 기본값 = config.py 플래그 + 지침 고정 임계값(기존 단일 전략과 동일 동작)
+# • STRATEGY_CONFIG=경로.json 지정 시 여러 전략을 한 엔진에서 평가(시장 데이터는 사이클당 1회 조회)
+#   {"strategies": [{"name": "base"},
+#                   {"name": "rsi70", "rsi_limit": 70, "shadow": true},
+#                   {"name": "dyn", "dynamic_thresholds": true, "trailing_stop_rate": 0.05, "shadow": true}]}
+# • 실주문 전략(shadow=false)은 최대 1개 → 기본 positions.csv/trades.csv(체결 리컨실러 대상, 경로 변경 불가)
+#   섀도우 전략은 shared_data/strategies/<name>/ 에 가상 체결(지정가 전량 체결 가정)로 격리 기록
+# ----------------------------------------
+
+import os
+import json
+import re
+from dataclasses import dataclass, asdict, fields
+
+from trade_server.config import (
+    SHARED_DATA_DIR, POSITIONS_FILE, TRADES_LOG_FILE, MARKS_LOG_FILE,
+    USE_SENTIMENT_FILTER, USE_DYNAMIC_THRESHOLDS,
+    PROFIT_TAKE_RATE, TRAILING_STOP_RATE, STOP_LOSS_ENABLED, STOP_LOSS_RATE,
+)
+
+STRATEGY_CONFIG = os.getenv("STRATEGY_CONFIG", "")
+STRATEGY_DIR    = os.path.join(SHARED_DATA_DIR, "strategies")
+
+_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+@dataclass
+class StrategyConfig:
+    name: str = "default"
+    shadow: bool = False                                  # True: 주문 없이 가상 체결만 기록
+    # 진입(buy_signal) 임계값
+    rsi_limit: float = 65.0
+    mul10: float = 1.5                                    # 현재 거래량 > 10일 평균 × mul10
+    mul5: float = 2.0                                     # 현재 거래량 > 5일 평균 × mul5
+    dynamic_thresholds: bool = USE_DYNAMIC_THRESHOLDS
+    sentiment_filter: bool = USE_SENTIMENT_FILTER
+    # 청산 비율
+    profit_take_rate: float = PROFIT_TAKE_RATE
+    trailing_stop_rate: float = TRAILING_STOP_RATE
+    stop_loss_enabled: bool = STOP_LOSS_ENABLED
+    stop_loss_rate: float = STOP_LOSS_RATE
+    qty: float = 2
+    # 격리 파일(미지정 시 실주문 전략=기본 파일, 섀도우=strategies/<name>/)
+    positions_file: str = ""
+    trades_file: str = ""
+    marks_file: str = ""
+
+    def __post_init__(self):
+        if not _NAME_RE.match(self.name):
+            raise ValueError(f"전략 이름은 영문/숫자/_/- 만 허용: {self.name!r}")
+        if self.shadow:
+            base = os.path.join(STRATEGY_DIR, self.name)
+            self.positions_file = self.positions_file or os.path.join(base, "positions.csv")
+            self.trades_file = self.trades_file or os.path.join(base, "trades.csv")
+            self.marks_file = self.marks_file or os.path.join(base, "marks.csv")
+        else:
+            self.positions_file = self.positions_file or POSITIONS_FILE
+            self.trades_file = self.trades_file or TRADES_LOG_FILE
+            self.marks_file = self.marks_file or MARKS_LOG_FILE
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+DEFAULT_STRATEGY = StrategyConfig()
+
+def load_strategies(path: str = STRATEGY_CONFIG) -> list:
+    """
+    전략 목록 로드(미지정 시 [DEFAULT_STRATEGY])
+    - 알 수 없는 키/중복 이름/실주문 전략 2개 이상/격리 파일 충돌 → ValueError
+    - 실주문 전략의 positions_file/trades_file 변경 → ValueError
+      (주문 기록/체결 리컨실러는 기본 positions.csv/trades.csv에만 반영, 다른 경로는 무시되므로 거부)
+    """
+    if not path:
+        return [DEFAULT_STRATEGY]
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    items = raw.get("strategies", raw) if isinstance(raw, dict) else raw
+    known = {f.name for f in fields(StrategyConfig)}
+    out = []
+    for item in items:
+        unknown = set(item) - known
+        if unknown:
+            raise ValueError(f"알 수 없는 전략 설정 키: {sorted(unknown)}")
+        out.append(StrategyConfig(**item))
+    names = [s.name for s in out]
+    if len(set(names)) != len(names):
+        raise ValueError(f"전략 이름 중복: {names}")
+    if sum(not s.shadow for s in out) > 1:
+        raise ValueError("실주문 전략(shadow=false)은 최대 1개(같은 계좌 포지션 충돌 방지)")
+    for s in out:
+        if not s.shadow and (os.path.abspath(s.positions_file) != os.path.abspath(POSITIONS_FILE) or
+                             os.path.abspath(s.trades_file) != os.path.abspath(TRADES_LOG_FILE)):
+            raise ValueError(f"실주문 전략({s.name})은 positions_file/trades_file 지정 불가"
+                             f"(기본 {POSITIONS_FILE}, {TRADES_LOG_FILE} 사용)")
+    files = [p for s in out for p in (s.positions_file, s.trades_file, s.marks_file)]
+    if len(set(files)) != len(files):
+        raise ValueError("전략별 positions/trades/marks 파일은 서로 달라야 함")
+    if not out:
+        raise ValueError("전략이 비어 있음")
+    return out
@@ -3,33 +3,87 @@
 # trade_logger.py
 # 미국주식 자동매매 - 체결/거래/이벤트 로그 기록 모듈
 # • trades.csv에 실시간 기록(운영 감사/실현손익 추적)
+# • 기존 6컬럼 헤더 파일은 최초 기록 시 1회 reason 헤더 추가(데이터 행은 그대로)
 # • 실전 운영 기준 상세 주석
 # ----------------------------------------
 
 import os
 import csv
+import threading
 from datetime import datetime
-from trade_server.config import TRADES_LOG_FILE
+from trade_server.config import TRADES_LOG_FILE, MARKS_LOG_FILE
+
+TRADE_COLUMNS = ['timestamp','symbol','side','qty','price','pnl','reason']
+_checked = set()                 # 헤더 확인 완료 파일(프로세스당 1회만 첫 줄 읽음)
+_header_lock = threading.Lock()
+
+def _migrate_header(trades_file: str):
+    """
+    [운영] reason 컬럼 이전(6컬럼) 헤더 → 7컬럼 헤더로 1회 교체(임시파일 → 원자적 교체)
+    - 데이터 행은 그대로(구 행은 reason 값 없음 → pandas/csv 리더에서 빈값)
+    - history_store는 헤더 길이 변화를 보정해 이어서 이관(재이관 없음)
+    """
+    with _header_lock:
+        if trades_file in _checked:
+            return
+        if os.path.exists(trades_file):
+            with open(trades_file, newline='') as f:
+                header = f.readline()
+            if header and 'reason' not in next(csv.reader([header]), []):
+                tmp = f"{trades_file}.tmp"
+                with open(trades_file, 'rb') as src, open(tmp, 'wb') as dst:
+                    src.readline()
+                    eol = header[len(header.rstrip('\r\n')):] or '\r\n'   # 기존 줄바꿈 유지
+                    dst.write((','.join(TRADE_COLUMNS) + eol).encode())
+                    while chunk := src.read(1 << 20):
+                        dst.write(chunk)
+                os.replace(tmp, trades_file)
+                print(f"[INFO] {trades_file} 헤더에 reason 컬럼 추가")
+        _checked.add(trades_file)
 
 def log_trade(symbol: str,
               side: str,
               qty: float,
               price: float,
-              pnl: float = None):
+              pnl: float = None,
+              trades_file: str = TRADES_LOG_FILE,
+              reason: str = ""):
     """
     [실전 전략] 체결내역 로그 기록 함수
     - trades.csv 파일에 타임스탬프, 심볼, 매수/매도, 수량, 가격, 손익 등 저장
     - 파일/디렉토리 없으면 자동 생성(운영 중단 방지)
-    - 컬럼: timestamp, symbol, side, qty, price, pnl
+    - 컬럼: timestamp, symbol, side, qty, price, pnl, reason
     - pnl: 실현손익, 미입력시 빈칸
+    - trades_file: 기록 대상 파일(기본 trades.csv)
+    - reason: 진입/청산 사유(entry/take_profit/trailing_stop/stop_loss/resync 등)
+      (기존 6컬럼 헤더 파일은 최초 기록 전에 _migrate_header로 헤더 보강)
     - 실전 감사/장기 이력 추적 필수
     """
-    os.makedirs(os.path.dirname(TRADES_LOG_FILE), exist_ok=True)
-    need_header = not os.path.exists(TRADES_LOG_FILE)
-    with open(TRADES_LOG_FILE, 'a', newline='') as f:
+    os.makedirs(os.path.dirname(trades_file), exist_ok=True)
+    _migrate_header(trades_file)
+    need_header = not os.path.exists(trades_file)
+    with open(trades_file, 'a', newline='') as f:
         writer = csv.writer(f)
         if need_header:
-            writer.writerow(['timestamp','symbol','side','qty','price','pnl'])
+            writer.writerow(TRADE_COLUMNS)
         ts = datetime.utcnow().isoformat()
-        writer.writerow([ts, symbol, side, qty, price, pnl if pnl is not None else ''])
+        writer.writerow([ts, symbol, side, qty, price, pnl if pnl is not None else '', reason])
+
+def log_marks(marks: list, marks_file: str = MARKS_LOG_FILE):
+    """
+    [실전 전략] 보유 포지션 평가(mark) 기록 - 사이클당 1회 일괄 append
+    - marks: [(symbol, qty, entry_price, price), ...]
+    - 컬럼: timestamp, symbol, qty, entry_price, price
+    - history_store.compact_history()가 날짜 파티션 Parquet으로 이관(낙폭/평가손익 분석용)
+    """
+    if not marks:
+        return
+    os.makedirs(os.path.dirname(marks_file), exist_ok=True)
+    need_header = not os.path.exists(marks_file)
+    ts = datetime.utcnow().isoformat()
+    with open(marks_file, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if need_header:
+            writer.writerow(['timestamp','symbol','qty','entry_price','price'])
+        writer.writerows([ts, s, q, ep, px] for s, q, ep, px in marks)
 